@@ -1,16 +1,35 @@
 import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 
 from server.routes.producer import router as producer_router, ws_router
-from server.routes.delta import router as delta_router
+from server.routes.delta import router as delta_router, ws_router as delta_ws_router
+from server.routes.metrics import router as metrics_router
+from server.cluster import coordinator
+from server.delta_reader import delta_reader
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Leader election when running several uvicorn workers (no-op for one)
+    await coordinator.start()
+    # One pooled HTTP session for every Delta poll
+    await delta_reader.open()
+    yield
+    await delta_reader.close()
+    await coordinator.close()
+
 
-app = FastAPI(title="Zerobus Snap Demo", version="1.0.0")
+app = FastAPI(title="Zerobus Snap Demo", version="1.0.0", lifespan=lifespan)
 
 app.include_router(producer_router, prefix="/api/producer")
 app.include_router(delta_router, prefix="/api/delta")
 app.include_router(ws_router)  # WebSocket at /ws/producer (no prefix)
+app.include_router(delta_ws_router)  # WebSocket at /ws/delta
+app.include_router(metrics_router)  # Prometheus scrape target at /metrics
 
 # Serve built React frontend
 frontend_dist = os.path.join(os.path.dirname(__file__), "frontend", "dist")
@@ -1,9 +1,10 @@
 import { useState, useEffect, useRef, useCallback } from "react";
-import { ProducerStats, DEFAULT_STATS } from "./types";
+import { ProducerStats, StatsFrame, DEFAULT_STATS } from "./types";
 import ProducerPanel from "./components/ProducerPanel";
 import MetricsTicker from "./components/MetricsTicker";
 import EventLog from "./components/EventLog";
 import DeltaPanel from "./components/DeltaPanel";
+import DeltaTail from "./components/DeltaTail";
 import DurabilityProof from "./components/DurabilityProof";
 import RejectionPanel from "./components/RejectionPanel";
 import CodeModal from "./components/CodeModal";
@@ -24,7 +25,19 @@ export default function App() {
     ws.onopen = () => setWsConnected(true);
     ws.onmessage = (e: MessageEvent) => {
       try {
-        setStats(JSON.parse(e.data) as ProducerStats);
+        const frame = JSON.parse(e.data) as StatsFrame;
+        if (frame.type === "full") {
+          setStats(frame.stats);
+        } else {
+          // Delta: changed top-level keys plus new log entries (newest first)
+          setStats((prev) => ({
+            ...prev,
+            ...frame.changed,
+            event_log: frame.log.length
+              ? [...frame.log, ...prev.event_log].slice(0, 50)
+              : prev.event_log,
+          }));
+        }
       } catch {}
     };
     ws.onclose = () => {
@@ -140,6 +153,9 @@ export default function App() {
               </div>
             </div>
 
+            {/* Rows landing in Delta, live mode only */}
+            <DeltaTail />
+
             {/* Durability proof (after kill) */}
             {wasKilled && <DurabilityProof stats={stats} />}
 
@@ -1,5 +1,5 @@
 import { useState, useEffect, useRef } from "react";
-import { ProducerStats } from "../types";
+import { DeltaSummary, ProducerStats } from "../types";
 
 interface Props {
   stats: ProducerStats;
@@ -15,19 +15,21 @@ const TYPE_BAR_COLORS: Record<string, string> = {
 export default function DeltaPanel({ stats }: Props) {
   const [deltaCount, setDeltaCount] = useState(0);
   const [prevCount, setPrevCount] = useState(0);
+  const [byType, setByType] = useState<Record<string, number> | null>(null);
   const [lastRefresh, setLastRefresh] = useState(Date.now());
   const pollRef = useRef<ReturnType<typeof setTimeout> | null>(null);
   const isFirstMount = useRef(true);
 
   const fetchCount = async () => {
     try {
-      const r = await fetch("/api/delta/count");
-      const data = await r.json();
+      const r = await fetch("/api/delta/summary");
+      const data: DeltaSummary = await r.json();
       setDeltaCount((prev) => {
         setPrevCount(prev);
         return data.count ?? 0;
       });
-      setLastRefresh(Date.now());
+      setByType(Object.fromEntries(data.breakdown.map((b) => [b.event_type, Number(b.count)])));
+      setLastRefresh(data.as_of ? data.as_of * 1000 : Date.now());
     } catch {}
   };
 
@@ -43,7 +45,7 @@ export default function DeltaPanel({ stats }: Props) {
   }, []);
 
   const delta = Math.max(0, deltaCount - prevCount);
-  const breakdown = Object.entries(stats.delta_by_type).sort(([, a], [, b]) => b - a);
+  const breakdown = Object.entries(byType ?? stats.delta_by_type).sort(([, a], [, b]) => b - a);
   const maxCount = breakdown.length > 0 ? breakdown[0][1] : 1;
   const secondsAgo = Math.floor((Date.now() - lastRefresh) / 1000);
 
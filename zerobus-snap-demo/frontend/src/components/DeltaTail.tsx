@@ -0,0 +1,94 @@
+import { useState, useEffect, useRef } from "react";
+import { DeltaTailFrame, DeltaTailRow } from "../types";
+
+const TYPE_COLOR: Record<string, string> = {
+  match_started: "text-cyan",
+  card_played: "text-gold",
+  snap_triggered: "text-neon-purple",
+  match_ended: "text-neon-green",
+};
+
+const MAX_ROWS = 30;
+
+export default function DeltaTail() {
+  const [rows, setRows] = useState<DeltaTailRow[]>([]);
+  const [tail, setTail] = useState<DeltaTailFrame["stats"] | null>(null);
+  const wsRef = useRef<WebSocket | null>(null);
+  const reconnectTimer = useRef<ReturnType<typeof setTimeout> | null>(null);
+
+  useEffect(() => {
+    let closed = false;
+    const connect = () => {
+      const proto = window.location.protocol === "https:" ? "wss:" : "ws:";
+      const ws = new WebSocket(`${proto}//${window.location.host}/ws/delta`);
+      wsRef.current = ws;
+      ws.onmessage = (e: MessageEvent) => {
+        try {
+          const frame = JSON.parse(e.data) as DeltaTailFrame;
+          setTail(frame.stats);
+          if (frame.type === "snapshot") {
+            setRows(frame.rows.slice(0, MAX_ROWS));
+          } else if (frame.rows.length) {
+            setRows((prev) => [...frame.rows, ...prev].slice(0, MAX_ROWS));
+          }
+        } catch {}
+      };
+      ws.onclose = () => {
+        if (!closed) reconnectTimer.current = setTimeout(connect, 2000);
+      };
+      ws.onerror = () => ws.close();
+    };
+    connect();
+    return () => {
+      closed = true;
+      wsRef.current?.close();
+      if (reconnectTimer.current) clearTimeout(reconnectTimer.current);
+    };
+  }, []);
+
+  // Demo mode has no Delta table to tail
+  if (!tail?.live) return null;
+
+  const latency = tail.landed_latency_ms;
+
+  return (
+    <div className="panel">
+      <div className="flex items-center justify-between mb-3">
+        <p className="panel-title mb-0">Landed in Delta</p>
+        <span className="text-[9px] text-text-dim tabular-nums">
+          {latency.count > 0
+            ? `produce → Delta p50 ${latency.p50.toLocaleString()} ms • p95 ${latency.p95.toLocaleString()} ms`
+            : "waiting for rows…"}
+        </span>
+      </div>
+
+      <div className="grid grid-cols-[100px_90px_60px_1fr_70px] gap-1.5 text-[8px] text-muted tracking-widest pb-1 border-b border-border mb-1">
+        <span>TYPE</span>
+        <span>CARD</span>
+        <span>SEQ</span>
+        <span>HOST</span>
+        <span className="text-right">LANDED</span>
+      </div>
+      <div className="max-h-48 overflow-y-auto space-y-0.5 font-mono text-[9px]">
+        {rows.map((r) => (
+          <div
+            key={`${r.host}-${r.sequence_num}-${r.event_id}`}
+            className="grid grid-cols-[100px_90px_60px_1fr_70px] gap-1.5"
+          >
+            <span className={TYPE_COLOR[r.event_type] ?? "text-text-dim"}>{r.event_type}</span>
+            <span className="text-text-dim truncate">{r.card_name}</span>
+            <span className="text-text-dim tabular-nums">{r.sequence_num}</span>
+            <span className="text-muted truncate">{r.host}</span>
+            <span className="text-right text-neon-green tabular-nums">
+              {r.landed_ms ?? r.seen_ms ?? "—"} ms
+            </span>
+          </div>
+        ))}
+      </div>
+
+      {tail.last_error && (
+        <p className="mt-2 text-[8px] text-neon-red truncate">{tail.last_error}</p>
+      )}
+    </div>
+  );
+}
@@ -23,7 +23,7 @@ export default function DurabilityProof({ stats }: Props) {
           if (pollRef.current) clearInterval(pollRef.current);
         }
       } else {
-        const r = await fetch("/api/delta/count");
+        const r = await fetch("/api/delta/summary");
         const data = await r.json();
         const cnt = data.count ?? 0;
         setDeltaCount(cnt);
@@ -103,6 +103,49 @@ export default function DurabilityProof({ stats }: Props) {
         </div>
       </div>
 
+      {/* Replay of unacked events after resume */}
+      {(stats.replaying || stats.replay_count > 0) && (
+        <div className="mt-3 space-y-1">
+          <div className="flex justify-between text-[9px] text-text-dim">
+            <span>{stats.replaying ? "Replaying unacked events…" : "Replay complete"}</span>
+            <span className="tabular-nums">
+              {stats.replay_count.toLocaleString()} replayed • {stats.replay_remaining.toLocaleString()} left
+              • {Math.round(stats.replay_rate).toLocaleString()}/s
+            </span>
+          </div>
+          <div className="h-1 bg-panel-light rounded overflow-hidden">
+            <div
+              className="h-full rounded bg-cyan transition-all duration-300"
+              style={{
+                width: `${Math.round(
+                  (stats.replay_count / Math.max(1, stats.replay_count + stats.replay_remaining)) * 100
+                )}%`,
+              }}
+            />
+          </div>
+        </div>
+      )}
+
+      {/* Delivery audit: duplicates and gaps by sequence number */}
+      {stats.audit && stats.audit.watermark > 0 && (
+        <div className="mt-3 flex justify-between text-[9px] text-text-dim tabular-nums">
+          <span>
+            Audit ({stats.audit.mode}) to seq {stats.audit.watermark.toLocaleString()}
+          </span>
+          <span>
+            <span className={stats.audit.duplicate_rows > 0 ? "text-neon-yellow" : ""}>
+              {(stats.audit.duplicate_rate * 100).toFixed(3)}% duplicates
+            </span>
+            {" • "}
+            <span className={stats.audit.gap_count > 0 ? "text-neon-red" : ""}>
+              {stats.audit.gap_count.toLocaleString()} gaps
+              {stats.audit.oldest_missing_seq !== null &&
+                ` (oldest #${stats.audit.oldest_missing_seq.toLocaleString()})`}
+            </span>
+          </span>
+        </div>
+      )}
+
       {proven && (
         <div className="mt-4 text-center">
           <div className="text-2xl font-black text-neon-green neon-text-green tracking-widest">
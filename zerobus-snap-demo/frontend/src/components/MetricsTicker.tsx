@@ -60,6 +60,20 @@ export default function MetricsTicker({ stats }: Props) {
           color="text-gold"
           glow="neon-text-gold"
         />
+        {stats.throttle_factor < 1 && (
+          <StatBox
+            value={`${Math.round(stats.throttle_factor * 100)}%`}
+            label={`THROTTLED · ${stats.throttle.reason.toUpperCase()}`}
+            color="text-neon-yellow"
+          />
+        )}
+        {stats.dictionary && (
+          <StatBox
+            value={`${stats.wire.bytes_per_event} B`}
+            label={`PER EVENT · ${stats.wire.saved_pct}% SAVED`}
+            color="text-cyan"
+          />
+        )}
         <StatBox
           value={`${ackPct}%`}
           label="ACK RATE"
@@ -11,6 +11,202 @@ export interface EventLogEntry {
   color: string;
 }
 
+export interface InFlightBufferStats {
+  count: number;
+  bytes: number;
+  bytes_per_event: number;
+}
+
+export interface TokenCacheStats {
+  name: string;
+  cached: boolean;
+  expires_in_s: number;
+  refresh_count: number;
+  refresh_errors: number;
+  last_refresh_ms: number;
+  avg_refresh_ms: number;
+  max_refresh_ms: number;
+  last_error: string;
+}
+
+export interface ShardStats {
+  shard: number;
+  events_sent: number;
+  events_acked: number;
+  events_in_flight: number;
+  events_failed: number;
+  events_resent: number;
+  unacked_at_kill: number;
+  inflight_buffer: InFlightBufferStats;
+}
+
+export interface EventWorkerStats {
+  workers: number;
+  batches_generated?: number;
+  events_generated?: number;
+  ready?: number;
+  pending_batches?: number;
+}
+
+// Set while simulating coherent matches (start with matches > 0)
+export interface MatchSimStats {
+  matches: number;
+  players: number;
+  events: number;
+  matches_started: number;
+  matches_completed: number;
+  retreats: number;
+  snaps: number;
+  starting: number;
+  playing: number;
+  ending: number;
+}
+
+// Payload bytes handed to ingest, against the same events as GameEvent protobufs
+export interface WireStats {
+  bytes_sent: number;
+  game_event_bytes: number;
+  bytes_per_event: number;
+  saved_pct: number;
+}
+
+// Set while writing game_events_compact: the code dictionary and its game_event_dims rows
+export interface CompactDictionaryStats {
+  dict_id: number;
+  entries: Record<string, number>;
+  max_entries: number;
+  rotations: number; // times the capped dictionary started over under a new dict_id
+  written: number;
+  acked: number;
+  failed: number; // rejected by the server; re-sent up to MAX_DIM_RETRIES times
+  resent: number;
+  retried: number;
+  abandoned: number; // rejected past the retries; the dictionary rotated away from them
+  in_flight: number;
+  pending: number;
+}
+
+// Set while replaying a recorded event file instead of generating events
+export interface EventSourceStats {
+  file: string;
+  format: "jsonl" | "parquet";
+  speed: number;
+  loop: boolean;
+  passes: number;
+  rows_read: number;
+  rows_emitted: number;
+  bad_rows: number;
+  chunks_read: number;
+  buffered: number;
+  replayed_s: number;
+  lag_ms: number;
+  exhausted: boolean;
+}
+
+export interface WalStats {
+  enabled: boolean;
+  dir?: string;
+  segments?: number;
+  log_bytes?: number;
+  live_records?: number;
+  appended?: number;
+  acked?: number;
+  flushes?: number;
+  recovered?: number;
+  recover_ms?: number;
+}
+
+// Delivery audit: sequence numbers reconciled against the ingest table ("local" without one)
+export interface AuditStats {
+  mode: "local" | "table";
+  sent: number;
+  acked: number;
+  failed: number;
+  dropped: number;
+  watermark: number;
+  oldest_unacked_seq: number | null;
+  duplicate_rate: number;
+  duplicate_rows: number;
+  duplicate_ids: number;
+  gap_count: number;
+  oldest_missing_seq: number | null;
+  recent_gaps: [number, number][];
+  unexpected_rows: number;
+  rows_scanned: number;
+  passes: number;
+  last_query_ms: number;
+  last_error: string;
+  memory: { runs: number; range_bytes: number; bloom_bytes: number; trimmed: number };
+}
+
+export interface LatencySummary {
+  count: number;
+  mean: number;
+  p50: number;
+  p95: number;
+  p99: number;
+  max: number;
+}
+
+export interface ProfileSegmentReport {
+  type: string;
+  duration_s: number;
+  index: number;
+  iteration: number;
+  status: "running" | "done";
+  elapsed_s: number;
+  planned_events: number;
+  achieved_events: number;
+  planned_rate: number;
+  achieved_rate: number;
+  error_pct: number;
+}
+
+export interface LoadProfileStats {
+  name: string;
+  active: boolean;
+  loop: boolean;
+  iteration: number;
+  current_segment: number | null;
+  segment_count: number;
+  total_s: number;
+  segments: ProfileSegmentReport[];
+}
+
+export interface ThrottleStats {
+  factor: number;
+  inflight_ratio: number;
+  ack_latency_ms: number;
+  oldest_unacked_ms: number;
+  latency_target_ms: number;
+  decreases: number;
+  reason: string;
+}
+
+// Present on every stats payload; role "single" unless several uvicorn workers run
+export interface ClusterInfo {
+  role: "single" | "leader" | "follower";
+  worker_pid: number;
+  leader_pid?: number;
+  epoch?: number;
+  seq_high_water?: number;
+  snapshot_age_ms?: number | null;
+  publishes?: number;
+  commands_served?: number;
+  commands_forwarded?: number;
+  torn_reads?: number;
+}
+
+// GET /api/delta/summary — one cached snapshot shared by every viewer
+export interface DeltaSummary {
+  count: number;
+  breakdown: { event_type: string; count: number }[];
+  events: Record<string, string | number | null>[];
+  rejections: number;
+  hosts: { host: string; count: number }[];
+  as_of: number;
+}
+
 export interface ProducerStats {
   state: ProducerStateValue;
   events_sent: number;
@@ -18,19 +214,77 @@ export interface ProducerStats {
   events_in_flight: number;
   events_failed: number;
   events_per_sec: number;
+  rate_error_pct: number;
   acked_at_kill: number;
   unacked_at_kill: number;
   events_resent: number;
   rejection_count: number;
   demo_mode: boolean;
   event_log: EventLogEntry[];
+  log_total: number;
   sequence_num: number;
   rate: number;
   delta_count: number;
   delta_by_type: Record<string, number>;
   last_error: string;
+  replay_count: number;
+  replay_ms: number;
+  replaying: boolean;
+  replay_remaining: number;
+  replay_rate: number;
+  wire: WireStats;
+  inflight_buffer: InFlightBufferStats;
+  shard_count: number;
+  shards: ShardStats[];
+  token_cache?: TokenCacheStats;
+  event_workers: EventWorkerStats;
+  source: EventSourceStats | null;
+  simulator: MatchSimStats | null;
+  // Registered table schema being written (GET /api/producer/schemas); table once streams open
+  schema: { name: string; version: number; table: string | null };
+  dictionary: CompactDictionaryStats | null;
+  wal: WalStats;
+  audit?: AuditStats;
+  latency_ms: { produce_to_ack: LatencySummary; ingest_to_ack: LatencySummary };
+  throughput_series: { sent: number[]; acked: number[] };
+  profile: LoadProfileStats | null;
+  throttle_factor: number;
+  throttle: ThrottleStats;
+  cluster?: ClusterInfo;
+}
+
+// /ws/delta frames: rows as they land in Delta, newest first
+export interface DeltaTailRow {
+  event_id: string;
+  event_type: string;
+  player_id: string;
+  card_name: string;
+  host: string;
+  sequence_num: number;
+  produced_at: number;
+  timestamp: string;
+  landed_ms: number | null; // produced_at → Delta file commit
+  seen_ms: number | null; // produced_at → the poll that read it
 }
 
+export interface DeltaTailFrame {
+  type: "snapshot" | "rows";
+  rows: DeltaTailRow[];
+  stats: {
+    live: boolean;
+    landed_latency_ms: LatencySummary;
+    rows: number;
+    catchups: number;
+    skipped: number;
+    last_error: string;
+  };
+}
+
+// /ws/producer frames: a full snapshot first (and after drops), then deltas
+export type StatsFrame =
+  | { type: "full"; stats: ProducerStats }
+  | { type: "delta"; changed: Partial<ProducerStats>; log: EventLogEntry[] };
+
 export const DEFAULT_STATS: ProducerStats = {
   state: "STOPPED",
   events_sent: 0,
@@ -38,15 +292,48 @@ export const DEFAULT_STATS: ProducerStats = {
   events_in_flight: 0,
   events_failed: 0,
   events_per_sec: 0,
+  rate_error_pct: 0,
   acked_at_kill: 0,
   unacked_at_kill: 0,
   events_resent: 0,
   rejection_count: 0,
   demo_mode: false,
   event_log: [],
+  log_total: 0,
   sequence_num: 0,
   rate: 5,
   delta_count: 0,
   delta_by_type: {},
   last_error: "",
+  replay_count: 0,
+  replay_ms: 0,
+  replaying: false,
+  replay_remaining: 0,
+  replay_rate: 0,
+  wire: { bytes_sent: 0, game_event_bytes: 0, bytes_per_event: 0, saved_pct: 0 },
+  inflight_buffer: { count: 0, bytes: 0, bytes_per_event: 0 },
+  shard_count: 1,
+  shards: [],
+  event_workers: { workers: 0 },
+  source: null,
+  simulator: null,
+  schema: { name: "game_events", version: 1, table: null },
+  dictionary: null,
+  wal: { enabled: false },
+  latency_ms: {
+    produce_to_ack: { count: 0, mean: 0, p50: 0, p95: 0, p99: 0, max: 0 },
+    ingest_to_ack: { count: 0, mean: 0, p50: 0, p95: 0, p99: 0, max: 0 },
+  },
+  throughput_series: { sent: [], acked: [] },
+  profile: null,
+  throttle_factor: 1,
+  throttle: {
+    factor: 1,
+    inflight_ratio: 0,
+    ack_latency_ms: 0,
+    oldest_unacked_ms: 0,
+    latency_target_ms: 0,
+    decreases: 0,
+    reason: "",
+  },
 };
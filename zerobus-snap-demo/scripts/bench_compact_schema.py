@@ -0,0 +1,103 @@
+"""
+Compact (dictionary-encoded) schema vs GameEvent: bytes per event and ingest throughput.
+
+  size       — encodes the same events as GameEvent and as game_events_compact,
+               for independent random events and for simulated matches, and
+               reports bytes/event, the game_event_dims rows the dictionary
+               needed (and their bytes amortized per event) and encode rate
+  throughput — runs the producer's real-mode path against the fake SDK with
+               a bandwidth-limited link (ZEROBUS_FAKE_MBPS) at a target rate
+               above what the link carries, once per schema, and reports the
+               acked events/sec each sustains
+
+Usage (from zerobus-snap-demo/):
+    python scripts/bench_compact_schema.py [--events 200000] [--matches 10000]
+        [--mbps 8] [--rate 40000] [--seconds 5] [--shards 1]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def _configure_env(args: argparse.Namespace) -> None:
+    os.environ["ZEROBUS_FAKE"] = "1"
+    os.environ.setdefault("DATABRICKS_APP_NAME", "bench")  # skip profile lookup
+    os.environ["ZEROBUS_FAKE_MBPS"] = str(args.mbps)
+    os.environ["ZEROBUS_FAKE_CONNECT_MS"] = "0"
+
+
+def size_report(events: int, matches: int) -> None:
+    from server.compact import COMPACT_SCHEMA, DIMS_SCHEMA, compact_dictionary
+    from server.events import make_events
+    from server.match_sim import MatchSimulator
+
+    encode = COMPACT_SCHEMA.record_encoder()
+    encode_dim = DIMS_SCHEMA.dict_encoder()
+    sources = [
+        ("random events", make_events(1, events)),
+        (f"{matches:,} matches", MatchSimulator(matches, seed=7).take(1, events)),
+    ]
+    print(f"{'source':<18}{'GameEvent B':>13}{'compact B':>11}{'dims rows':>11}"
+          f"{'+dims B':>9}{'saved':>8}{'encode ev/s':>14}")
+    for label, records in sources:
+        compact_dictionary.reset()
+        full = sum(len(r.payload) for r in records)
+        t0 = time.perf_counter()
+        compact = sum(len(encode(r)) for r in records)
+        rate = len(records) / (time.perf_counter() - t0)
+        rows = compact_dictionary.pending
+        dims = sum(
+            len(encode_dim({"dict_id": i, "dimension": d, "code": c, "value": v}))
+            for i, d, c, v in rows
+        )
+        n = len(records)
+        saved = 1 - (compact + dims) / full
+        print(f"{label:<18}{full / n:>13.1f}{compact / n:>11.1f}{len(rows):>11,}"
+              f"{dims / n:>9.1f}{saved:>8.1%}{rate:>14,.0f}")
+    compact_dictionary.reset()
+
+
+async def throughput(args: argparse.Namespace) -> None:
+    from server.compact import COMPACT_SCHEMA
+    from server.events import GAME_EVENT_SCHEMA
+    from server.producer import ProducerManager
+
+    print(f"\nfake SDK at {args.mbps:g} Mbit/s per stream, {args.shards} stream(s), target {args.rate:,} ev/s")
+    print(f"{'schema':<24}{'B/event':>9}{'acked/s':>12}{'Mbit/s':>9}")
+    for schema in (GAME_EVENT_SCHEMA, COMPACT_SCHEMA):
+        mgr = ProducerManager()
+        await mgr.start(rate=args.rate, shards=args.shards, matches=args.matches, schema=schema)
+        await asyncio.sleep(1.0)  # warm-up: connect, fill the link
+        s = mgr.stats
+        acked0, bytes0, sent0 = s.events_acked, s.wire_bytes, s.events_sent
+        t0 = time.perf_counter()
+        await asyncio.sleep(args.seconds)
+        elapsed = time.perf_counter() - t0
+        acked = (s.events_acked - acked0) / elapsed
+        per_event = (s.wire_bytes - bytes0) / max(1, s.events_sent - sent0)
+        print(f"{schema.key:<24}{per_event:>9.1f}{acked:>12,.0f}{acked * per_event * 8 / 1e6:>9.2f}")
+        await mgr.stop()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--events", type=int, default=200_000)
+    ap.add_argument("--matches", type=int, default=10_000)
+    ap.add_argument("--mbps", type=float, default=8.0)
+    ap.add_argument("--rate", type=int, default=40_000)
+    ap.add_argument("--seconds", type=float, default=5.0)
+    ap.add_argument("--shards", type=int, default=1)
+    args = ap.parse_args()
+
+    _configure_env(args)
+    size_report(args.events, args.matches)
+    asyncio.run(throughput(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Delta poll latency: per-poll session and auth vs the pooled DeltaReader.
+
+Serves a mock SQL Statement API over HTTPS (self-signed, via the openssl
+CLI; plain HTTP if it is missing) on a thread of its own, then issues the
+same COUNT(*) poll through:
+
+  per-poll  what DeltaReader did before: a new WorkspaceClient for the token
+            and a new aiohttp.ClientSession (TCP + TLS handshake) per poll
+  pooled    DeltaReader._execute_sql: one keep-alive session, cached token
+            and warehouse id
+
+each sequentially and with --concurrency polls in flight (the dashboard
+polls several /api/delta endpoints at once).
+
+Usage (from zerobus-snap-demo/):
+    python scripts/bench_delta_poll.py [--polls 300] [--concurrency 5] [--server-ms 2]
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import socket
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def _self_signed(directory: str) -> tuple[str, str]:
+    cert, key = os.path.join(directory, "cert.pem"), os.path.join(directory, "key.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+         "-keyout", key, "-out", cert, "-subj", "/CN=127.0.0.1",
+         "-addext", "subjectAltName=IP:127.0.0.1"],
+        check=True, capture_output=True,
+    )
+    return cert, key
+
+
+def _serve(port: int, ssl_ctx, server_ms: float, ready: threading.Event) -> None:
+    from aiohttp import web
+
+    async def host_metadata(request):
+        # Fetched by every new WorkspaceClient (databricks-sdk host discovery)
+        return web.json_response({"workspace_id": "1234567890"})
+
+    async def warehouses(request):
+        return web.json_response({"warehouses": [{"id": "bench-warehouse"}]})
+
+    async def statements(request):
+        body = await request.json()
+        assert request.headers["Authorization"].startswith("Bearer ") and body["warehouse_id"]
+        await asyncio.sleep(server_ms / 1000)
+        return web.json_response({
+            "status": {"state": "SUCCEEDED"},
+            "manifest": {"schema": {"columns": [{"name": "cnt"}]}},
+            "result": {"data_array": [["123456"]]},
+        })
+
+    async def main():
+        app = web.Application()
+        app.router.add_get("/.well-known/databricks-config", host_metadata)
+        app.router.add_get("/api/2.0/sql/warehouses", warehouses)
+        app.router.add_post("/api/2.0/sql/statements/", statements)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", port, ssl_context=ssl_ctx).start()
+        ready.set()
+        await asyncio.Event().wait()
+
+    asyncio.run(main())
+
+
+async def _legacy_execute_sql(sql: str, state: dict) -> list:
+    """The pre-pooling request path, kept here for comparison."""
+    import aiohttp
+    from databricks.sdk import WorkspaceClient
+    from server.config import get_workspace_host, get_zerobus_config
+
+    config = get_zerobus_config()
+    host = get_workspace_host()
+    token = WorkspaceClient().config.authenticate()["Authorization"].replace("Bearer ", "")
+    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+    if not state.get("warehouse_id"):
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"{host}/api/2.0/sql/warehouses", headers=headers) as resp:
+                state["warehouse_id"] = (await resp.json())["warehouses"][0]["id"] or config["warehouse_id"]
+    payload = {"statement": sql, "warehouse_id": state["warehouse_id"], "format": "JSON_ARRAY"}
+    async with aiohttp.ClientSession() as session:
+        async with session.post(f"{host}/api/2.0/sql/statements/", headers=headers, json=payload) as resp:
+            result = await resp.json()
+    cols = [c["name"] for c in result["manifest"]["schema"]["columns"]]
+    return [dict(zip(cols, row)) for row in result["result"]["data_array"]]
+
+
+async def _run(poll, polls: int, concurrency: int) -> tuple[list, float]:
+    latencies = []
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with sem:
+            t0 = time.perf_counter()
+            rows = await poll()
+            latencies.append((time.perf_counter() - t0) * 1000)
+            assert rows and rows[0]["cnt"] == "123456", rows
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(polls)))
+    return sorted(latencies), time.perf_counter() - t0
+
+
+def _row(label: str, latencies: list, elapsed: float) -> str:
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+    mean = sum(latencies) / len(latencies)
+    return (f"{label:<22}{mean:>9.2f}{pct(0.5):>9.2f}{pct(0.95):>9.2f}{pct(0.99):>9.2f}"
+            f"{len(latencies) / elapsed:>11,.0f}")
+
+
+async def bench(args: argparse.Namespace) -> None:
+    from server.delta_reader import DeltaReader
+
+    sql = "SELECT COUNT(*) AS cnt FROM bench"
+    legacy_state: dict = {}
+    reader = DeltaReader()
+    await reader.open()
+    polls = {
+        "per-poll": lambda: _legacy_execute_sql(sql, legacy_state),
+        "pooled": lambda: reader._execute_sql(sql, strict=True),
+    }
+    print(f"{'path':<22}{'mean ms':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'polls/s':>11}")
+    for concurrency in (1, args.concurrency):
+        for label, poll in polls.items():
+            await _run(poll, 10, concurrency)  # warm-up: first token, warehouse id
+            latencies, elapsed = await _run(poll, args.polls, concurrency)
+            print(_row(f"{label} ×{concurrency}", latencies, elapsed))
+    await reader.close()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--polls", type=int, default=300)
+    ap.add_argument("--concurrency", type=int, default=5)
+    ap.add_argument("--server-ms", type=float, default=2.0)
+    args = ap.parse_args()
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    tmp = tempfile.mkdtemp()
+    ssl_ctx, scheme = None, "http"
+    if shutil.which("openssl"):
+        cert, key = _self_signed(tmp)
+        ssl_ctx = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        ssl_ctx.load_cert_chain(cert, key)
+        # Trusted by aiohttp's default context and by the SDK's requests session
+        os.environ["SSL_CERT_FILE"] = os.environ["REQUESTS_CA_BUNDLE"] = cert
+        scheme = "https"
+    os.environ.update({
+        "DATABRICKS_APP_NAME": "bench",
+        "DATABRICKS_HOST": f"{scheme}://127.0.0.1:{port}",
+        "DATABRICKS_TOKEN": "bench-token",
+    })
+
+    ready = threading.Event()
+    threading.Thread(target=_serve, args=(port, ssl_ctx, args.server_ms, ready), daemon=True).start()
+    ready.wait(10)
+    print(f"mock SQL API at {scheme}://127.0.0.1:{port}, {args.server_ms:g} ms per statement\n")
+    asyncio.run(bench(args))
+    shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
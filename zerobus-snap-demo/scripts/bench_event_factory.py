@@ -0,0 +1,105 @@
+"""
+Microbenchmark: event construction + protobuf serialization, events/sec on one core.
+
+  before  — the original per-event path: dict with ISO-8601 timestamps and a
+            uuid4(), re-parsed by datetime.fromisoformat during serialization,
+            plus the discarded json.dumps(event) the produce loop used to do
+  after   — server.events.make_events() at several batch sizes
+
+Usage (from zerobus-snap-demo/):
+    python scripts/bench_event_factory.py [--seconds 2]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from server.events import (  # noqa: E402
+    CARD_NAMES, EVENT_TYPES, MATCHES, PLAYERS, _HOSTNAME, GameEventProto, make_events,
+)
+
+
+def _legacy_event(seq: int) -> dict:
+    now = datetime.now(timezone.utc).isoformat()
+    return {
+        "event_id": str(uuid.uuid4()),
+        "event_type": random.choice(EVENT_TYPES),
+        "player_id": random.choice(PLAYERS),
+        "match_id": random.choice(MATCHES),
+        "card_name": random.choice(CARD_NAMES),
+        "location": random.randint(1, 3),
+        "snap_cubes": random.choice([1, 2, 4, 8]),
+        "result": random.choice(["win", "loss", "retreat", "pending"]),
+        "produced_at": now,
+        "ingested_at": now,
+        "host": _HOSTNAME,
+        "sequence_num": seq,
+    }
+
+
+def _legacy_payload(event: dict) -> bytes:
+    def _to_us(iso_str: str) -> int:
+        dt = datetime.fromisoformat(iso_str.replace("Z", "+00:00"))
+        return int(dt.timestamp() * 1_000_000)
+
+    return GameEventProto(
+        event_id=event.get("event_id", ""),
+        event_type=event.get("event_type", ""),
+        player_id=event.get("player_id", ""),
+        match_id=event.get("match_id", ""),
+        card_name=event.get("card_name", ""),
+        location=int(event.get("location", 0)),
+        snap_cubes=int(event.get("snap_cubes", 0)),
+        result=event.get("result", ""),
+        produced_at=_to_us(event.get("produced_at", "")),
+        ingested_at=_to_us(event.get("ingested_at", "")),
+        host=event.get("host", ""),
+        sequence_num=int(event.get("sequence_num", 0)),
+    ).SerializeToString()
+
+
+def bench_legacy(seconds: float) -> float:
+    n, seq = 0, 0
+    t0 = time.process_time()
+    while time.process_time() - t0 < seconds:
+        for _ in range(1000):
+            seq += 1
+            event = _legacy_event(seq)
+            json.dumps(event).encode()
+            _legacy_payload(event)
+        n += 1000
+    return n / (time.process_time() - t0)
+
+
+def bench_factory(seconds: float, batch: int) -> float:
+    n, seq = 0, 0
+    t0 = time.process_time()
+    while time.process_time() - t0 < seconds:
+        make_events(seq + 1, batch)
+        seq += batch
+        n += batch
+    return n / (time.process_time() - t0)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--seconds", type=float, default=2.0)
+    args = ap.parse_args()
+
+    before = bench_legacy(args.seconds)
+    print(f"{'path':<28}{'events/sec/core':>16}{'speedup':>10}")
+    print(f"{'before (per-event)':<28}{before:>16,.0f}{'1.00x':>10}")
+    for batch in (1, 10, 100, 1000):
+        after = bench_factory(args.seconds, batch)
+        print(f"{f'after (batch={batch})':<28}{after:>16,.0f}{after / before:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Memory per retained in-flight event: dict events vs slotted EventRecords.
+
+Holds N events the way the producer does while they await acks and measures
+the heap growth with tracemalloc, for two sources:
+
+  fresh     — events from make_events(), as in normal production
+  recovered — events rebuilt from their payloads, as after WAL recovery
+
+  before — the previous layout: one 14-key dict per event (schema fields,
+           payload, sent_ns) in an OrderedDict keyed by sequence_num plus an
+           event_id → sequence_num index, with recovered strings un-interned
+  after  — EventRecords in server.inflight.InFlightBuffer
+
+Usage (from zerobus-snap-demo/):
+    python scripts/bench_event_memory.py [--events 10000]
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from collections import OrderedDict
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from server.events import _FIELDS, GameEventProto, event_from_payload, make_events  # noqa: E402
+from server.inflight import InFlightBuffer  # noqa: E402
+
+
+def _legacy_from_payload(payload: bytes) -> dict:
+    """The previous event_from_payload: a dict of freshly decoded strings."""
+    msg = GameEventProto.FromString(payload)
+    ev = {name: getattr(msg, name) for name, _, _ in _FIELDS}
+    ev["payload"] = payload
+    return ev
+
+
+def _fresh_dicts(n: int) -> list:
+    return [{**e.to_dict(), "payload": e.payload} for e in make_events(1, n)]
+
+
+def _recovered_dicts(n: int) -> list:
+    return [_legacy_from_payload(e.payload) for e in make_events(1, n)]
+
+
+def _recovered_records(n: int) -> list:
+    return [event_from_payload(e.payload) for e in make_events(1, n)]
+
+
+def _hold_dicts(events: list) -> tuple:
+    # Shape of the old InFlightBuffer: seq → (event, size) plus an event_id index
+    by_seq: "OrderedDict[int, tuple]" = OrderedDict()
+    by_id = {}
+    for ev in events:
+        ev["sent_ns"] = time.perf_counter_ns()
+        by_seq[ev["sequence_num"]] = (ev, 0)
+        by_id[ev["event_id"]] = ev["sequence_num"]
+    return by_seq, by_id
+
+
+def _hold_records(events: list) -> InFlightBuffer:
+    buf = InFlightBuffer()
+    for ev in events:
+        ev.sent_ns = time.perf_counter_ns()
+        buf.add(ev)
+    return buf
+
+
+def measure(build, hold, n: int) -> float:
+    """Heap bytes per event retained by hold(build(n))."""
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    held = hold(build(n))
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    del held
+    return used / n
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--events", type=int, default=10_000, help="retained events (max_inflight_records)")
+    args = ap.parse_args()
+    n = args.events
+
+    print(f"retaining {n:,} in-flight events")
+    print(f"{'source':<12}{'before B/ev':>13}{'after B/ev':>12}{'saved':>9}")
+    for name, before_build, after_build in (
+        ("fresh", _fresh_dicts, lambda k: make_events(1, k)),
+        ("recovered", _recovered_dicts, _recovered_records),
+    ):
+        before = measure(before_build, _hold_dicts, n)
+        after = measure(after_build, _hold_records, n)
+        print(f"{name:<12}{before:>13,.0f}{after:>12,.0f}{(1 - after / before) * 100:>8.0f}%")
+
+    buf = _hold_records(make_events(1, n))
+    est = buf.footprint()
+    print(f"\nInFlightBuffer.footprint() estimate: {est['bytes_per_event']:,} B/ev")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Match simulator: events/sec by concurrency, plus a coherence check.
+
+  throughput — MatchSimulator.take() in 2,000-event batches (one pacer batch)
+               at several concurrent-match counts, next to make_events()
+  coherence  — replays a run and checks every completed match: two
+               match_started, then only card_played / snap_triggered, then two
+               match_ended; the same two players throughout; win + loss or
+               win + retreat; at most two snaps; matching final snap_cubes
+
+Usage (from zerobus-snap-demo/):
+    python scripts/bench_match_sim.py [--seconds 2] [--matches 1000,10000,100000]
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import Counter, defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from server.events import make_events  # noqa: E402
+from server.match_sim import MatchSimulator  # noqa: E402
+
+BATCH = 2000
+
+
+def _rate(fn, seconds: float) -> float:
+    n, t0 = 0, time.perf_counter()
+    while time.perf_counter() - t0 < seconds:
+        n += len(fn())
+    return n / (time.perf_counter() - t0)
+
+
+def check_coherence(matches: int, events: int) -> None:
+    sim = MatchSimulator(matches, seed=7)
+    by_match = defaultdict(list)
+    for ev in sim.take(1, events):
+        by_match[ev.match_id].append(ev)
+
+    complete = bad = 0
+    for evs in by_match.values():
+        types = [e.event_type for e in evs]
+        if types[-2:] != ["match_ended", "match_ended"]:
+            continue  # still live at the end of the run
+        complete += 1
+        start, body, end = evs[:2], evs[2:-2], evs[-2:]
+        players = {e.player_id for e in start}
+        ok = (
+            [e.event_type for e in start] == ["match_started"] * 2
+            and all(e.event_type in ("card_played", "snap_triggered") for e in body)
+            and len(players) == 2
+            and {e.player_id for e in evs} == players
+            and sorted(e.result for e in end) in (["loss", "win"], ["retreat", "win"])
+            and all(e.result == "pending" for e in start + body)
+            and sum(e.event_type == "snap_triggered" for e in body) <= 2
+            and end[0].snap_cubes == end[1].snap_cubes
+        )
+        bad += not ok
+
+    mix = Counter(ev.event_type for evs in by_match.values() for ev in evs)
+    total = sum(mix.values())
+    print(f"coherence: {complete:,} completed matches of {len(by_match):,}, {bad} inconsistent")
+    print("  mix: " + ", ".join(f"{t} {c / total:.1%}" for t, c in mix.most_common()))
+    print(f"  stats: {sim.stats()}\n")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--seconds", type=float, default=2.0)
+    ap.add_argument("--matches", default="1000,10000,100000")
+    args = ap.parse_args()
+
+    check_coherence(1000, 200_000)
+
+    print(f"{'source':<28}{'setup ms':>10}{'events/sec':>14}")
+    print(f"{'make_events (random)':<28}{'':>10}{_rate(lambda: make_events(1, BATCH), args.seconds):>14,.0f}")
+    for m in (int(x) for x in args.matches.split(",") if x):
+        t0 = time.perf_counter()
+        sim = MatchSimulator(m)
+        setup = (time.perf_counter() - t0) * 1000
+        sim.take(1, min(m * 4, 200_000))  # past the start-up wave of match_started
+        rate = _rate(lambda: sim.take(1, BATCH), args.seconds)
+        print(f"{f'MatchSimulator({m:,})':<28}{setup:>10.0f}{rate:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Throughput benchmark and soak test for ProducerManager's real-mode path.
+
+Runs the producer in-process against the local fake SDK (ZEROBUS_FAKE=1,
+see server/fake_zerobus.py), so streams, ack callbacks, sharding and the
+in-flight buffers are exercised exactly as in production, minus the network.
+
+  sweep — optional: step the target rate up and report the highest rate the
+          producer sustains (achieved ≥ 97% of target with acks keeping up)
+  soak  — run at --rate for --duration seconds, printing a row every
+          --interval seconds: achieved events/sec, ack latency percentiles,
+          CPU µs per event and RSS growth since the start; with --source the
+          soak replays a recorded event file (JSONL or Parquet) at --speed ×
+          its recorded timing instead of generating events at --rate
+
+--matches N generates events from N simulated concurrent matches
+(server/match_sim.py) instead of independent random ones, in both modes.
+
+Usage (from zerobus-snap-demo/):
+    python scripts/bench_producer.py [--rate 5000] [--duration 600] [--shards 1]
+        [--workers 0] [--sweep 1000,5000,10000,20000,50000]
+        [--latency-ms 20] [--jitter-ms 10] [--error-rate 0] [--max-inflight N]
+        [--source recordings/events.jsonl --speed 10 [--loop]] [--matches 100000]
+"""
+
+import argparse
+import asyncio
+import os
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def _rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        # Peak rather than current outside Linux (KiB on Linux, bytes on macOS)
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss / 2**20 if sys.platform == "darwin" else rss / 1024
+
+
+def _configure_env(args: argparse.Namespace) -> None:
+    os.environ["ZEROBUS_FAKE"] = "1"
+    os.environ.setdefault("DATABRICKS_APP_NAME", "bench")  # skip profile lookup
+    os.environ["ZEROBUS_FAKE_LATENCY_MS"] = str(args.latency_ms)
+    os.environ["ZEROBUS_FAKE_JITTER_MS"] = str(args.jitter_ms)
+    os.environ["ZEROBUS_FAKE_ERROR_RATE"] = str(args.error_rate)
+    os.environ["ZEROBUS_FAKE_CONNECT_MS"] = "0"
+    if args.max_inflight:
+        os.environ["ZEROBUS_FAKE_MAX_INFLIGHT"] = str(args.max_inflight)
+
+
+async def _measure(mgr, seconds: float) -> dict:
+    s = mgr.stats
+    sent0, acked0 = s.events_sent, s.events_acked
+    cpu0, t0 = time.process_time(), time.perf_counter()
+    await asyncio.sleep(seconds)
+    elapsed = time.perf_counter() - t0
+    sent, acked = s.events_sent - sent0, s.events_acked - acked0
+    return {
+        "sent_per_sec": sent / elapsed,
+        "acked_per_sec": acked / elapsed,
+        "cpu_us_per_event": (time.process_time() - cpu0) / sent * 1e6 if sent else 0.0,
+        "in_flight": s.events_in_flight,
+    }
+
+
+async def sweep(mgr, rates, step_seconds: float, shards: int, workers: int, matches: int = 0) -> None:
+    print(f"{'target':>10}{'sent/s':>12}{'acked/s':>12}{'cpu µs/ev':>11}{'in-flight':>11}{'p99 ms':>9}")
+    best = 0
+    for rate in rates:
+        await mgr.start(rate=rate, shards=shards, workers=workers, matches=matches)
+        await asyncio.sleep(1.0)  # warm-up: connect, fill the pipeline
+        m = await _measure(mgr, step_seconds)
+        p99 = mgr.ingest_to_ack.percentile(0.99)
+        await mgr.stop()
+        ok = m["acked_per_sec"] >= 0.97 * rate
+        if ok:
+            best = rate
+        print(f"{rate:>10,}{m['sent_per_sec']:>12,.0f}{m['acked_per_sec']:>12,.0f}"
+              f"{m['cpu_us_per_event']:>11.1f}{m['in_flight']:>11,}{p99:>9.1f}{'' if ok else '  ✗'}")
+    print(f"sustainable: {best:,} events/sec\n")
+
+
+async def soak(
+    mgr, rate: int, duration: float, interval: float, shards: int, workers: int,
+    source=None, matches: int = 0,
+) -> None:
+    await mgr.start(rate=rate, shards=shards, workers=workers, source=source, matches=matches)
+    await asyncio.sleep(1.0)
+    rss0 = _rss_mb()
+    pace = f"replaying {source.path} at {source.speed:g}x" if source else f"at {rate:,} ev/s"
+    sim = f", {matches:,} simulated matches" if matches else ""
+    print(f"soak {pace} for {duration:.0f}s ({shards} shard(s), {workers} worker(s){sim})")
+    print(f"{'t':>6}{'sent/s':>10}{'acked/s':>10}{'p50':>8}{'p95':>8}{'p99':>8}{'max':>9}"
+          f"{'cpu µs/ev':>11}{'rss MB':>9}{'Δrss':>8}")
+    t_start = time.perf_counter()
+    while time.perf_counter() - t_start < duration:
+        m = await _measure(mgr, min(interval, duration - (time.perf_counter() - t_start)))
+        lat = mgr.ingest_to_ack.snapshot()
+        rss = _rss_mb()
+        print(f"{time.perf_counter() - t_start:>6.0f}{m['sent_per_sec']:>10,.0f}{m['acked_per_sec']:>10,.0f}"
+              f"{lat['p50']:>8.1f}{lat['p95']:>8.1f}{lat['p99']:>8.1f}{lat['max']:>9.1f}"
+              f"{m['cpu_us_per_event']:>11.1f}{rss:>9.1f}{rss - rss0:>+8.1f}")
+    if source:
+        src = source.stats()
+        print(f"source: {src['rows_emitted']:,} rows, {src['replayed_s']}s recorded, "
+              f"lag {src['lag_ms']} ms, bad rows {src['bad_rows']}, exhausted {src['exhausted']}")
+    s = mgr.stats
+    await mgr.stop()
+    print(f"\ntotal sent {s.events_sent:,}  acked {s.events_acked:,}  failed {s.events_failed:,}")
+    print(f"ingest→ack  {mgr.ingest_to_ack.snapshot()}")
+    print(f"produce→ack {mgr.produce_to_ack.snapshot()}")
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    from server.producer import producer_manager as mgr
+    from server.recorded_source import RecordedEventSource
+
+    if args.sweep:
+        rates = [int(r) for r in args.sweep.split(",") if r]
+        await sweep(mgr, rates, args.step_seconds, args.shards, args.workers, args.matches)
+    if args.duration > 0:
+        source = RecordedEventSource(args.source, args.speed, args.loop) if args.source else None
+        await soak(mgr, args.rate, args.duration, args.interval, args.shards, args.workers, source, args.matches)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rate", type=int, default=5000)
+    ap.add_argument("--duration", type=float, default=600.0, help="soak seconds (0 = skip)")
+    ap.add_argument("--interval", type=float, default=10.0)
+    ap.add_argument("--shards", type=int, default=1)
+    ap.add_argument("--workers", type=int, default=0)
+    ap.add_argument("--sweep", default="", help="comma-separated target rates")
+    ap.add_argument("--step-seconds", type=float, default=5.0)
+    ap.add_argument("--latency-ms", type=float, default=20.0)
+    ap.add_argument("--jitter-ms", type=float, default=10.0)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--max-inflight", type=int, default=0)
+    ap.add_argument("--source", default="", help="recorded event file to replay in the soak")
+    ap.add_argument("--speed", type=float, default=1.0, help="replay speed multiplier (1–100)")
+    ap.add_argument("--loop", action="store_true", help="restart the recording at its end")
+    ap.add_argument("--matches", type=int, default=0, help="simulated concurrent matches (0 = random events)")
+    args = ap.parse_args()
+
+    _configure_env(args)
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Microbenchmark: generic vs compiled protobuf encoding, per registered schema.
+
+  generic          TableSchema.encode_generic — a loop over the fields with
+                   dict.get() and type coercion per field
+  compiled dict    TableSchema.encode_dict — the generated encoder for a dict
+  compiled record  TableSchema.encode_record — the generated encoder reading
+                   EventRecord attributes (what the producer sends with)
+
+For game_events the current encoder is _make_proto_payload, and "vs current"
+is measured against it; other schemas have no earlier encoder, so theirs is
+against generic.  The producer does not run any of these on the send path
+for game_events: every EventRecord carries its serialized GameEvent from
+generation (events.py), and ProducerManager._wire sends that as-is.  The
+compiled encoders serve the other registered schemas only.
+
+Every encoder's output is checked byte-for-byte against encode_generic.
+
+Usage (from zerobus-snap-demo/):
+    python scripts/bench_schema_encoders.py [--seconds 1] [--events 20000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from server.events import _make_proto_payload, make_events  # noqa: E402
+from server.schemas import schema_registry  # noqa: E402
+
+
+def _rate(fn, items, seconds: float) -> float:
+    n, t0 = 0, time.perf_counter()
+    while time.perf_counter() - t0 < seconds:
+        for item in items:
+            fn(item)
+        n += len(items)
+    return n / (time.perf_counter() - t0)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--seconds", type=float, default=1.0)
+    ap.add_argument("--events", type=int, default=20_000)
+    args = ap.parse_args()
+
+    records = make_events(1, args.events)
+    dicts = [r.to_dict() for r in records]
+
+    current = {"game_events": _rate(_make_proto_payload, dicts, args.seconds)}
+    print(f"{'schema':<22}{'fields':>7}{'generic':>12}{'current':>12}{'dict':>12}{'record':>12}"
+          f"{'vs current':>12}")
+    for info in schema_registry.describe():
+        schema = schema_registry.get(info["name"], info["version"])
+        # The dict encoder wants exactly the schema's fields
+        projected = [{f: d[f] for f in schema.field_names} for d in dicts]
+        for rec, d in zip(records[:100], projected):
+            ref = schema.encode_generic(d)
+            assert schema.encode_dict(d) == ref and schema.encode_record(rec) == ref, schema.key
+
+        generic = _rate(schema.encode_generic, projected, args.seconds)
+        compiled_dict = _rate(schema.encode_dict, projected, args.seconds)
+        compiled_record = _rate(schema.record_encoder(), records, args.seconds)
+        baseline = current.get(schema.name, generic)
+        print(f"{schema.key:<22}{len(schema.fields):>7}{generic:>12,.0f}"
+              f"{current.get(schema.name, 0):>12,.0f}{compiled_dict:>12,.0f}"
+              f"{compiled_record:>12,.0f}{compiled_record / baseline:>11.2f}×")
+    print("\ncurrent: _make_proto_payload for game_events (the producer itself sends the"
+          " payload built at generation); 0 = no earlier encoder, compared with generic")
+
+
+if __name__ == "__main__":
+    main()
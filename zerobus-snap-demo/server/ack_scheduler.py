@@ -0,0 +1,92 @@
+"""
+Timer-wheel scheduler for demo-mode acks and rejections.
+
+Demo mode used to start one asyncio task (and one sleep timer) per simulated
+ack, i.e. thousands of live tasks at spike rates.  AckScheduler instead drops
+each callback into a slot of a hashed timing wheel and a single task wakes
+every `tick`, firing everything that has come due as one batch.
+
+Delays are rounded *up* to the next tick, so the 50–150 ms ack latency
+distribution is preserved to within one tick (5 ms by default).  A callback
+scheduled further out than one revolution just stays in its slot until the
+wheel comes round to its due tick.
+"""
+
+import asyncio
+import math
+import time
+from typing import Any, Callable, List, Optional, Tuple
+
+_Entry = Tuple[int, Callable[..., Any], tuple]  # (due tick, callback, args)
+
+
+class AckScheduler:
+    def __init__(self, tick: float = 0.005, slots: int = 512) -> None:
+        self.tick = tick
+        self._slots: List[List[_Entry]] = [[] for _ in range(slots)]
+        self._cur = self._now_tick()
+        self._task: Optional[asyncio.Task] = None
+        self.pending = 0
+        self.fired = 0
+        self.max_batch = 0
+
+    def schedule(self, delay: float, callback: Callable[..., Any], *args: Any) -> None:
+        """Run callback(*args) on the event loop after roughly `delay` seconds."""
+        if not self.pending:
+            self._cur = self._now_tick()  # idle wheel: skip the empty gap
+        due = max(self._cur + 1, math.ceil((time.monotonic() + delay) / self.tick))
+        self._slots[due % len(self._slots)].append((due, callback, args))
+        self.pending += 1
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def drain(self) -> None:
+        """Fire every pending callback now, in due order, as if all had come due."""
+        due = sorted((e for slot in self._slots for e in slot), key=lambda e: e[0])
+        self.clear()
+        self._fire(due)
+
+    def clear(self) -> None:
+        for slot in self._slots:
+            slot.clear()
+        self.pending = 0
+
+    def stats(self) -> dict:
+        return {"pending": self.pending, "fired": self.fired, "max_batch": self.max_batch}
+
+    # ── Internals ──────────────────────────────────────────────────────────────
+
+    def _now_tick(self) -> int:
+        return int(time.monotonic() / self.tick)
+
+    async def _run(self) -> None:
+        while self.pending:
+            await asyncio.sleep(self.tick)
+            self._advance(self._now_tick())
+
+    def _advance(self, target: int) -> None:
+        n = len(self._slots)
+        due: List[_Entry] = []
+        # After a stall longer than one revolution every slot needs a visit once
+        for t in range(self._cur + 1, self._cur + 1 + min(target - self._cur, n)):
+            slot = self._slots[t % n]
+            if not slot:
+                continue
+            keep = [e for e in slot if e[0] > target]
+            if len(keep) != len(slot):
+                due.extend(e for e in slot if e[0] <= target)
+                self._slots[t % n] = keep
+        self._cur = max(self._cur, target)
+        self.pending -= len(due)
+        self._fire(due)
+
+    def _fire(self, due: List[_Entry]) -> None:
+        if not due:
+            return
+        self.fired += len(due)
+        self.max_batch = max(self.max_batch, len(due))
+        for _, callback, args in due:
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"Ack scheduler callback error: {e}")
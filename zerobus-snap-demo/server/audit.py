@@ -0,0 +1,436 @@
+"""
+Delivery audit — duplicates and gaps in what actually reached the ingest table.
+
+At-least-once means a kill/resume may write an event twice, and a bug could
+lose one.  DeliveryAudit tracks every sequence number the producer sends and
+how each send was resolved:
+
+  sent      first sends (resends of the same event are not new sends)
+  resolved  acked, failed or dropped (unacked when the producer stopped)
+  failed    failed or dropped — not expected in the table
+
+All three are SeqRanges, a run-length compressed bitmap: sorted [start, end] runs,
+so a million consecutive acks cost one run.  Event ids of first sends go
+into a two-generation Bloom filter.  It counts ids sent again as new events,
+e.g. a looped recording.  Ids are probed in NumPy batches, and memory stays
+at two filters of `bloom_capacity` ids.
+
+Reconciliation runs every `interval` seconds.  It scans only the sequence
+numbers past the last watermark, up to the settled point: the highest
+number at or below which every send was resolved at least `settle`
+seconds ago, so acked rows have had time to become visible in Delta.  One
+query returns the table's islands of consecutive sequence_num with their
+row counts (gaps-and-islands), which is as compact as SeqRanges itself.
+
+sequence_num starts again at 1 in a new process without a WAL or cluster
+allocator, so earlier runs on the same host reuse the same numbers.  The
+scan is therefore bounded to this audit's run: produced_at at or after the
+first send it tracked, which also lets Delta skip older files, and sequence
+numbers from the first tracked one up.  The tallies are:
+
+    duplicate rows  rows − distinct sequence numbers, per island
+    gaps            acked sequence numbers no island covers
+    unexpected      rows for sequence numbers never acked (dropped or failed
+                    sends that landed anyway)
+
+Runs at or below the watermark are then forgotten, which keeps memory bounded
+however long the producer runs.  Without a table to query (demo mode, the
+fake SDK, a schema without sequence_num) the watermark follows the settled
+point and only producer-side figures are reported.
+
+Tuning (env):
+    PRODUCER_AUDIT_INTERVAL   seconds between reconciliations    (default 15)
+    PRODUCER_AUDIT_SETTLE     seconds a resolved send must age   (default 30)
+"""
+
+import asyncio
+import math
+import os
+import threading
+import time
+from bisect import bisect_right
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+MAX_RUNS = 50_000            # per SeqRanges; beyond it the oldest runs are dropped
+MAX_ISLANDS = 10_000         # rows per reconciliation query
+MAX_SCAN = 5_000_000         # sequence numbers per reconciliation query
+MAX_GAPS_KEPT = 20           # missing runs listed in stats
+
+QueryFn = Callable[[str], Awaitable[List[Dict[str, Any]]]]
+
+
+class SeqRanges:
+    """A set of ints as sorted, disjoint, non-adjacent [start, end] runs."""
+
+    def __init__(self) -> None:
+        self._starts: List[int] = []
+        self._ends: List[int] = []
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, seq: int) -> bool:
+        i = bisect_right(self._starts, seq) - 1
+        return i >= 0 and seq <= self._ends[i]
+
+    @property
+    def runs(self) -> int:
+        return len(self._starts)
+
+    def first(self) -> Optional[int]:
+        return self._starts[0] if self._starts else None
+
+    def last(self) -> Optional[int]:
+        return self._ends[-1] if self._ends else None
+
+    def add(self, seq: int) -> bool:
+        """Add seq; False if it was already present."""
+        starts, ends = self._starts, self._ends
+        if ends and seq == ends[-1] + 1:
+            # In-order appends, the common case, extend the last run
+            ends[-1] = seq
+            self.count += 1
+            return True
+        i = bisect_right(starts, seq) - 1
+        if i >= 0 and seq <= ends[i]:
+            return False
+        joins_left = i >= 0 and ends[i] == seq - 1
+        joins_right = i + 1 < len(starts) and starts[i + 1] == seq + 1
+        if joins_left and joins_right:
+            ends[i] = ends[i + 1]
+            del starts[i + 1], ends[i + 1]
+        elif joins_left:
+            ends[i] = seq
+        elif joins_right:
+            starts[i + 1] = seq
+        else:
+            starts.insert(i + 1, seq)
+            ends.insert(i + 1, seq)
+        self.count += 1
+        return True
+
+    def ranges(self, lo: int, hi: int) -> List[Tuple[int, int]]:
+        """Runs clipped to [lo, hi]."""
+        starts, ends = self._starts, self._ends
+        out = []
+        for i in range(max(0, bisect_right(starts, lo) - 1), len(starts)):
+            if starts[i] > hi:
+                break
+            a, b = max(starts[i], lo), min(ends[i], hi)
+            if a <= b:
+                out.append((a, b))
+        return out
+
+    def first_not_in(self, other: "SeqRanges", lo: int) -> Optional[int]:
+        """The lowest member above lo that `other` lacks, if any."""
+        starts, ends = self._starts, self._ends
+        for i in range(max(0, bisect_right(starts, lo) - 1), len(starts)):
+            a, b = max(starts[i], lo + 1), ends[i]
+            while a <= b:
+                j = bisect_right(other._starts, a) - 1
+                if j < 0 or other._ends[j] < a:
+                    return a
+                a = other._ends[j] + 1
+        return None
+
+    def discard_through(self, seq: int) -> None:
+        """Forget every member ≤ seq."""
+        starts, ends = self._starts, self._ends
+        i = bisect_right(starts, seq)
+        if i and ends[i - 1] > seq:
+            # The run straddling seq keeps its upper part
+            self.count -= seq - starts[i - 1] + 1
+            starts[i - 1] = seq + 1
+            i -= 1
+        self.count -= sum(b - a + 1 for a, b in zip(starts[:i], ends[:i]))
+        del starts[:i], ends[:i]
+
+    def trim_runs(self, max_runs: int) -> int:
+        """Drop the oldest runs beyond max_runs; returns how many members went."""
+        excess = len(self._starts) - max_runs
+        if excess <= 0:
+            return 0
+        dropped = sum(b - a + 1 for a, b in zip(self._starts[:excess], self._ends[:excess]))
+        del self._starts[:excess], self._ends[:excess]
+        self.count -= dropped
+        return dropped
+
+    def nbytes(self) -> int:
+        # Two list slots plus (mostly) two distinct int objects per run
+        return self.runs * 2 * (8 + 32)
+
+
+def subtract(ranges: List[Tuple[int, int]], cover: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Sorted runs of `ranges` that no run of `cover` (sorted, disjoint) covers."""
+    out = []
+    j = 0
+    for a, b in ranges:
+        while j < len(cover) and cover[j][1] < a:
+            j += 1
+        k = j
+        while a <= b:
+            if k >= len(cover) or cover[k][0] > b:
+                out.append((a, b))
+                break
+            ca, cb = cover[k]
+            if ca > a:
+                out.append((a, ca - 1))
+            a = max(a, cb + 1)
+            k += 1
+    return out
+
+
+class BloomFilter:
+    """Bit-packed Bloom filter over strings, probed and filled in NumPy batches."""
+
+    def __init__(self, capacity: int, fp_rate: float = 0.01) -> None:
+        self.capacity = capacity
+        self.m = max(64, math.ceil(-capacity * math.log(fp_rate) / math.log(2) ** 2))
+        self.k = max(1, round(self.m / capacity * math.log(2)))
+        self.bits = np.zeros((self.m + 7) // 8, np.uint8)
+        self.count = 0
+        self._rounds = np.arange(self.k, dtype=np.uint64)
+
+    def _positions(self, keys: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        h = np.fromiter((hash(key) for key in keys), np.int64, len(keys)).view(np.uint64)
+        # Double hashing: probe i is h1 + i·h2 (h2 odd, so probes never collapse)
+        h1, h2 = h & np.uint64(0xFFFFFFFF), (h >> np.uint64(32)) | np.uint64(1)
+        pos = (h1[:, None] + self._rounds[None, :] * h2[:, None]) % np.uint64(self.m)
+        return pos >> np.uint64(3), np.left_shift(1, (pos & np.uint64(7)).astype(np.uint8)).astype(np.uint8)
+
+    def contains(self, keys: List[str]) -> np.ndarray:
+        byte, mask = self._positions(keys)
+        return ((self.bits[byte] & mask) != 0).all(axis=1)
+
+    def add(self, keys: List[str]) -> np.ndarray:
+        """Insert keys; returns which were (probably) present already."""
+        byte, mask = self._positions(keys)
+        present = ((self.bits[byte] & mask) != 0).all(axis=1)
+        np.bitwise_or.at(self.bits, byte.ravel(), mask.ravel())
+        self.count += len(keys)
+        return present
+
+
+class DeliveryAudit:
+    def __init__(
+        self,
+        interval: float = 15.0,
+        settle: float = 30.0,
+        bloom_capacity: int = 1_000_000,
+        bloom_fp_rate: float = 0.01,
+    ) -> None:
+        self.interval = interval
+        self.settle = settle
+        self._lock = threading.Lock()  # acks arrive on the SDK's thread
+        self.sent = SeqRanges()
+        self.resolved = SeqRanges()
+        self.failed = SeqRanges()
+        self._bloom_capacity = bloom_capacity
+        self._bloom_fp_rate = bloom_fp_rate
+        self._ids = BloomFilter(bloom_capacity, bloom_fp_rate)
+        self._old_ids: Optional[BloomFilter] = None
+        self._pending_ids: List[str] = []
+        self._settled: Deque[Tuple[float, int]] = deque()  # (monotonic, settled point)
+        self.watermark = 0
+        # The run being audited: its first sequence number and produced_at (µs)
+        self.first_seq: Optional[int] = None
+        self.run_start_us: Optional[int] = None
+
+        self.sent_total = 0
+        self.acked_total = 0
+        self.failed_total = 0
+        self.dropped_total = 0
+        self.duplicate_ids = 0
+        self.trimmed = 0
+        # Reconciliation against the table
+        self.mode = "local"
+        self.passes = 0
+        self.rows_scanned = 0
+        self.duplicate_rows = 0
+        self.missing = 0
+        self.unexpected = 0
+        self.gaps: Deque[Tuple[int, int]] = deque(maxlen=MAX_GAPS_KEPT)
+        self.oldest_missing: Optional[int] = None
+        self.last_ms = 0.0
+        self.last_error = ""
+
+    @classmethod
+    def from_env(cls) -> "DeliveryAudit":
+        return cls(
+            interval=float(os.environ.get("PRODUCER_AUDIT_INTERVAL", 15)),
+            settle=float(os.environ.get("PRODUCER_AUDIT_SETTLE", 30)),
+        )
+
+    # ── Producer hooks ─────────────────────────────────────────────────────────
+
+    def on_sent(self, seq: int, event_id: str, produced_us: int) -> None:
+        with self._lock:
+            self.sent.add(seq)
+            if self.first_seq is None or seq < self.first_seq:
+                self.first_seq = seq
+            if self.run_start_us is None or produced_us < self.run_start_us:
+                self.run_start_us = produced_us
+        self.sent_total += 1
+        self._pending_ids.append(event_id)
+
+    def on_ack(self, seq: int) -> None:
+        with self._lock:
+            self.resolved.add(seq)
+        self.acked_total += 1
+
+    def on_failed(self, seq: int, dropped: bool = False) -> None:
+        with self._lock:
+            self.resolved.add(seq)
+            self.failed.add(seq)
+        if dropped:
+            self.dropped_total += 1
+        else:
+            self.failed_total += 1
+
+    def flush_ids(self) -> None:
+        """Probe and insert the event ids sent since the last call."""
+        ids = self._pending_ids
+        if not ids:
+            return
+        self._pending_ids = []
+        present = self._ids.add(ids)
+        if self._old_ids is not None:
+            present |= self._old_ids.contains(ids)
+        self.duplicate_ids += int(present.sum()) + len(ids) - len(set(ids))
+        if self._ids.count >= self._bloom_capacity:
+            # Forget the older generation; ids stay checkable for 1–2 × capacity sends
+            self._old_ids = self._ids
+            self._ids = BloomFilter(self._bloom_capacity, self._bloom_fp_rate)
+
+    # ── Reconciliation ─────────────────────────────────────────────────────────
+
+    def settled_point(self) -> int:
+        """Highest sequence number at or below which every send has been resolved."""
+        with self._lock:
+            first = self.sent.first_not_in(self.resolved, self.watermark)
+            if first is not None:
+                return first - 1
+            return max(self.watermark, self.sent.last() or 0, self.resolved.last() or 0)
+
+    def _aged_settled_point(self) -> int:
+        now = time.monotonic()
+        self._settled.append((now, self.settled_point()))
+        point = self.watermark
+        while self._settled and now - self._settled[0][0] >= self.settle:
+            point = max(point, self._settled.popleft()[1])
+        return point
+
+    async def reconcile(self, query: Optional[QueryFn] = None, table: str = "", host: str = "") -> None:
+        """One pass: reconcile (watermark, settled] against `table`, or just advance locally."""
+        self.flush_ids()
+        hi = self._aged_settled_point()
+        if hi <= self.watermark:
+            return
+        if query is None or not table:
+            self.mode = "local"
+            self._advance(hi)
+            return
+        self.mode = "table"
+        # Nothing below the run's first send is ours to account for
+        lo = max(self.watermark, (self.first_seq or 1) - 1)
+        hi = min(hi, lo + MAX_SCAN)
+        if hi <= lo:
+            self._advance(hi)
+            return
+        t0 = time.perf_counter()
+        try:
+            rows = await query(self._islands_sql(table, host, lo, hi, self.run_start_us or 0))
+        except Exception as e:
+            self.last_error = str(e)[:500]
+            return
+        finally:
+            self.last_ms = (time.perf_counter() - t0) * 1000
+        islands = [(int(r["lo"]), int(r["hi"]), int(r["rows"])) for r in rows]
+        if len(islands) >= MAX_ISLANDS:
+            # Truncated: the last island may continue past it, so stop before it
+            hi = islands[-1][0] - 1
+            islands = islands[:-1]
+        self._tally(lo, hi, islands)
+        self._advance(hi)
+        self.passes += 1
+        self.last_error = ""
+
+    @staticmethod
+    def _islands_sql(table: str, host: str, lo: int, hi: int, since_us: int) -> str:
+        host_filter = f" AND host = '{host}'" if host else ""
+        return (
+            f"SELECT MIN(sequence_num) AS lo, MAX(sequence_num) AS hi, SUM(n) AS rows FROM ("
+            f"SELECT sequence_num, n, sequence_num - ROW_NUMBER() OVER (ORDER BY sequence_num) AS grp FROM ("
+            f"SELECT sequence_num, COUNT(*) AS n FROM {table} "
+            f"WHERE produced_at >= {since_us} AND sequence_num > {lo} AND sequence_num <= {hi}{host_filter} "
+            f"GROUP BY sequence_num)) "
+            f"GROUP BY grp ORDER BY lo LIMIT {MAX_ISLANDS}"
+        )
+
+    def _tally(self, lo: int, hi: int, islands: List[Tuple[int, int, int]]) -> None:
+        cover = [(a, b) for a, b, _ in islands]
+        with self._lock:
+            expected = subtract(self.resolved.ranges(lo + 1, hi), self.failed.ranges(lo + 1, hi))
+        missing = subtract(expected, cover)
+        unexpected = subtract(cover, expected)
+        self.rows_scanned += sum(n for _, _, n in islands)
+        self.duplicate_rows += sum(n - (b - a + 1) for a, b, n in islands)
+        self.missing += sum(b - a + 1 for a, b in missing)
+        self.unexpected += sum(b - a + 1 for a, b in unexpected)
+        self.gaps.extend(missing)
+        if missing and self.oldest_missing is None:
+            self.oldest_missing = missing[0][0]
+
+    def _advance(self, hi: int) -> None:
+        """Move the watermark to hi and forget everything at or below it."""
+        self.watermark = hi
+        with self._lock:
+            for ranges in (self.sent, self.resolved, self.failed):
+                ranges.discard_through(hi)
+                self.trimmed += ranges.trim_runs(MAX_RUNS)
+
+    async def run(self, target: Callable[[], Tuple[Optional[QueryFn], str, str]]) -> None:
+        """Reconcile every `interval` seconds; target() → (query, table, host) for each pass."""
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.reconcile(*target())
+
+    # ── Stats ──────────────────────────────────────────────────────────────────
+
+    def stats(self) -> Dict[str, Any]:
+        self.flush_ids()
+        with self._lock:
+            oldest_unresolved = self.sent.first_not_in(self.resolved, self.watermark)
+            runs = self.sent.runs + self.resolved.runs + self.failed.runs
+            range_bytes = self.sent.nbytes() + self.resolved.nbytes() + self.failed.nbytes()
+        bloom_bytes = self._ids.bits.nbytes + (self._old_ids.bits.nbytes if self._old_ids is not None else 0)
+        if self.mode == "table" and self.rows_scanned:
+            duplicate_rate = self.duplicate_rows / self.rows_scanned
+        else:
+            duplicate_rate = self.duplicate_ids / self.sent_total if self.sent_total else 0.0
+        return {
+            "mode": self.mode,
+            "sent": self.sent_total,
+            "acked": self.acked_total,
+            "failed": self.failed_total,
+            "dropped": self.dropped_total,
+            "watermark": self.watermark,
+            "oldest_unacked_seq": oldest_unresolved,
+            "duplicate_rate": round(duplicate_rate, 6),
+            "duplicate_rows": self.duplicate_rows,
+            "duplicate_ids": self.duplicate_ids,
+            "gap_count": self.missing,
+            "oldest_missing_seq": self.oldest_missing,
+            "recent_gaps": [list(g) for g in self.gaps],
+            "unexpected_rows": self.unexpected,
+            "rows_scanned": self.rows_scanned,
+            "passes": self.passes,
+            "last_query_ms": round(self.last_ms, 1),
+            "last_error": self.last_error,
+            "memory": {"runs": runs, "range_bytes": range_bytes, "bloom_bytes": bloom_bytes,
+                       "trimmed": self.trimmed},
+        }
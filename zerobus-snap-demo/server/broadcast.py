@@ -0,0 +1,134 @@
+"""
+Stats broadcaster for /ws/producer.
+
+One task builds and serializes a snapshot per tick and fans the text out to
+every connected dashboard, so N viewers cost one stats_dict() and at most two
+json.dumps() per tick instead of N of each.
+
+Wire format:
+    {"type": "full",  "stats": {...}}                 first frame / resync
+    {"type": "delta", "changed": {...}, "log": [...]}  afterwards
+
+"changed" holds only the top-level stats keys whose value differs from the
+previous tick; "log" holds event-log entries added since then, newest first.
+Empty deltas are still sent each tick as a keepalive.
+
+Snapshots come from the cluster coordinator, so a dashboard connected to any
+uvicorn worker sees the leader worker's producer (see cluster.py).
+
+Each client has a small bounded queue.  A client that falls behind has frames
+dropped rather than buffered; since a dropped delta leaves it inconsistent,
+its next frame is a full snapshot.
+"""
+
+import asyncio
+import json
+from typing import Any, Dict, Optional
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+from .cluster import ClusterCoordinator, coordinator
+
+
+class _Client:
+    def __init__(self, queue_size: int) -> None:
+        self.queue: "asyncio.Queue[str]" = asyncio.Queue(maxsize=queue_size)
+        self.needs_full = True
+
+
+class StatsBroadcaster:
+    def __init__(self, source: ClusterCoordinator, interval: float = 0.25, queue_size: int = 4) -> None:
+        self.source = source
+        self.interval = interval
+        self.queue_size = queue_size
+        self._clients: Dict[WebSocket, _Client] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._prev: Dict[str, Any] = {}
+        self._log_total = 0
+
+        self.ticks = 0
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        self.bytes_sent = 0
+
+    async def serve(self, websocket: WebSocket) -> None:
+        """Stream frames to an accepted websocket until it disconnects."""
+        client = _Client(self.queue_size)
+        self._clients[websocket] = client
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        try:
+            while True:
+                text = await client.queue.get()
+                await websocket.send_text(text)
+                self.frames_sent += 1
+                self.bytes_sent += len(text)
+        except WebSocketDisconnect:
+            pass
+        except Exception:
+            pass
+        finally:
+            self._clients.pop(websocket, None)
+
+    def stats(self) -> dict:
+        return {
+            "clients": len(self._clients),
+            "ticks": self.ticks,
+            "frames_sent": self.frames_sent,
+            "frames_dropped": self.frames_dropped,
+            "bytes_sent": self.bytes_sent,
+        }
+
+    # ── Internals ──────────────────────────────────────────────────────────────
+
+    async def _run(self) -> None:
+        while self._clients:
+            try:
+                self._tick()
+            except Exception as e:
+                print(f"Broadcast error: {e}")
+            await asyncio.sleep(self.interval)
+        # Last viewer left — the next one starts from a fresh baseline
+        self._prev = {}
+
+    def _tick(self) -> None:
+        self.ticks += 1
+        snap = self.source.stats_dict()
+        log = snap.pop("event_log", [])  # newest first, at most 50
+        n = min(snap["log_total"] - self._log_total, len(log))
+        new_log = log[:n] if n > 0 else []
+        self._log_total = snap["log_total"]
+
+        changed = {k: v for k, v in snap.items() if self._prev.get(k, _MISSING) != v}
+        self._prev = snap
+        # Sent even when empty: it doubles as the keepalive that notices closed sockets
+        delta_text = _dumps({"type": "delta", "changed": changed, "log": new_log})
+        full_text = None
+
+        for client in list(self._clients.values()):
+            if client.needs_full:
+                if full_text is None:
+                    full_text = _dumps({
+                        "type": "full",
+                        "stats": {**snap, "event_log": log},
+                    })
+                text = full_text
+            else:
+                text = delta_text
+            try:
+                client.queue.put_nowait(text)
+                client.needs_full = False
+            except asyncio.QueueFull:
+                self.frames_dropped += 1
+                client.needs_full = True
+
+
+_MISSING = object()
+
+
+def _dumps(frame: dict) -> str:
+    return json.dumps(frame, separators=(",", ":"), ensure_ascii=False)
+
+
+# Singleton
+stats_broadcaster = StatsBroadcaster(coordinator)
@@ -0,0 +1,380 @@
+"""
+Coordination between uvicorn worker processes on one host.
+
+With `uvicorn --workers N` every process imports its own producer_manager,
+so each would run its own producer with its own sequence numbers and stats,
+and dashboards would jump between them.  With PRODUCER_CLUSTER_DIR set (or
+WEB_CONCURRENCY > 1, see config.get_cluster_dir) the workers elect one of
+themselves instead:
+
+  leader   — the worker holding an exclusive flock on <dir>/leader.lock.  It
+             alone owns the ProducerManager and the WAL: it runs the produce
+             loop, executes control commands and publishes its stats.
+  follower — every other worker.  Stats, the profile view and the WebSocket
+             feed read the leader's latest published snapshot; control
+             commands (and /metrics) are forwarded to the leader through a
+             mailbox.  Followers retry the lock every second, so when the
+             leader process dies one takes over — recovering the WAL the dead
+             leader left behind, exactly as a restarted process would.
+
+Shared state lives in <dir>/state, one memory-mapped file:
+
+    header    u64 fields at the offsets below
+    mailbox   one JSON command at a time; followers serialise on cmd.lock
+    result    the leader's JSON reply
+    snapshot  stats_dict() + event_log as JSON, written under a seqlock
+              (generation odd while writing) so readers never see a torn copy
+
+seq_hwm is the global sequence high-water mark.  The leader reserves blocks
+of sequence numbers by raising it under an fcntl record lock before using
+them, and a new leader starts above it, so numbers stay unique across
+failovers.
+
+Route modules register their control commands with @coordinator.command(name)
+and invoke them with `await coordinator.call(name, **kwargs)`, which runs the
+handler locally on the leader (or a single worker) and forwards it otherwise.
+"""
+
+import asyncio
+import fcntl
+import json
+import mmap
+import os
+import struct
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from .config import get_cluster_dir
+from .producer import ProducerManager, producer_manager
+
+_MAGIC = b"ZBSNAP01"
+_U64 = struct.Struct("<Q")
+
+# Header fields (u64, after the 8-byte magic)
+_EPOCH = 8
+_LEADER_PID = 16
+_SEQ_HWM = 24
+_SNAP_GEN = 32
+_SNAP_LEN = 40
+_SNAP_NS = 48  # time.time_ns() of the last publish
+_CMD_ID = 56
+_CMD_LEN = 64
+_DONE_ID = 72
+_RESULT_LEN = 80
+
+_HEADER_BYTES = 4096
+_CMD_OFF = _HEADER_BYTES
+_RESULT_OFF = _CMD_OFF + 64 * 1024
+_SNAP_OFF = _RESULT_OFF + 256 * 1024
+STATE_BYTES = 1024 * 1024
+
+SEQ_BLOCK = 10_000       # sequence numbers reserved per trip to the shared counter
+PUBLISH_INTERVAL = 0.25  # leader → snapshot; matches the WebSocket tick
+POLL_INTERVAL = 0.01     # mailbox polling, both sides
+ELECTION_INTERVAL = 1.0  # followers retrying the leader lock
+CALL_TIMEOUT = 15.0      # resume() alone takes ~1.2 s
+
+CommandHandler = Callable[..., Awaitable[Dict[str, Any]]]
+
+
+class ClusterError(Exception):
+    """A command failed; status_code is the HTTP status it maps to."""
+
+    def __init__(self, message: str, status_code: int = 500) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class ClusterCoordinator:
+    def __init__(self, manager: ProducerManager, directory: str = "") -> None:
+        self.manager = manager
+        self.directory = directory
+        self.role = "follower" if directory else "single"
+        self._commands: Dict[str, CommandHandler] = {}
+        self._fd = -1         # state file, kept open for record locks
+        self._leader_fd = -1  # holds the leader flock for the process lifetime
+        self._mm: Optional[mmap.mmap] = None
+        self._task: Optional[asyncio.Task] = None
+        self._serving: Optional[asyncio.Task] = None
+        self._snapshot: Dict[str, Any] = {}
+        self._snapshot_gen = 0
+
+        self.epoch = 0
+        self.publishes = 0
+        self.commands_served = 0
+        self.commands_forwarded = 0
+        self.torn_reads = 0
+
+    def command(self, name: str) -> Callable[[CommandHandler], CommandHandler]:
+        """Register handler(manager, **kwargs) -> JSON-able dict under `name`."""
+        def register(handler: CommandHandler) -> CommandHandler:
+            self._commands[name] = handler
+            return handler
+        return register
+
+    # ── Lifecycle ──────────────────────────────────────────────────────────────
+
+    async def start(self) -> None:
+        if not self.directory:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._open_state()
+        if not self._try_lead():
+            print(f"Cluster: worker {os.getpid()} following leader pid {self._get(_LEADER_PID)}")
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        for task in (self._task, self._serving):
+            if task and not task.done():
+                task.cancel()
+        if self._leader_fd >= 0:
+            os.close(self._leader_fd)  # releases the flock: a follower takes over
+            self._leader_fd = -1
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    # ── Public API ─────────────────────────────────────────────────────────────
+
+    async def call(self, name: str, **kwargs: Any) -> Dict[str, Any]:
+        """Run a registered command on the leader (here, unless we follow)."""
+        if self.role != "follower":
+            try:
+                return await self._commands[name](self.manager, **kwargs)
+            except ValueError as e:
+                raise ClusterError(str(e), 400) from None
+        result = await self._forward(name, kwargs)
+        if "error" in result:
+            raise ClusterError(result["error"], result.get("status_code", 500))
+        return result
+
+    def stats_dict(self, include_log: bool = True) -> dict:
+        """The producer's stats: local on the leader, the published snapshot elsewhere."""
+        snap = self._read_snapshot() if self.role == "follower" else None
+        if snap:
+            d = dict(snap)
+            if not include_log:
+                d.pop("event_log", None)
+        else:
+            d = self.manager.stats_dict(include_log)
+        d["cluster"] = self.info()
+        return d
+
+    def profile_dict(self) -> Optional[dict]:
+        snap = self._read_snapshot() if self.role == "follower" else None
+        return snap.get("profile") if snap else self.manager.profile_dict()
+
+    def demo_mode(self) -> bool:
+        """Whether the producer runs without Zerobus; cheap, unlike stats_dict()."""
+        snap = self._read_snapshot() if self.role == "follower" else None
+        return snap.get("demo_mode", True) if snap else self.manager.stats.demo_mode
+
+    def last_error(self) -> str:
+        snap = self._read_snapshot() if self.role == "follower" else None
+        return snap.get("last_error", "") if snap else self.manager.stats.last_error
+
+    def info(self) -> dict:
+        d: Dict[str, Any] = {"role": self.role, "worker_pid": os.getpid()}
+        if self._mm is None:
+            return d
+        published = self._get(_SNAP_NS)
+        d.update({
+            "leader_pid": self._get(_LEADER_PID),
+            "epoch": self._get(_EPOCH),
+            "seq_high_water": self._get(_SEQ_HWM),
+            "snapshot_age_ms": round((time.time_ns() - published) / 1e6, 1) if published else None,
+            "publishes": self.publishes,
+            "commands_served": self.commands_served,
+            "commands_forwarded": self.commands_forwarded,
+            "torn_reads": self.torn_reads,
+        })
+        return d
+
+    # ── Election ───────────────────────────────────────────────────────────────
+
+    def _try_lead(self) -> bool:
+        fd = os.open(os.path.join(self.directory, "leader.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._leader_fd = fd
+        self._promote()
+        return True
+
+    def _promote(self) -> None:
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, _HEADER_BYTES)
+        try:
+            self.epoch = self._get(_EPOCH) + 1
+            self._set(_EPOCH, self.epoch)
+            self._set(_LEADER_PID, os.getpid())
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, _HEADER_BYTES)
+        previous = self._read_snapshot()
+        self.role = "leader"
+        m = self.manager
+        # Only the leader may own the WAL; a dead leader's backlog is ours now
+        m.open_wal()
+        m.use_sequence_allocator(self._reserve)
+        if previous:
+            m.stats.rate = previous.get("rate", m.stats.rate)  # resume() carries on at it
+        self._publish()
+        print(f"Cluster: worker {os.getpid()} is leader (epoch {self.epoch}, "
+              f"sequence from {m.stats.sequence_num + 1})")
+
+    def _reserve(self, upto: int) -> int:
+        """Raise the shared high-water mark to cover `upto` (plus a block); returns it."""
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, 8, _SEQ_HWM)
+        try:
+            hwm = self._get(_SEQ_HWM)
+            if upto > hwm:
+                hwm = upto + SEQ_BLOCK
+                self._set(_SEQ_HWM, hwm)
+            return hwm
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, 8, _SEQ_HWM)
+
+    # ── Internals ──────────────────────────────────────────────────────────────
+
+    def _open_state(self) -> None:
+        fd = os.open(os.path.join(self.directory, "state"), os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.lockf(fd, fcntl.LOCK_EX)  # first worker in initialises the file
+        try:
+            if os.fstat(fd).st_size < STATE_BYTES:
+                os.ftruncate(fd, STATE_BYTES)
+            mm = mmap.mmap(fd, STATE_BYTES)
+            if mm[:8] != _MAGIC:
+                mm[:_HEADER_BYTES] = bytes(_HEADER_BYTES)
+                mm[:8] = _MAGIC
+        finally:
+            fcntl.lockf(fd, fcntl.LOCK_UN)
+        self._fd, self._mm = fd, mm
+
+    def _get(self, offset: int) -> int:
+        return _U64.unpack_from(self._mm, offset)[0]
+
+    def _set(self, offset: int, value: int) -> None:
+        _U64.pack_into(self._mm, offset, value)
+
+    async def _run(self) -> None:
+        last_publish = 0.0
+        while True:
+            try:
+                if self.role == "leader":
+                    self._serve_mailbox()
+                    now = time.monotonic()
+                    if now - last_publish >= PUBLISH_INTERVAL:
+                        self._publish()
+                        last_publish = now
+                else:
+                    self._try_lead()
+            except Exception as e:
+                print(f"Cluster error: {e}")
+            await asyncio.sleep(POLL_INTERVAL if self.role == "leader" else ELECTION_INTERVAL)
+
+    def _publish(self) -> None:
+        m = self.manager
+        snap = m.stats_dict(include_log=False)
+        snap["event_log"] = m.stats.recent_log(50)
+        data = json.dumps(snap, separators=(",", ":")).encode()
+        if _SNAP_OFF + len(data) > STATE_BYTES:
+            print(f"Cluster: snapshot of {len(data)} bytes does not fit — not published")
+            return
+        gen = self._get(_SNAP_GEN)
+        gen += gen & 1  # a leader that died mid-write left it odd
+        self._set(_SNAP_GEN, gen + 1)  # odd: write in progress
+        self._mm[_SNAP_OFF:_SNAP_OFF + len(data)] = data
+        self._set(_SNAP_LEN, len(data))
+        self._set(_SNAP_NS, time.time_ns())
+        self._set(_SNAP_GEN, gen + 2)
+        self.publishes += 1
+
+    def _read_snapshot(self) -> Optional[Dict[str, Any]]:
+        """Latest complete snapshot (parsed once per generation), or None before the first."""
+        mm = self._mm
+        if mm is None:
+            return None
+        for _ in range(5):
+            gen = self._get(_SNAP_GEN)
+            if gen == self._snapshot_gen:
+                return self._snapshot
+            if gen & 1 == 0:
+                data = mm[_SNAP_OFF:_SNAP_OFF + self._get(_SNAP_LEN)]
+                if self._get(_SNAP_GEN) == gen:
+                    self._snapshot = json.loads(data)
+                    self._snapshot_gen = gen
+                    return self._snapshot
+            self.torn_reads += 1
+        return self._snapshot or None  # writer busy — the previous copy will do
+
+    async def _forward(self, name: str, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        data = json.dumps({"command": name, "args": kwargs, "sent_at": time.time()}).encode()
+        if len(data) > _RESULT_OFF - _CMD_OFF:
+            # Written as-is it would run over the result and snapshot regions
+            raise ClusterError(
+                f"{name!r} command too large ({len(data):,} bytes, max {_RESULT_OFF - _CMD_OFF:,})", 413
+            )
+        deadline = time.monotonic() + CALL_TIMEOUT
+        lock_fd = os.open(os.path.join(self.directory, "cmd.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            while True:
+                try:
+                    fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except OSError:
+                    if time.monotonic() > deadline:
+                        raise ClusterError("leader mailbox busy", 503) from None
+                    await asyncio.sleep(POLL_INTERVAL)
+
+            self._mm[_CMD_OFF:_CMD_OFF + len(data)] = data
+            self._set(_CMD_LEN, len(data))
+            cmd_id = self._get(_CMD_ID) + 1
+            self._set(_CMD_ID, cmd_id)  # publishes the command
+            while self._get(_DONE_ID) != cmd_id:
+                if time.monotonic() > deadline:
+                    raise ClusterError(f"no reply from leader to {name!r}", 503)
+                await asyncio.sleep(POLL_INTERVAL)
+            result = json.loads(self._mm[_RESULT_OFF:_RESULT_OFF + self._get(_RESULT_LEN)])
+            self.commands_forwarded += 1
+            return result
+        finally:
+            os.close(lock_fd)  # releases the flock
+
+    def _serve_mailbox(self) -> None:
+        if self._serving is not None:
+            return
+        cmd_id = self._get(_CMD_ID)
+        if cmd_id == self._get(_DONE_ID):
+            return
+        data = bytes(self._mm[_CMD_OFF:_CMD_OFF + self._get(_CMD_LEN)])
+        # Run as a task: commands like resume() sleep, and publishing must go on
+        self._serving = asyncio.create_task(self._serve(cmd_id, data))
+
+    async def _serve(self, cmd_id: int, data: bytes) -> None:
+        try:
+            msg = json.loads(data)
+            if time.time() - msg["sent_at"] > CALL_TIMEOUT:
+                # Left over from before a restart or failover; its caller gave up
+                result: Dict[str, Any] = {"error": "command expired", "status_code": 503}
+            else:
+                result = await self._commands[msg["command"]](self.manager, **msg["args"])
+        except ValueError as e:
+            result = {"error": str(e), "status_code": 400}
+        except Exception as e:
+            result = {"error": f"{type(e).__name__}: {e}", "status_code": 500}
+        out = json.dumps(result, separators=(",", ":")).encode()
+        if len(out) > _SNAP_OFF - _RESULT_OFF:
+            out = json.dumps({"error": "result too large", "status_code": 500}).encode()
+        self._mm[_RESULT_OFF:_RESULT_OFF + len(out)] = out
+        self._set(_RESULT_LEN, len(out))
+        self._set(_DONE_ID, cmd_id)
+        self.commands_served += 1
+        self._serving = None
+
+
+# Singleton
+coordinator = ClusterCoordinator(producer_manager, get_cluster_dir())
@@ -0,0 +1,293 @@
+"""
+Dictionary-encoded compact wire schema: game_events_compact.
+
+Most GameEvent bytes are repeated strings — event_type, player_id,
+match_id, card_name, result and host.  The compact schema sends each as an
+int32 code instead (1–3 bytes on the wire), with a dictionary of
+code → value written once per value to a dimension table:
+
+    game_events_compact   GameEvent with the six strings as *_code fields,
+                          plus dict_id
+    game_event_dims       (dict_id, dimension, code, value)
+
+Codes are assigned in first-seen order by CompactDictionary as events are
+encoded, and each new entry is queued for DimensionWriter, which ingests it
+on a dims stream of its own next to the event streams.  Entries stay
+in flight until acked and are re-sent when the stream is reopened, so a
+crash can duplicate a dims row but never lose one.  A row the server
+rejects is re-sent too, up to MAX_DIM_RETRIES times; past that the
+dictionary rotates so its values are coded afresh, and only the events
+already sent with the lost code stay undecodable.  dict_id is drawn
+afresh whenever the dictionary starts over (each producer process, and each
+stop), so codes never need to be stable across runs.
+
+Player and match ids never stop arriving, so the dictionary is capped at
+COMPACT_DICT_MAX_ENTRIES (default 100,000) codes in all.  Past the cap it
+rotates between batches: a new dict_id, every code unassigned, and values
+still in use re-emitted as they come up again.  Rows already queued or in
+flight keep the dict_id they were assigned under, so a rotation loses none.
+Reading the values back joins on both:
+
+    SELECT e.*, c.value AS card_name
+    FROM game_events_compact e
+    JOIN (SELECT DISTINCT * FROM game_event_dims) c
+      ON c.dict_id = e.dict_id AND c.dimension = 'card' AND c.code = e.card_code
+
+Events are still created, logged and WAL-logged as GameEvents; the compact
+payload is encoded by the schema's compiled encoder at send time.
+"""
+
+import os
+import random
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from google.protobuf.descriptor_pb2 import FieldDescriptorProto as _FldDP
+
+from .schemas import TableSchema, schema_registry
+
+# Dimension name → the EventRecord attribute it encodes
+DIMENSIONS = {
+    "event_type": "event_type",
+    "player": "player_id",
+    "match": "match_id",
+    "card": "card_name",
+    "result": "result",
+    "host": "host",
+}
+
+DEFAULT_MAX_ENTRIES = 100_000
+MAX_DIM_RETRIES = 3  # re-sends of a rejected dims row before its codes are abandoned
+
+_DimRow = Tuple[int, str, int, str]  # dict_id, dimension, code, value
+
+
+class _Dimension(dict):
+    """value → code, assigning the next code (and queueing it) on first sight."""
+
+    def __init__(self, name: str, owner: "CompactDictionary") -> None:
+        super().__init__()
+        self.name = name
+        self._owner = owner
+
+    def __missing__(self, value: str) -> int:
+        code = len(self)
+        self[value] = code
+        self._owner.entries += 1
+        self._owner.pending.append((self._owner.dict_id, self.name, code, value))
+        return code
+
+
+class CompactDictionary:
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self.pending: List[_DimRow] = []  # assigned, not yet handed to the writer
+        self.entries = 0
+        self.rotations = 0
+        self.event_type = _Dimension("event_type", self)
+        self.player = _Dimension("player", self)
+        self.match = _Dimension("match", self)
+        self.card = _Dimension("card", self)
+        self.result = _Dimension("result", self)
+        self.host = _Dimension("host", self)
+        self.dict_id = 0
+        self.reset()
+
+    @classmethod
+    def from_env(cls) -> "CompactDictionary":
+        return cls(int(os.environ.get("COMPACT_DICT_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)))
+
+    @property
+    def full(self) -> bool:
+        return self.entries >= self.max_entries
+
+    def rotate(self) -> None:
+        """Start over under a new dict_id; queued rows keep the one they were made under."""
+        self._start_over()
+        self.rotations += 1
+
+    def reset(self) -> None:
+        """Start a new dictionary with nothing queued."""
+        self._start_over()
+        self.pending.clear()
+
+    def _start_over(self) -> None:
+        for name in DIMENSIONS:
+            getattr(self, name).clear()
+        self.entries = 0
+        self.dict_id = random.randint(1, 2**31 - 1)
+
+    def sizes(self) -> Dict[str, int]:
+        return {name: len(getattr(self, name)) for name in DIMENSIONS}
+
+
+compact_dictionary = CompactDictionary.from_env()
+
+COMPACT_SCHEMA = schema_registry.register(TableSchema(
+    "game_events_compact", 1,
+    [
+        ("event_id",        1,  _FldDP.TYPE_STRING),
+        ("event_type_code", 2,  _FldDP.TYPE_INT32),
+        ("player_code",     3,  _FldDP.TYPE_INT32),
+        ("match_code",      4,  _FldDP.TYPE_INT32),
+        ("card_code",       5,  _FldDP.TYPE_INT32),
+        ("location",        6,  _FldDP.TYPE_INT32),
+        ("snap_cubes",      7,  _FldDP.TYPE_INT32),
+        ("result_code",     8,  _FldDP.TYPE_INT32),
+        ("produced_at",     9,  _FldDP.TYPE_INT64),
+        ("ingested_at",     10, _FldDP.TYPE_INT64),
+        ("host_code",       11, _FldDP.TYPE_INT32),
+        ("sequence_num",    12, _FldDP.TYPE_INT64),
+        ("dict_id",         13, _FldDP.TYPE_INT32),
+    ],
+    message_name="GameEventCompact",
+    sources={
+        "event_type_code": "_d.event_type[e.event_type]",
+        "player_code": "_d.player[e.player_id]",
+        "match_code": "_d.match[e.match_id]",
+        "card_code": "_d.card[e.card_name]",
+        "result_code": "_d.result[e.result]",
+        "host_code": "_d.host[e.host]",
+        "dict_id": "_d.dict_id",
+    },
+    env={"_d": compact_dictionary},
+))
+
+DIMS_SCHEMA = schema_registry.register(TableSchema(
+    "game_event_dims", 1,
+    [
+        ("dict_id",   1, _FldDP.TYPE_INT32),
+        ("dimension", 2, _FldDP.TYPE_STRING),
+        ("code",      3, _FldDP.TYPE_INT32),
+        ("value",     4, _FldDP.TYPE_STRING),
+    ],
+    message_name="GameEventDim",
+))
+
+
+class DimensionWriter:
+    """
+    Ships new dictionary entries to game_event_dims.  Like the event streams'
+    ack callbacks, offsets 0, 1, 2, … are mirrored in submission order so an
+    ack retires the right row; on_ack / on_error run on the SDK's thread.
+    """
+
+    def __init__(self, dictionary: CompactDictionary) -> None:
+        self.dictionary = dictionary
+        self.stream: Optional[Any] = None
+        self._next_offset = 0
+        self._inflight: Dict[int, _DimRow] = {}
+        # Rejected rows, appended on the SDK's thread and requeued by flush_pending
+        self._rejected: Deque[_DimRow] = deque()
+        self._retries: Dict[_DimRow, int] = {}
+        self._encode = DIMS_SCHEMA.dict_encoder()
+        self.written = 0
+        self.acked = 0
+        self.failed = 0
+        self.resent = 0
+        self.retried = 0
+        self.abandoned = 0
+
+    def attach(self, stream: Any) -> None:
+        """Write to a freshly opened stream, re-sending whatever the last one left unacked."""
+        self.stream = stream
+        self._next_offset = 0
+        unacked = list(self._inflight.values())
+        self._inflight.clear()
+        self.dictionary.pending[:0] = unacked
+        self.resent += len(unacked)
+
+    def detach(self) -> None:
+        self.stream = None
+
+    def reset(self) -> None:
+        """Forget in-flight rows along with the dictionary they belonged to."""
+        self._inflight.clear()
+        self._rejected.clear()
+        self._retries.clear()
+        self.dictionary.reset()
+
+    def flush_pending(self) -> int:
+        """
+        Ingest the dictionary's new entries; returns how many went out.  Runs
+        between batches, so this is where rejected rows are requeued and a
+        full dictionary rotates.
+        """
+        self._requeue_rejected()
+        if self.dictionary.full:
+            self.dictionary.rotate()
+        pending = self.dictionary.pending
+        if not pending:
+            return 0
+        rows = pending[:]
+        pending.clear()
+        if self.stream is None:
+            # Demo mode: no table to write to, the rows only count
+            self.written += len(rows)
+            return len(rows)
+        for i, row in enumerate(rows):
+            dict_id, dimension, code, value = row
+            self._inflight[self._next_offset] = row
+            self._next_offset += 1
+            try:
+                self.stream.ingest_record_nowait(self._encode(
+                    {"dict_id": dict_id, "dimension": dimension, "code": code, "value": value}
+                ))
+            except Exception as e:
+                # Requeue this row and the rest for the next batch
+                self._next_offset -= 1
+                self._inflight.pop(self._next_offset, None)
+                pending[:0] = rows[i:]
+                print(f"dims ingest error: {e}")
+                return i
+        self.written += len(rows)
+        return len(rows)
+
+    def _requeue_rejected(self) -> None:
+        """Put rejected rows back in front of the queue; rotate past a row that keeps failing."""
+        rows = []
+        abandon = False
+        while self._rejected:
+            row = self._rejected.popleft()
+            tries = self._retries.get(row, 0) + 1
+            if tries > MAX_DIM_RETRIES:
+                self._retries.pop(row, None)
+                self.abandoned += 1
+                # Events can't use a code the table never got; give the values new ones
+                abandon = abandon or row[0] == self.dictionary.dict_id
+                continue
+            self._retries[row] = tries
+            rows.append(row)
+        self.dictionary.pending[:0] = rows
+        self.retried += len(rows)
+        if abandon:
+            self.dictionary.rotate()
+
+    def on_ack(self, offset: int) -> None:
+        row = self._inflight.pop(offset, None)
+        if row is not None:
+            self.acked += 1
+            self._retries.pop(row, None)
+
+    def on_error(self, offset: int, error_message: str) -> None:
+        row = self._inflight.pop(offset, None)
+        if row is not None:
+            self.failed += 1
+            self._rejected.append(row)
+        print(f"Zerobus dims error at offset {offset}: {error_message}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "dict_id": self.dictionary.dict_id,
+            "entries": self.dictionary.sizes(),
+            "max_entries": self.dictionary.max_entries,
+            "rotations": self.dictionary.rotations,
+            "written": self.written,
+            "acked": self.acked,
+            "failed": self.failed,
+            "resent": self.resent,
+            "retried": self.retried,
+            "abandoned": self.abandoned,
+            "in_flight": len(self._inflight),
+            "pending": len(self.dictionary.pending),
+        }
@@ -1,10 +1,19 @@
 import os
+import tempfile
+from functools import lru_cache
+
 from databricks.sdk import WorkspaceClient
 
 IS_DATABRICKS_APP = bool(os.environ.get("DATABRICKS_APP_NAME"))
 
 
+@lru_cache(maxsize=1)
 def get_workspace_client() -> WorkspaceClient:
+    """
+    The process-wide WorkspaceClient.  Building one resolves auth (and outside
+    an app reads the CLI profile), so it is done once; the client refreshes
+    its own credentials.
+    """
     if IS_DATABRICKS_APP:
         return WorkspaceClient()
     profile = os.environ.get("DATABRICKS_PROFILE", "fe-vm-otto-demo")
@@ -40,3 +49,28 @@ def get_zerobus_config() -> dict:
         "table_name": os.environ.get("ZEROBUS_TABLE_NAME", "ol.snap.game_events"),
         "warehouse_id": os.environ.get("DATABRICKS_WAREHOUSE_ID", "3baa12157046a0c0"),
     }
+
+
+def get_cluster_dir() -> str:
+    """
+    Directory the uvicorn workers coordinate through (see server/cluster.py):
+    PRODUCER_CLUSTER_DIR, or a default under /dev/shm when WEB_CONCURRENCY > 1.
+    Empty means a single worker.
+    """
+    directory = os.environ.get("PRODUCER_CLUSTER_DIR", "")
+    if directory:
+        return directory
+    if int(os.environ.get("WEB_CONCURRENCY", "") or 1) > 1:
+        base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+        return os.path.join(base, "zerobus-snap-demo")
+    return ""
+
+
+def get_recordings_dir() -> str:
+    """
+    Directory recorded event files are replayed from (see
+    server/recorded_source.py): PRODUCER_RECORDINGS_DIR, or recordings/ next
+    to app.py.  Replay requests name files relative to it.
+    """
+    default = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "recordings")
+    return os.environ.get("PRODUCER_RECORDINGS_DIR", default)
@@ -0,0 +1,176 @@
+"""
+Incremental Delta counters — running totals instead of a full COUNT(*) per poll.
+
+The count, type breakdown and host breakdown are all sums over one
+aggregate, rows by (event_type, host).  IncrementalCounts keeps that
+aggregate in two parts split at a produced_at watermark W, trailing
+wall-clock time by `lag`:
+
+    settled   rows with produced_at ≤ W, a running total
+    tail      rows with produced_at > W, recounted by every refresh
+
+Each refresh moves W up to now − lag and runs a single GROUP BY over
+produced_at > W_old.  Rows up to the new W are added to settled; the rest
+become the new tail.  A poll therefore scans about `lag` seconds of data
+however large the table grows, and Delta's per-file produced_at statistics
+let the warehouse skip every older file.
+
+Events are appended in roughly produced_at order, but a replay after a
+long kill can land rows already below W.  A full recount every `recount`
+seconds rebuilds settled from the whole table and folds them back in; the
+correction it makes is reported as last_recount_drift.  Refreshes are
+single-flight, and callers within `max_age` share the last result.
+
+Tuning (env):
+    DELTA_COUNTS_LAG       seconds the watermark trails now     (default 30)
+    DELTA_COUNTS_RECOUNT   seconds between full recounts        (default 600; 0 = never)
+    DELTA_COUNTS_MAX_AGE   seconds a refresh is reused for      (default 1)
+"""
+
+import asyncio
+import os
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .events import now_us, us_to_iso
+
+QueryFn = Callable[[str], Awaitable[List[Dict[str, Any]]]]
+Key = Tuple[str, str]  # event_type, host
+
+
+class IncrementalCounts:
+    def __init__(
+        self,
+        query: QueryFn,
+        table: Callable[[], str],
+        lag: float = 30.0,
+        recount: float = 600.0,
+        max_age: float = 1.0,
+    ) -> None:
+        self._query = query
+        self._table = table
+        self.lag = lag
+        self.recount = recount
+        self.max_age = max_age
+        self._lock: Optional[asyncio.Lock] = None
+
+        self.watermark = 0  # produced_at µs; 0 until the first (full) count
+        self._watermark_table = ""
+        self.settled: Counter = Counter()
+        self.tail: Counter = Counter()
+        self._refreshed_at = 0.0  # monotonic
+        self._recounted_at = 0.0
+
+        self.refreshes = 0
+        self.recounts = 0
+        self.last_recount_drift = 0
+        self.last_query_ms = 0.0
+        self.last_recount_ms = 0.0
+        self.last_error = ""
+
+    @classmethod
+    def from_env(cls, query: QueryFn, table: Callable[[], str]) -> "IncrementalCounts":
+        return cls(
+            query, table,
+            lag=float(os.environ.get("DELTA_COUNTS_LAG", 30)),
+            recount=float(os.environ.get("DELTA_COUNTS_RECOUNT", 600)),
+            max_age=float(os.environ.get("DELTA_COUNTS_MAX_AGE", 1)),
+        )
+
+    # ── Views ──────────────────────────────────────────────────────────────────
+
+    async def total(self) -> int:
+        await self.refresh()
+        return sum(self.settled.values()) + sum(self.tail.values())
+
+    async def by_type(self) -> List[Dict[str, Any]]:
+        return self._rollup(await self._combined(), 0, "event_type")
+
+    async def by_host(self, limit: int = 10) -> List[Dict[str, Any]]:
+        return self._rollup(await self._combined(), 1, "host")[:limit]
+
+    async def _combined(self) -> Counter:
+        await self.refresh()
+        return self.settled + self.tail
+
+    @staticmethod
+    def _rollup(counts: Counter, part: int, name: str) -> List[Dict[str, Any]]:
+        rolled: Counter = Counter()
+        for key, n in counts.items():
+            rolled[key[part]] += n
+        return [{name: k, "count": n} for k, n in rolled.most_common()]
+
+    # ── Refresh ────────────────────────────────────────────────────────────────
+
+    async def refresh(self) -> None:
+        """Bring the totals up to date, unless a refresh within max_age already did."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        if time.monotonic() - self._refreshed_at < self.max_age:
+            return
+        async with self._lock:
+            # Callers queued behind a refresh take its result
+            if time.monotonic() - self._refreshed_at < self.max_age:
+                return
+            await self._refresh_locked()
+
+    async def _refresh_locked(self) -> None:
+        table = self._table()
+        now = time.monotonic()
+        full = (
+            not self.watermark
+            or table != self._watermark_table
+            or (self.recount > 0 and now - self._recounted_at >= self.recount)
+        )
+        hi = now_us() - int(self.lag * 1_000_000)
+        # A recount scans everything, including rows without a produced_at
+        where = "" if full else f"WHERE produced_at > {self.watermark} "
+        t0 = time.perf_counter()
+        try:
+            rows = await self._query(
+                f"SELECT event_type, host, "
+                f"CASE WHEN produced_at > {hi} THEN 1 ELSE 0 END AS fresh, COUNT(*) AS n "
+                f"FROM {table} {where}"
+                f"GROUP BY event_type, host, fresh"
+            )
+        except Exception as e:
+            # Keep serving the last totals; the next refresh retries the same range
+            self.last_error = str(e)[:500]
+            return
+        finally:
+            self.last_query_ms = (time.perf_counter() - t0) * 1000
+
+        settled: Counter = Counter()
+        tail: Counter = Counter()
+        for r in rows:
+            key = (r["event_type"] or "", r["host"] or "")
+            (tail if str(r["fresh"]) == "1" else settled)[key] += int(r["n"])
+        if full:
+            if self.watermark and table == self._watermark_table:
+                self.last_recount_drift = sum(settled.values()) - sum(self.settled.values())
+            self.settled = settled
+            self.recounts += 1
+            self._recounted_at = now
+            self.last_recount_ms = self.last_query_ms
+        else:
+            self.settled.update(settled)
+        self.tail = tail
+        self.watermark = hi
+        self._watermark_table = table
+        self._refreshed_at = time.monotonic()
+        self.refreshes += 1
+        self.last_error = ""
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "watermark": us_to_iso(self.watermark) if self.watermark else None,
+            "settled": sum(self.settled.values()),
+            "tail": sum(self.tail.values()),
+            "refreshes": self.refreshes,
+            "recounts": self.recounts,
+            "last_recount_drift": self.last_recount_drift,
+            "last_query_ms": round(self.last_query_ms, 1),
+            "last_recount_ms": round(self.last_recount_ms, 1),
+            "last_error": self.last_error,
+        }
@@ -1,87 +1,199 @@
 """
 Delta table reads via SQL Statement API (live) or in-memory simulation (demo mode).
 Target table: configured via ZEROBUS_TABLE_NAME env var (default: otto_demo.sd.zerobus_ingest)
+
+The dashboard polls these endpoints continuously, so nothing per-poll is
+set up afresh: one aiohttp session (keep-alive connection pool, opened in
+the app lifespan) carries every request, the bearer token comes from a
+TokenCache refreshed in the background, and the warehouse id is resolved
+once.  Poll latency is kept in a histogram (GET /api/delta/stats).
+
+Counts and breakdowns come from IncrementalCounts (delta_counts.py), which
+scans only rows past a produced_at watermark instead of the whole table.
+
+GET /api/delta/summary returns all of the panels' data in one response.
+get_summary() runs the reads concurrently and shares the result for a short
+TTL: every browser polling within it, and every request that arrives while
+a read is in flight, gets the same snapshot.  Statements per second then
+depend on the TTL, not on how many dashboards are open.
+
+Tuning (env):
+    DELTA_SUMMARY_TTL   seconds a summary snapshot is served for  (default 2)
 """
 
+import asyncio
 import os
+import time
 import aiohttp
-from typing import List, Dict, Any
+from functools import partial
+from typing import List, Dict, Any, Optional
 
 from .config import get_workspace_host, get_oauth_token, get_zerobus_config
-from .producer import producer_manager
+from .cluster import coordinator
+from .delta_counts import IncrementalCounts
+from .metrics import LogHistogram
+from .token_cache import TokenCache
+
+# WorkspaceClient tokens carry no expiry we can read; re-read them this often
+WORKSPACE_TOKEN_TTL = 300.0
+MAX_CONNECTIONS = 16
 
 
 def _table() -> str:
     return os.environ.get("ZEROBUS_TABLE_NAME", "otto_demo.sd.zerobus_ingest")
 
 
+def _producer(include_log: bool = False) -> Dict[str, Any]:
+    """Producer stats as seen from this worker (the leader's, under several workers)."""
+    return coordinator.stats_dict(include_log)
+
+
+def _demo_by_type(producer: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [
+        {"event_type": k, "count": v}
+        for k, v in sorted(producer["delta_by_type"].items(), key=lambda x: x[1], reverse=True)
+    ]
+
+
+def _demo_hosts(producer: Dict[str, Any]) -> List[Dict[str, Any]]:
+    from .producer import _HOSTNAME
+    total = producer["delta_count"]
+    return [{"host": _HOSTNAME, "count": total}] if total > 0 else []
+
+
+def _fetch_workspace_token() -> tuple[str, float]:
+    return get_oauth_token(), WORKSPACE_TOKEN_TTL
+
+
 class DeltaReader:
     def __init__(self) -> None:
+        self.summary_ttl = float(os.environ.get("DELTA_SUMMARY_TTL", 2))
+        self._summaries: Dict[int, tuple[float, Dict[str, Any]]] = {}  # limit → (monotonic, summary)
+        self._summary_tasks: Dict[int, asyncio.Task] = {}
+        self.summary_requests = 0
+        self.summary_reads = 0
         self._warehouse_id: str = ""
+        self._warehouse_lock: Optional[asyncio.Lock] = None
+        self._host = ""
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.token_cache = TokenCache("workspace", _fetch_workspace_token)
+        self.poll_latency = LogHistogram()  # ms per SQL statement / REST call
+        self.requests = 0
+        self.errors = 0
+        self.counts = IncrementalCounts.from_env(partial(self._execute_sql, strict=True), _table)
 
     def _demo_mode(self) -> bool:
-        return producer_manager.stats.demo_mode
+        return coordinator.demo_mode()
+
+    # ── Session ────────────────────────────────────────────────────────────────
+
+    async def open(self) -> None:
+        """Create the pooled session (app lifespan); requests open it lazily otherwise."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=MAX_CONNECTIONS, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=60),
+            )
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _request(self, method: str, path: str, **kwargs: Any) -> tuple[int, Any]:
+        """One authenticated call on the shared session → (status, JSON body)."""
+        await self.open()
+        if not self._host:
+            self._host = await asyncio.to_thread(get_workspace_host)
+        # Only a cold cache fetches, and then off the event loop
+        token = self.token_cache.cached() or await asyncio.to_thread(self.token_cache.warm)
+        t0 = time.perf_counter()
+        self.requests += 1
+        try:
+            async with self._session.request(
+                method, f"{self._host}{path}",
+                headers={"Authorization": f"Bearer {token}"},
+                **kwargs,
+            ) as resp:
+                return resp.status, await resp.json()
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self.poll_latency.record((time.perf_counter() - t0) * 1000)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "session_open": self._session is not None and not self._session.closed,
+            "warehouse_id": self._warehouse_id or None,
+            "requests": self.requests,
+            "errors": self.errors,
+            "poll_latency_ms": self.poll_latency.snapshot(),
+            "token_cache": self.token_cache.metrics(),
+            "counts": self.counts.stats(),
+            "summary": {
+                "ttl_s": self.summary_ttl,
+                "requests": self.summary_requests,
+                "reads": self.summary_reads,
+            },
+        }
 
     # ── SQL helpers ────────────────────────────────────────────────────────────
 
-    async def _execute_sql(self, sql: str) -> List[Dict[str, Any]]:
+    async def _execute_sql(self, sql: str, strict: bool = False) -> List[Dict[str, Any]]:
+        """Rows as dicts; on failure [] — or, with strict, the exception."""
         try:
-            config = get_zerobus_config()
-            if not self._warehouse_id:
-                self._warehouse_id = await self._get_warehouse_id()
-                if not self._warehouse_id:
-                    self._warehouse_id = config.get("warehouse_id", "")
-
-            host = get_workspace_host()
-            token = get_oauth_token()
-            headers = {
-                "Authorization": f"Bearer {token}",
-                "Content-Type": "application/json",
-            }
             payload = {
                 "statement": sql,
-                "warehouse_id": self._warehouse_id,
+                "warehouse_id": await self._warehouse(),
                 "format": "JSON_ARRAY",
                 "wait_timeout": "30s",
             }
-
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{host}/api/2.0/sql/statements/",
-                    headers=headers,
-                    json=payload,
-                ) as resp:
-                    result = await resp.json()
-                    if resp.status != 200:
-                        print(f"SQL error: {result}")
-                        return []
-                    if result.get("result") and result["result"].get("data_array"):
-                        if result.get("manifest") and result["manifest"].get("schema"):
-                            cols = [
-                                c["name"] for c in result["manifest"]["schema"]["columns"]
-                            ]
-                            return [
-                                dict(zip(cols, row))
-                                for row in result["result"]["data_array"]
-                            ]
-                    return []
+            status, result = await self._request("POST", "/api/2.0/sql/statements/", json=payload)
+            if status != 200:
+                print(f"SQL error: {result}")
+                if strict:
+                    raise RuntimeError(f"SQL error {status}: {result}")
+                return []
+            state = (result.get("status") or {}).get("state", "SUCCEEDED")
+            if strict and state != "SUCCEEDED":
+                raise RuntimeError(f"SQL statement {state}: {result.get('status')}")
+            if result.get("result") and result["result"].get("data_array"):
+                if result.get("manifest") and result["manifest"].get("schema"):
+                    cols = [
+                        c["name"] for c in result["manifest"]["schema"]["columns"]
+                    ]
+                    return [
+                        dict(zip(cols, row))
+                        for row in result["result"]["data_array"]
+                    ]
+            return []
         except Exception as e:
+            if strict:
+                raise
             print(f"DeltaReader SQL error: {e}")
             return []
 
+    async def _warehouse(self) -> str:
+        """The SQL warehouse id — looked up once, concurrent first polls sharing the lookup."""
+        if self._warehouse_id:
+            return self._warehouse_id
+        if self._warehouse_lock is None:
+            self._warehouse_lock = asyncio.Lock()
+        async with self._warehouse_lock:
+            if not self._warehouse_id:
+                self._warehouse_id = (
+                    await self._get_warehouse_id()
+                    or get_zerobus_config().get("warehouse_id", "")
+                )
+        return self._warehouse_id
+
     async def _get_warehouse_id(self) -> str:
         try:
-            host = get_workspace_host()
-            token = get_oauth_token()
-            headers = {"Authorization": f"Bearer {token}"}
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{host}/api/2.0/sql/warehouses", headers=headers
-                ) as resp:
-                    result = await resp.json()
-                    warehouses = result.get("warehouses", [])
-                    if warehouses:
-                        return warehouses[0]["id"]
+            status, result = await self._request("GET", "/api/2.0/sql/warehouses")
+            warehouses = result.get("warehouses", []) if status == 200 else []
+            if warehouses:
+                return warehouses[0]["id"]
         except Exception as e:
             print(f"Warehouse lookup error: {e}")
         return ""
@@ -90,33 +202,17 @@ class DeltaReader:
 
     async def get_event_count(self) -> int:
         if self._demo_mode():
-            return producer_manager.stats.delta_count
-        rows = await self._execute_sql(
-            f"SELECT COUNT(*) AS cnt FROM {_table()}"
-        )
-        return int(rows[0]["cnt"]) if rows else 0
+            return _producer()["delta_count"]
+        return await self.counts.total()
 
     async def get_event_count_by_type(self) -> List[Dict[str, Any]]:
         if self._demo_mode():
-            return [
-                {"event_type": k, "count": v}
-                for k, v in sorted(
-                    producer_manager.stats.delta_by_type.items(),
-                    key=lambda x: x[1],
-                    reverse=True,
-                )
-            ]
-        tbl = _table()
-        rows = await self._execute_sql(
-            f"SELECT event_type, COUNT(*) AS count "
-            f"FROM {tbl} "
-            f"GROUP BY event_type ORDER BY count DESC"
-        )
-        return rows
+            return _demo_by_type(_producer())
+        return await self.counts.by_type()
 
     async def get_recent_events(self, limit: int = 10) -> List[Dict[str, Any]]:
         if self._demo_mode():
-            return list(reversed(producer_manager.stats.event_log[-limit:]))
+            return _producer(include_log=True)["event_log"][:limit]
         rows = await self._execute_sql(
             f"SELECT event_id, event_type, player_id, card_name, host, "
             f"produced_at, sequence_num "
@@ -127,41 +223,68 @@ class DeltaReader:
 
     async def get_rejection_count(self) -> int:
         if self._demo_mode():
-            return producer_manager.stats.rejection_count
+            return _producer()["rejection_count"]
         # Check _zerobus/table_rejected_parquets/ via DBFS API
         try:
-            host = get_workspace_host()
-            token = get_oauth_token()
             tbl = _table().replace(".", "/")
             path = f"/mnt/delta/{tbl}/_zerobus/table_rejected_parquets/"
-            headers = {"Authorization": f"Bearer {token}"}
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{host}/api/2.0/dbfs/list",
-                    headers=headers,
-                    params={"path": path},
-                ) as resp:
-                    result = await resp.json()
-                    files = result.get("files", [])
-                    return len(
-                        [f for f in files if str(f.get("path", "")).endswith(".parquet")]
-                    )
+            _, result = await self._request("GET", "/api/2.0/dbfs/list", params={"path": path})
+            files = result.get("files", [])
+            return len(
+                [f for f in files if str(f.get("path", "")).endswith(".parquet")]
+            )
         except Exception:
-            return producer_manager.stats.rejection_count
+            return _producer()["rejection_count"]
 
     async def get_host_breakdown(self) -> List[Dict[str, Any]]:
         """Group events by producer host — shows multi-producer scenarios."""
         if self._demo_mode():
-            from .producer import _HOSTNAME
-            total = producer_manager.stats.delta_count
-            return [{"host": _HOSTNAME, "count": total}] if total > 0 else []
-        tbl = _table()
-        rows = await self._execute_sql(
-            f"SELECT host, COUNT(*) AS count FROM {tbl} "
-            f"GROUP BY host ORDER BY count DESC LIMIT 10"
-        )
-        return rows
+            return _demo_hosts(_producer())
+        return await self.counts.by_host(limit=10)
+
+    async def get_summary(self, limit: int = 10) -> Dict[str, Any]:
+        """Count, breakdowns, recent rows and rejections from one cached snapshot."""
+        self.summary_requests += 1
+        cached = self._summaries.get(limit)
+        if cached and time.monotonic() - cached[0] < self.summary_ttl:
+            return cached[1]
+        # Single-flight: join the read in progress.  It runs as its own task,
+        # so a client that disconnects does not cancel it for the others.
+        task = self._summary_tasks.get(limit)
+        if task is None:
+            task = asyncio.create_task(self._read_summary(limit))
+            self._summary_tasks[limit] = task
+            task.add_done_callback(lambda _: self._summary_tasks.pop(limit, None))
+        return await asyncio.shield(task)
+
+    async def _read_summary(self, limit: int) -> Dict[str, Any]:
+        self.summary_reads += 1
+        if self._demo_mode():
+            # Every field from one stats snapshot
+            p = _producer(include_log=True)
+            count, breakdown, events, rejections, hosts = (
+                p["delta_count"], _demo_by_type(p), p["event_log"][:limit], p["rejection_count"], _demo_hosts(p),
+            )
+        else:
+            # The count, breakdown and hosts share one IncrementalCounts refresh
+            count, breakdown, events, rejections, hosts = await asyncio.gather(
+                self.get_event_count(),
+                self.get_event_count_by_type(),
+                self.get_recent_events(limit=limit),
+                self.get_rejection_count(),
+                self.get_host_breakdown(),
+            )
+        summary = {
+            "count": count,
+            "breakdown": breakdown,
+            "events": events,
+            "rejections": rejections,
+            "hosts": hosts,
+            "as_of": time.time(),
+        }
+        self._summaries[limit] = (time.monotonic(), summary)
+        return summary
 
 
 # Singleton
-delta_reader = DeltaReader()
+delta_reader = DeltaReader()
\ No newline at end of file
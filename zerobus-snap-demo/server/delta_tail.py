@@ -0,0 +1,367 @@
+"""
+Live Delta tail for /ws/delta — rows pushed to dashboards as they land.
+
+GET /api/delta/recent re-sorts the whole table on every poll.  DeltaTailer
+instead keeps a sequence_num mark per producer host and each poll reads only
+rows it has not seen:
+
+    WHERE produced_at > <floor>
+      AND CASE host
+            WHEN 'h1' THEN produced_at >= <since> AND (
+                 sequence_num > <low> AND NOT (sequence_num BETWEEN <a> AND <b> OR ...)
+                 OR produced_at > <newest>)
+            ...
+            ELSE TRUE END
+    ORDER BY sequence_num LIMIT <batch>
+
+Rows do not land in sequence order: each producer shard has a stream of its
+own and the streams commit independently, so seq N may land after N+1.  The
+mark is therefore not the highest sequence read but `low`, below which every
+number is accounted for, plus the runs read above it (a SeqRanges, excluded
+in SQL so nothing is read twice).  A late row fills its hole when it lands.
+A host the tail has just met has no `low` yet, since its earliest rows may
+still be on their way; the runs read so far are all it excludes until the
+first hole wait has passed.
+A hole that stays open DELTA_TAIL_HOLE_WAIT seconds (a failed or rejected
+send, an unused sequence block after a leader change) is given up and
+counted in `skipped`.
+
+The produced_at arm follows a restarted producer whose sequence starts again
+at or below `low`; the host's mark restarts with it, from `since`.  The
+floor (the first poll minus DELTA_TAIL_LOOKBACK) lets Delta skip every file
+older than the tail.  When a full batch shows the tail falling behind, the
+marks jump to the table's newest rows and the rows in between are not
+shown: dashboards see a live sample rather than a backlog that never drains.
+
+Each row carries its end-to-end latency, measured from produced_at to
+  landed_ms   the commit of the Delta file holding it (_metadata.file_modification_time)
+  seen_ms     the poll that read it
+with landed_ms kept in a histogram.  Tables without the _metadata column
+fall back to seen_ms alone.
+
+The tailer polls only while someone is subscribed, and only outside demo
+mode.  Frames are fanned out like /ws/producer (see broadcast.py):
+
+    {"type": "snapshot", "rows": [...], "stats": {...}}   first frame / resync
+    {"type": "rows",     "rows": [...], "stats": {...}}   afterwards
+
+rows newest first; an empty "rows" frame is the keepalive.
+
+Tuning (env):
+    DELTA_TAIL_INTERVAL   seconds between polls             (default 1)
+    DELTA_TAIL_BATCH      rows read per poll at most         (default 500)
+    DELTA_TAIL_LOOKBACK   seconds of history the tail opens with  (default 60)
+    DELTA_TAIL_HOLE_WAIT  seconds a missing sequence_num is waited for  (default 30)
+"""
+
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from functools import partial
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+from .audit import SeqRanges
+from .delta_reader import _table, delta_reader
+from .events import now_us, us_to_iso
+from .metrics import LogHistogram
+
+QueryFn = Callable[[str], Awaitable[List[Dict[str, Any]]]]
+
+_COLUMNS = "event_id, event_type, player_id, card_name, host, sequence_num, produced_at"
+_LANDED = "unix_micros(_metadata.file_modification_time) AS landed_us"
+MAX_HOLES = 256  # open holes per host (one exclusion each in SQL); past it the oldest are given up
+
+
+class _HostMark:
+    """What the tail has read of one producer host's run."""
+
+    def __init__(self, low: Optional[int], since: int, now: float) -> None:
+        # Every sequence_num ≤ low is accounted for.  None until the first hole
+        # wait has passed, so rows of a new host that land late still show.
+        self.low = low
+        self.seen = SeqRanges()   # read above low
+        self.newest = 0           # produced_at µs of the newest row read
+        self.since = since        # produced_at µs where this run begins
+        self.hole_at: Optional[float] = now if low is None else None  # when low + 1 was first missing
+
+    def arm(self) -> str:
+        unseen = "TRUE" if self.low is None else f"sequence_num > {self.low}"
+        if len(self.seen):
+            read = " OR ".join(
+                f"sequence_num BETWEEN {a} AND {b}" for a, b in self.seen.ranges(self.seen.first(), self.seen.last())
+            )
+            unseen += f" AND NOT ({read})"
+        return f"produced_at >= {self.since} AND ({unseen} OR produced_at > {self.newest})"
+
+    def read(self, seq: int) -> bool:
+        return (self.low is not None and seq <= self.low) or seq in self.seen
+
+    def take(self, seq: int, produced: int) -> bool:
+        """Record a row; False if it was already read."""
+        if self.read(seq) or not self.seen.add(seq):
+            return False
+        self.newest = max(self.newest, produced)
+        return True
+
+    def settle(self, now: float, hole_wait: float) -> int:
+        """Advance low over what has been read; returns how many missing numbers were given up."""
+        skipped = 0
+        while len(self.seen):
+            first = self.seen.first()
+            if self.low is None or first > self.low + 1:
+                if self.hole_at is None:
+                    self.hole_at = now
+                if now - self.hole_at < hole_wait and self.seen.runs <= MAX_HOLES:
+                    break
+                if self.low is not None:
+                    skipped += first - self.low - 1  # given up
+            # Through the end of the first run, everything is accounted for
+            self.low = self.seen.ranges(first, self.seen.last())[0][1]
+            self.seen.discard_through(self.low)
+            self.hole_at = None
+        return skipped
+
+
+def _literal(value: str) -> str:
+    return "'" + value.replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+
+class _Client:
+    def __init__(self, queue_size: int) -> None:
+        self.queue: "asyncio.Queue[str]" = asyncio.Queue(maxsize=queue_size)
+        self.needs_snapshot = True
+
+
+class DeltaTailer:
+    def __init__(
+        self,
+        query: QueryFn,
+        table: Callable[[], str],
+        live: Callable[[], bool],
+        interval: float = 1.0,
+        batch: int = 500,
+        lookback: float = 60.0,
+        hole_wait: float = 30.0,
+        backlog: int = 50,
+        queue_size: int = 8,
+    ) -> None:
+        self._query = query
+        self._table = table
+        self._live = live
+        self.interval = interval
+        self.batch = batch
+        self.lookback = lookback
+        self.hole_wait = hole_wait
+        self.queue_size = queue_size
+        self._clients: Dict[WebSocket, _Client] = {}
+        self._task: Optional[asyncio.Task] = None
+
+        self._floor = 0  # produced_at µs; 0 until the first poll
+        self._floor_table = ""
+        self._hosts: Dict[str, _HostMark] = {}
+        self._landed_column = True
+        self.recent: Deque[Dict[str, Any]] = deque(maxlen=backlog)  # newest last
+
+        self.landed_latency = LogHistogram()  # ms, produced_at → Delta commit
+        self.polls = 0
+        self.rows = 0
+        self.catchups = 0
+        self.skipped = 0
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        self.last_query_ms = 0.0
+        self.last_error = ""
+
+    @classmethod
+    def from_env(cls, query: QueryFn, table: Callable[[], str], live: Callable[[], bool]) -> "DeltaTailer":
+        return cls(
+            query, table, live,
+            interval=float(os.environ.get("DELTA_TAIL_INTERVAL", 1)),
+            batch=int(os.environ.get("DELTA_TAIL_BATCH", 500)),
+            lookback=float(os.environ.get("DELTA_TAIL_LOOKBACK", 60)),
+            hole_wait=float(os.environ.get("DELTA_TAIL_HOLE_WAIT", 30)),
+        )
+
+    async def serve(self, websocket: WebSocket) -> None:
+        """Stream frames to an accepted websocket until it disconnects."""
+        client = _Client(self.queue_size)
+        self._clients[websocket] = client
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        self._fan_out([])  # snapshot now, not a poll from now
+        try:
+            while True:
+                text = await client.queue.get()
+                await websocket.send_text(text)
+                self.frames_sent += 1
+        except WebSocketDisconnect:
+            pass
+        except Exception:
+            pass
+        finally:
+            self._clients.pop(websocket, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "live": self._live(),
+            "clients": len(self._clients),
+            "hosts": {h: {"low": m.low, "holes": m.seen.runs} for h, m in self._hosts.items()},
+            "floor": us_to_iso(self._floor) if self._floor else None,
+            "polls": self.polls,
+            "rows": self.rows,
+            "catchups": self.catchups,
+            "skipped": self.skipped,
+            "frames_sent": self.frames_sent,
+            "frames_dropped": self.frames_dropped,
+            "landed_column": self._landed_column,
+            "landed_latency_ms": self.landed_latency.snapshot(),
+            "last_query_ms": round(self.last_query_ms, 1),
+            "last_error": self.last_error,
+        }
+
+    # ── Polling ────────────────────────────────────────────────────────────────
+
+    async def _run(self) -> None:
+        while self._clients:
+            rows: List[Dict[str, Any]] = []
+            if self._live():
+                try:
+                    rows = await self.poll()
+                except Exception as e:
+                    print(f"Delta tail error: {e}")
+            self._fan_out(rows)
+            await asyncio.sleep(self.interval)
+
+    async def poll(self) -> List[Dict[str, Any]]:
+        """Rows landed since the last poll, oldest first."""
+        table = self._table()
+        if table != self._floor_table:
+            self._floor = now_us() - int(self.lookback * 1_000_000)
+            self._floor_table = table
+            self._hosts.clear()
+            self.recent.clear()
+        columns = f"{_COLUMNS}, {_LANDED}" if self._landed_column else _COLUMNS
+        where = f"produced_at > {self._floor}"
+        if self._hosts:
+            arms = " ".join(f"WHEN {_literal(h)} THEN {m.arm()}" for h, m in self._hosts.items())
+            where += f" AND CASE host {arms} ELSE TRUE END"
+
+        self.polls += 1
+        t0 = time.perf_counter()
+        try:
+            raw = await self._query(
+                f"SELECT {columns} FROM {table} WHERE {where} "
+                f"ORDER BY sequence_num LIMIT {self.batch}"
+            )
+        except Exception as e:
+            self.last_error = str(e)[:500]
+            if self._landed_column and "_metadata" in self.last_error:
+                self._landed_column = False  # retried without it next poll
+            raise
+        finally:
+            self.last_query_ms = (time.perf_counter() - t0) * 1000
+        self.last_error = ""
+
+        seen = now_us()
+        now = time.monotonic()
+        rows = [self._row(r, seen) for r in raw if self._take(r, now)]
+        for mark in self._hosts.values():
+            self.skipped += mark.settle(now, self.hole_wait)
+        self.rows += len(rows)
+        self.recent.extend(rows)
+        if len(raw) >= self.batch:
+            await self._catch_up(table)
+        return rows
+
+    def _take(self, r: Dict[str, Any], now: float) -> bool:
+        """Mark a fetched row as read; False for one already shown."""
+        host = r.get("host") or ""
+        seq, produced = int(r.get("sequence_num") or 0), int(r.get("produced_at") or 0)
+        mark = self._hosts.get(host)
+        if mark is None:
+            mark = self._hosts[host] = _HostMark(None, self._floor, now)
+        elif produced > mark.newest and mark.read(seq):
+            # Only the produced_at arm returns these: the producer restarted
+            mark = self._hosts[host] = _HostMark(seq - 1, produced, now)
+        elif produced < mark.since:
+            return True  # a straggler from before a restart; shown, not tracked
+        return mark.take(seq, produced)
+
+    def _row(self, r: Dict[str, Any], seen: int) -> Dict[str, Any]:
+        produced = int(r.get("produced_at") or 0)
+        landed = int(r["landed_us"]) if r.get("landed_us") else 0
+        row = {
+            "event_id": (r.get("event_id") or "")[:8],
+            "event_type": r.get("event_type") or "",
+            "player_id": r.get("player_id") or "",
+            "card_name": r.get("card_name") or "",
+            "host": r.get("host") or "",
+            "sequence_num": int(r.get("sequence_num") or 0),
+            "produced_at": produced,
+            "timestamp": us_to_iso(produced),
+            "landed_ms": round((landed - produced) / 1000, 1) if landed and produced else None,
+            "seen_ms": round((seen - produced) / 1000, 1) if produced else None,
+        }
+        if row["landed_ms"] is not None:
+            self.landed_latency.record(max(0.0, row["landed_ms"]))
+        return row
+
+    async def _catch_up(self, table: str) -> None:
+        """Skip the marks to each host's newest row once a batch comes back full."""
+        rows = await self._query(
+            f"SELECT host, MAX(sequence_num) AS seq, MAX(produced_at) AS ts "
+            f"FROM {table} WHERE produced_at > {self._floor} GROUP BY host"
+        )
+        for r in rows:
+            host = r["host"] or ""
+            previous = self._hosts.get(host)
+            mark = self._hosts[host] = _HostMark(
+                int(r["seq"]), previous.since if previous else self._floor, time.monotonic()
+            )
+            mark.newest = int(r["ts"])
+        self.catchups += 1
+
+    # ── Fan-out ────────────────────────────────────────────────────────────────
+
+    def _fan_out(self, rows: List[Dict[str, Any]]) -> None:
+        stats = {
+            "live": self._live(),
+            "landed_latency_ms": self.landed_latency.snapshot(),
+            "rows": self.rows,
+            "catchups": self.catchups,
+            "skipped": self.skipped,
+            "last_error": self.last_error,
+        }
+        rows_text = _dumps({"type": "rows", "rows": rows[::-1], "stats": stats})
+        snapshot_text = None
+        for client in list(self._clients.values()):
+            if client.needs_snapshot:
+                if snapshot_text is None:
+                    snapshot_text = _dumps({
+                        "type": "snapshot", "rows": list(self.recent)[::-1], "stats": stats,
+                    })
+                text = snapshot_text
+            else:
+                text = rows_text
+            try:
+                client.queue.put_nowait(text)
+                client.needs_snapshot = False
+            except asyncio.QueueFull:
+                self.frames_dropped += 1
+                client.needs_snapshot = True
+
+
+def _dumps(frame: dict) -> str:
+    return json.dumps(frame, separators=(",", ":"), ensure_ascii=False)
+
+
+# Singleton
+delta_tailer = DeltaTailer.from_env(
+    partial(delta_reader._execute_sql, strict=True),
+    _table,
+    lambda: not delta_reader._demo_mode(),
+)
@@ -0,0 +1,215 @@
+"""
+Local stand-in for the Zerobus SDK (load tests and offline development).
+
+Selected with ZEROBUS_FAKE=1, in which case the producer imports these names
+instead of zerobus.sdk.aio and runs its *real-mode* code path (streams, ack
+callbacks, shards, replay) against them — unlike demo mode's _simulate_ack.
+
+Behaviour mirrors what the producer relies on from the SDK:
+  - offsets 0, 1, 2, … per stream, acked in order on a non-asyncio thread
+    via ack_callback.on_ack(offset) / on_error(offset, message); because an
+    ack never overtakes an earlier one, observed latency under load sits
+    toward the top of the latency ± jitter band
+  - ingest_record_nowait() blocks the caller once max_inflight_records are
+    unacked (backpressure), raising if no room frees up within the timeout
+  - flush() waits for every outstanding ack; close() flushes then stops
+
+Tuning (env):
+    ZEROBUS_FAKE_LATENCY_MS       mean ack latency            (default 20)
+    ZEROBUS_FAKE_JITTER_MS        ± uniform jitter            (default 10)
+    ZEROBUS_FAKE_ERROR_RATE       fraction acked via on_error (default 0)
+    ZEROBUS_FAKE_MAX_INFLIGHT     overrides max_inflight_records
+    ZEROBUS_FAKE_CONNECT_MS       create_stream delay         (default 50)
+    ZEROBUS_FAKE_MBPS             per-stream link bandwidth; a record's ack
+                                  waits for its bytes to cross (default 0: unlimited)
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Optional, Tuple
+
+
+@dataclass
+class FakeConfig:
+    latency_ms: float = 20.0
+    jitter_ms: float = 10.0
+    error_rate: float = 0.0
+    max_inflight: Optional[int] = None
+    connect_ms: float = 50.0
+    mbps: float = 0.0
+    backpressure_timeout_s: float = 30.0
+
+    @classmethod
+    def from_env(cls) -> "FakeConfig":
+        max_inflight = os.environ.get("ZEROBUS_FAKE_MAX_INFLIGHT")
+        return cls(
+            latency_ms=float(os.environ.get("ZEROBUS_FAKE_LATENCY_MS", 20)),
+            jitter_ms=float(os.environ.get("ZEROBUS_FAKE_JITTER_MS", 10)),
+            error_rate=float(os.environ.get("ZEROBUS_FAKE_ERROR_RATE", 0)),
+            max_inflight=int(max_inflight) if max_inflight else None,
+            connect_ms=float(os.environ.get("ZEROBUS_FAKE_CONNECT_MS", 50)),
+            mbps=float(os.environ.get("ZEROBUS_FAKE_MBPS", 0)),
+        )
+
+
+# ── SDK surface used by the producer ───────────────────────────────────────────
+
+class RecordType:
+    PROTO = "PROTO"
+    JSON = "JSON"
+
+
+class TableProperties:
+    def __init__(self, table_name: str, descriptor_proto: Optional[bytes] = None) -> None:
+        self.table_name = table_name
+        self.descriptor_proto = descriptor_proto
+
+
+class StreamConfigurationOptions:
+    def __init__(
+        self,
+        record_type: str = RecordType.PROTO,
+        ack_callback: Any = None,
+        recovery: bool = True,
+        recovery_retries: int = 3,
+        max_inflight_records: int = 10000,
+        **_: Any,
+    ) -> None:
+        self.record_type = record_type
+        self.ack_callback = ack_callback
+        self.recovery = recovery
+        self.recovery_retries = recovery_retries
+        self.max_inflight_records = max_inflight_records
+
+
+class AckCallback:
+    def on_ack(self, offset: int) -> None:
+        pass
+
+    def on_error(self, offset: int, error_message: str) -> None:
+        pass
+
+
+class HeadersProvider:
+    def get_headers(self):
+        return []
+
+
+class ZerobusStream:
+    def __init__(self, table: TableProperties, opts: StreamConfigurationOptions, config: FakeConfig) -> None:
+        self.table = table
+        self._cb = opts.ack_callback
+        self._cfg = config
+        self._max_inflight = config.max_inflight or opts.max_inflight_records
+        # (due monotonic time, offset, failed) — due times are non-decreasing
+        self._queue: Deque[Tuple[float, int, bool]] = deque()
+        self._cond = threading.Condition()
+        self._next_offset = 0
+        self._last_due = 0.0
+        self._link_free = 0.0  # when the modelled link finishes sending what it has
+        self._delivering = 0  # popped from the queue, callbacks not yet run
+        self._closed = False
+
+        self.records = 0
+        self.bytes = 0
+        self.backpressure_waits = 0
+
+        self._thread = threading.Thread(target=self._ack_loop, name="fake-zerobus-acks", daemon=True)
+        self._thread.start()
+
+    def ingest_record_nowait(self, payload: bytes) -> None:
+        cfg = self._cfg
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Fake Zerobus: stream is closed")
+            if self._inflight() >= self._max_inflight:
+                self.backpressure_waits += 1
+                ok = self._cond.wait_for(
+                    lambda: self._inflight() < self._max_inflight or self._closed,
+                    timeout=cfg.backpressure_timeout_s,
+                )
+                if not ok or self._closed:
+                    raise RuntimeError("Fake Zerobus: in-flight window full")
+            latency = cfg.latency_ms + random.uniform(-cfg.jitter_ms, cfg.jitter_ms)
+            sent = time.monotonic()
+            if cfg.mbps > 0:
+                # Records cross the link one after another at cfg.mbps
+                sent = self._link_free = max(self._link_free, sent) + len(payload) * 8 / (cfg.mbps * 1e6)
+            # Acks are delivered in offset order, like the real WAL commit
+            due = max(self._last_due, sent + max(0.0, latency) / 1000)
+            failed = cfg.error_rate > 0 and random.random() < cfg.error_rate
+            self._queue.append((due, self._next_offset, failed))
+            self._next_offset += 1
+            self._last_due = due
+            self.records += 1
+            self.bytes += len(payload)
+            if len(self._queue) == 1:
+                self._cond.notify_all()
+
+    async def flush(self) -> None:
+        await asyncio.to_thread(self._wait_drained)
+
+    async def close(self) -> None:
+        await self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def _inflight(self) -> int:
+        return len(self._queue) + self._delivering
+
+    def _wait_drained(self) -> None:
+        with self._cond:
+            self._cond.wait_for(lambda: not self._inflight() or self._closed)
+
+    def _ack_loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if self._closed and not self._queue:
+                    return
+                delay = self._queue[0][0] - time.monotonic()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+                now = time.monotonic()
+                batch = []
+                while self._queue and self._queue[0][0] <= now:
+                    batch.append(self._queue.popleft())
+                self._delivering = len(batch)
+            # Callbacks run outside the lock, as the SDK's do on its own thread
+            for _, offset, failed in batch:
+                try:
+                    if failed:
+                        self._cb.on_error(offset, "Fake Zerobus: simulated ingest error")
+                    else:
+                        self._cb.on_ack(offset)
+                except Exception as e:
+                    print(f"Fake Zerobus ack callback error: {e}")
+            with self._cond:
+                self._delivering = 0
+                self._cond.notify_all()
+
+
+class ZerobusSdk:
+    def __init__(self, host: str, unity_catalog_url: str, config: Optional[FakeConfig] = None) -> None:
+        self.host = host
+        self.unity_catalog_url = unity_catalog_url
+        self.config = config or FakeConfig.from_env()
+
+    async def create_stream(
+        self,
+        client_id: str,
+        client_secret: str,
+        table_properties: TableProperties,
+        options: StreamConfigurationOptions,
+        headers_provider: Optional[HeadersProvider] = None,
+    ) -> ZerobusStream:
+        await asyncio.sleep(self.config.connect_ms / 1000)
+        return ZerobusStream(table_properties, options, self.config)
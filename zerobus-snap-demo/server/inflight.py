@@ -0,0 +1,99 @@
+"""
+In-flight event store — events sent to Zerobus but not yet WAL-acked.
+
+Entries live in an OrderedDict keyed by sequence_num (insertion order is send
+order).  Insert, ack by sequence_num and oldest-first pop are all O(1), and
+iteration is oldest-first so resume() replays in the original send order.
+Both modes ack by sequence_num, so there is no secondary event_id index.
+
+The Rust SDK delivers acks on its own thread, so every mutation takes a lock.
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from .events import EventRecord
+
+
+def _sizeof_event(event: EventRecord) -> int:
+    """
+    Approximate bytes retained by one event: the record plus the values unique
+    to it.  Interned strings and the batch-shared timestamp are not counted.
+    """
+    return (
+        sys.getsizeof(event)
+        + sys.getsizeof(event.event_id)
+        + sys.getsizeof(event.payload)
+        + sys.getsizeof(event.sequence_num)
+        + sys.getsizeof(event.sent_ns)
+    )
+
+
+class InFlightBuffer:
+    def __init__(self) -> None:
+        self._events: "OrderedDict[int, Tuple[EventRecord, int]]" = OrderedDict()
+        self._event_bytes: int = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def add(self, event: EventRecord) -> None:
+        seq = event.sequence_num
+        size = _sizeof_event(event)
+        with self._lock:
+            old = self._events.pop(seq, None)
+            if old is not None:
+                self._event_bytes -= old[1]
+            self._events[seq] = (event, size)
+            self._event_bytes += size
+
+    def ack(self, seq: int) -> Optional[EventRecord]:
+        """Remove and return the event with this sequence_num (None if unknown)."""
+        with self._lock:
+            entry = self._events.pop(seq, None)
+            if entry is None:
+                return None
+            return self._forget(entry)
+
+    def pop_oldest(self) -> Optional[EventRecord]:
+        with self._lock:
+            if not self._events:
+                return None
+            _, entry = self._events.popitem(last=False)
+            return self._forget(entry)
+
+    def oldest_sent_ns(self) -> int:
+        """perf_counter_ns when the oldest retained event was ingested (0 if none)."""
+        with self._lock:
+            for event, _ in self._events.values():
+                return event.sent_ns
+        return 0
+
+    def snapshot(self) -> List[EventRecord]:
+        """Oldest-first copy of the retained events (safe against concurrent acks)."""
+        with self._lock:
+            return [event for event, _ in self._events.values()]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._events.clear()
+            self._event_bytes = 0
+
+    def footprint(self) -> dict:
+        """Estimated memory held by the buffer, including its index structures."""
+        with self._lock:
+            count = len(self._events)
+            total = self._event_bytes + sys.getsizeof(self._events)
+        return {
+            "count": count,
+            "bytes": total,
+            "bytes_per_event": round(total / count) if count else 0,
+        }
+
+    def _forget(self, entry: Tuple[EventRecord, int]) -> EventRecord:
+        event, size = entry
+        self._event_bytes -= size
+        return event
@@ -0,0 +1,266 @@
+"""
+Declarative load profiles for the producer's rate controller.
+
+A profile is a list of segments, each a JSON object with a "type":
+
+    {"type": "constant", "rate": 200, "duration": 30}
+    {"type": "ramp", "from": 50, "to": 2000, "duration": 60}
+    {"type": "step", "rates": [100, 500, 1000], "step_seconds": 10}
+    {"type": "sine", "base": 500, "amplitude": 400, "period": 60, "duration": 300}
+    {"type": "poisson", "rate": 300, "duration": 60,
+     "burst_rate": 3000, "burst_every": 15, "burst_seconds": 2}
+    {"type": "trace", "rates": [120, 180, 95, ...], "interval": 1.0, "interpolate": false}
+
+"step" expands into one constant segment per step so each is reported on its
+own.  "sine" compresses a diurnal curve into `period` seconds.  "poisson"
+draws the arrivals in each tick from a Poisson distribution around `rate`,
+optionally switching to `burst_rate` for `burst_seconds` at exponentially
+distributed intervals averaging `burst_every` seconds.  "trace" replays a
+recorded per-interval rate series.
+
+The runner (ProducerManager.start_profile) re-evaluates rate_at() every
+PROFILE_TICK seconds and keeps a planned-vs-achieved report per segment.
+"""
+
+import math
+import random
+from typing import Any, Dict, List, Optional
+
+PROFILE_TICK = 0.1
+MAX_PROFILE_RATE = 1_000_000
+
+
+class Segment:
+    kind = "segment"
+
+    def __init__(self, duration: float) -> None:
+        if duration <= 0:
+            raise ValueError(f"{self.kind}: duration must be > 0")
+        self.duration = float(duration)
+
+    def reset(self) -> None:
+        """Called at the start of every pass (profiles may loop)."""
+
+    def rate_at(self, t: float, dt: float) -> float:
+        raise NotImplementedError
+
+    def describe(self) -> Dict[str, Any]:
+        return {"type": self.kind, "duration_s": self.duration}
+
+
+class Constant(Segment):
+    kind = "constant"
+
+    def __init__(self, rate: float, duration: float) -> None:
+        super().__init__(duration)
+        self.rate = _rate(rate, "rate")
+
+    def rate_at(self, t: float, dt: float) -> float:
+        return self.rate
+
+
+class Ramp(Segment):
+    kind = "ramp"
+
+    def __init__(self, start: float, end: float, duration: float) -> None:
+        super().__init__(duration)
+        self.start = _rate(start, "from")
+        self.end = _rate(end, "to")
+
+    def rate_at(self, t: float, dt: float) -> float:
+        return self.start + (self.end - self.start) * min(1.0, t / self.duration)
+
+
+class Sine(Segment):
+    kind = "sine"
+
+    def __init__(self, base: float, amplitude: float, period: float, duration: float) -> None:
+        super().__init__(duration)
+        if period <= 0:
+            raise ValueError("sine: period must be > 0")
+        self.base = _rate(base, "base")
+        self.amplitude = _rate(amplitude, "amplitude")
+        if self.base + self.amplitude > MAX_PROFILE_RATE:
+            raise ValueError(f"sine: base + amplitude must be at most {MAX_PROFILE_RATE}")
+        self.period = float(period)
+
+    def rate_at(self, t: float, dt: float) -> float:
+        return max(0.0, self.base + self.amplitude * math.sin(2 * math.pi * t / self.period))
+
+
+class Poisson(Segment):
+    kind = "poisson"
+
+    def __init__(
+        self,
+        rate: float,
+        duration: float,
+        burst_rate: float = 0.0,
+        burst_every: float = 0.0,
+        burst_seconds: float = 1.0,
+    ) -> None:
+        super().__init__(duration)
+        self.rate = _rate(rate, "rate")
+        self.burst_rate = _rate(burst_rate, "burst_rate")
+        self.burst_every = float(burst_every)
+        self.burst_seconds = float(burst_seconds)
+        self.reset()
+
+    def reset(self) -> None:
+        self._burst_until = -1.0
+        self._next_burst = self._draw_gap(0.0)
+
+    def _draw_gap(self, t: float) -> float:
+        if self.burst_rate <= 0 or self.burst_every <= 0:
+            return math.inf
+        return t + random.expovariate(1.0 / self.burst_every)
+
+    def rate_at(self, t: float, dt: float) -> float:
+        if t >= self._next_burst:
+            self._burst_until = t + self.burst_seconds
+            self._next_burst = self._draw_gap(self._burst_until)
+        mean = self.burst_rate if t < self._burst_until else self.rate
+        return _poisson(mean * dt) / dt if dt > 0 else mean
+
+
+class Trace(Segment):
+    kind = "trace"
+
+    def __init__(self, rates: List[float], interval: float = 1.0, interpolate: bool = False) -> None:
+        if not rates:
+            raise ValueError("trace: rates must not be empty")
+        if interval <= 0:
+            raise ValueError("trace: interval must be > 0")
+        super().__init__(len(rates) * float(interval))
+        self.rates = [_rate(r, "rates[]") for r in rates]
+        self.interval = float(interval)
+        self.interpolate = interpolate
+
+    def rate_at(self, t: float, dt: float) -> float:
+        pos = t / self.interval
+        i = min(int(pos), len(self.rates) - 1)
+        if not self.interpolate or i + 1 >= len(self.rates):
+            return self.rates[i]
+        frac = pos - i
+        return self.rates[i] + (self.rates[i + 1] - self.rates[i]) * frac
+
+
+# ── Parsing ────────────────────────────────────────────────────────────────────
+
+def parse_segments(specs: List[Dict[str, Any]]) -> List[Segment]:
+    """Build segments from their JSON specs.  Raises ValueError on bad input."""
+    if not specs:
+        raise ValueError("profile needs at least one segment")
+    out: List[Segment] = []
+    for i, spec in enumerate(specs):
+        kind = spec.get("type")
+        try:
+            if kind == "constant":
+                out.append(Constant(spec["rate"], spec["duration"]))
+            elif kind == "ramp":
+                out.append(Ramp(spec["from"], spec["to"], spec["duration"]))
+            elif kind == "step":
+                step_s, rates = spec["step_seconds"], spec["rates"]
+                if not rates:
+                    raise ValueError("rates must not be empty")
+                out.extend(Constant(r, step_s) for r in rates)
+            elif kind == "sine":
+                out.append(Sine(spec["base"], spec["amplitude"], spec["period"], spec["duration"]))
+            elif kind == "poisson":
+                out.append(Poisson(
+                    spec["rate"], spec["duration"],
+                    burst_rate=spec.get("burst_rate", 0.0),
+                    burst_every=spec.get("burst_every", 0.0),
+                    burst_seconds=spec.get("burst_seconds", 1.0),
+                ))
+            elif kind == "trace":
+                out.append(Trace(spec["rates"], spec.get("interval", 1.0), bool(spec.get("interpolate", False))))
+            else:
+                raise ValueError(f"unknown segment type {kind!r}")
+        except KeyError as e:
+            raise ValueError(f"segment {i} ({kind}): missing field {e.args[0]!r}") from None
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"segment {i} ({kind}): {e}") from None
+    if not out:
+        raise ValueError("profile needs at least one segment")
+    return out
+
+
+class LoadProfile:
+    """Segments plus the planned-vs-achieved report the runner fills in."""
+
+    def __init__(self, segments: List[Segment], loop: bool = False, name: str = "custom") -> None:
+        self.segments = segments
+        self.loop = loop
+        self.name = name
+        self.active = False
+        self.current: Optional[int] = None
+        self.iteration = 0
+        self.report: List[Dict[str, Any]] = []
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(seg.duration for seg in self.segments)
+
+    def begin_segment(self, index: int) -> Dict[str, Any]:
+        entry = {
+            **self.segments[index].describe(),
+            "index": index,
+            "iteration": self.iteration,
+            "status": "running",
+            "elapsed_s": 0.0,
+            "planned_events": 0,
+            "achieved_events": 0,
+            "planned_rate": 0.0,
+            "achieved_rate": 0.0,
+            "error_pct": 0.0,
+        }
+        self.current = index
+        self.report.append(entry)
+        if len(self.report) > 200:  # looping profiles: keep the recent history
+            self.report = self.report[-200:]
+        return entry
+
+    @staticmethod
+    def update_entry(entry: Dict[str, Any], elapsed: float, planned: float, achieved: int) -> None:
+        entry["elapsed_s"] = round(elapsed, 2)
+        entry["planned_events"] = round(planned)
+        entry["achieved_events"] = achieved
+        if elapsed > 0:
+            entry["planned_rate"] = round(planned / elapsed, 1)
+            entry["achieved_rate"] = round(achieved / elapsed, 1)
+        if planned > 0:
+            entry["error_pct"] = round((achieved - planned) / planned * 100, 2)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "active": self.active,
+            "loop": self.loop,
+            "iteration": self.iteration,
+            "current_segment": self.current,
+            "segment_count": len(self.segments),
+            "total_s": round(self.total_seconds, 1),
+            "segments": list(self.report[-50:]),
+        }
+
+
+def _rate(value: Any, name: str) -> float:
+    rate = float(value)
+    if not 0 <= rate <= MAX_PROFILE_RATE:  # also rejects NaN
+        raise ValueError(f"{name} must be between 0 and {MAX_PROFILE_RATE}")
+    return rate
+
+
+def _poisson(mean: float) -> int:
+    if mean <= 0:
+        return 0
+    if mean > 30:
+        # Normal approximation — plenty accurate at these means, and O(1)
+        return max(0, round(random.gauss(mean, math.sqrt(mean))))
+    threshold, k, p = math.exp(-mean), 0, 1.0
+    while True:
+        p *= random.random()
+        if p <= threshold:
+            return k
+        k += 1
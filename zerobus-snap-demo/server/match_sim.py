@@ -0,0 +1,227 @@
+"""
+Stateful match simulator — coherent Marvel Snap matches as an event source.
+
+make_events() draws event_type, match_id and result independently, so the
+Delta table never holds a match that starts, is played and ends.
+MatchSimulator keeps `matches` concurrent matches as NumPy arrays and, on
+each take(), advances a random subset of them by one event each:
+
+    match_started   × 2   one per player, result "pending"
+    card_played     × k   players alternate, location 1–3; 1–3 plays per turn
+    snap_triggered  ≤ 2   each player may snap once from turn 2, doubling
+                          the stake (snap_cubes 1 → 2 → 4)
+    match_ended     × 2   win / loss, the stake doubled at the final turn;
+                          or retreat for a player who quits early (stake as is)
+
+A finished slot immediately starts a new match with fresh players, so the
+number of live matches stays constant.  Picking slots at random makes each
+match's inter-event gaps roughly exponential and interleaves matches the way
+a busy backend does; every match starts with its match_started pair, so
+right after start-up the mix is mostly match_started until the first events
+of every slot are out.
+
+All state transitions are vectorized; only the final EventRecord and
+protobuf construction runs per event, as in make_events().  Match and
+player ids are unique per simulator run (prefixed with a random run tag) so
+matches from different runs never merge in aggregates.  Player ids are
+drawn from a pool of `players` (default 2 × matches), not kept exclusive to
+one live match.
+"""
+
+import os
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .events import (
+    _HOSTNAME, CARD_NAMES, EVENT_TYPES, RESULTS, EventRecord, GameEventProto, _uuid4_batch, now_us,
+)
+
+MAX_MATCHES = 1_000_000
+TURNS = 6
+
+# Indices into EVENT_TYPES / RESULTS
+_STARTED, _PLAYED, _SNAP, _ENDED = range(4)
+_WIN, _LOSS, _RETREAT, _PENDING = range(4)
+
+# Slot stages: start (player a, b) → playing → end (player a, b) → new match
+_START_A, _START_B, _PLAYING, _END_A, _END_B = range(5)
+
+
+class MatchSimulator:
+    def __init__(
+        self,
+        matches: int = 10_000,
+        players: int = 0,
+        snap_prob: float = 0.06,
+        retreat_prob: float = 0.04,
+        seed: Optional[int] = None,
+    ) -> None:
+        if not 1 <= matches <= MAX_MATCHES:
+            raise ValueError(f"matches must be between 1 and {MAX_MATCHES:,}")
+        self.matches = matches
+        self.players = max(2, players or 2 * matches)
+        self.snap_prob = snap_prob        # per play event, for a player who hasn't snapped
+        self.retreat_prob = retreat_prob  # per completed turn
+        self._rng = np.random.default_rng(seed)
+        self._run = os.urandom(2).hex()
+        self._next_match = 0
+
+        m = matches
+        self.stage = np.zeros(m, np.int8)
+        self.match_no = np.empty(m, np.int64)
+        self.player = np.empty((2, m), np.int64)  # player index of side a / b
+        self.turn = np.zeros(m, np.int8)
+        self.plays_left = np.zeros(m, np.int8)
+        self.plays = np.zeros(m, np.int16)
+        self.snaps = np.zeros(m, np.int8)   # bit per side
+        self.stake = np.ones(m, np.int8)    # snap_cubes
+        self.winner = np.zeros(m, np.int8)
+        self.retreat = np.zeros(m, np.bool_)
+        self._new_matches(np.arange(m))
+
+        self.events = 0
+        self.matches_completed = 0
+        self.retreats = 0
+        self.snaps_triggered = 0
+
+    def take(self, start_seq: int, n: int) -> List[EventRecord]:
+        """The next n events of the simulation, numbered from start_seq."""
+        events: List[EventRecord] = []
+        while len(events) < n:
+            # A slot advances at most once per step, so steps are ≤ matches events
+            k = min(n - len(events), self.matches)
+            events.extend(self._step(start_seq + len(events), k))
+        return events
+
+    def stats(self) -> Dict[str, Any]:
+        stages = np.bincount(self.stage, minlength=5)
+        return {
+            "matches": self.matches,
+            "players": self.players,
+            "events": self.events,
+            "matches_started": self._next_match,
+            "matches_completed": self.matches_completed,
+            "retreats": self.retreats,
+            "snaps": self.snaps_triggered,
+            "starting": int(stages[_START_A] + stages[_START_B]),
+            "playing": int(stages[_PLAYING]),
+            "ending": int(stages[_END_A] + stages[_END_B]),
+        }
+
+    # ── Simulation ─────────────────────────────────────────────────────────────
+
+    def _new_matches(self, idx: np.ndarray) -> None:
+        """(Re)start the matches in slots idx with fresh ids and players."""
+        k = len(idx)
+        rng = self._rng
+        self.match_no[idx] = np.arange(self._next_match, self._next_match + k)
+        self._next_match += k
+        a = rng.integers(0, self.players, k)
+        self.player[0, idx] = a
+        self.player[1, idx] = (a + rng.integers(1, self.players, k)) % self.players  # ≠ a
+        self.stage[idx] = _START_A
+        self.turn[idx] = 0
+        self.plays[idx] = 0
+        self.snaps[idx] = 0
+        self.stake[idx] = 1
+        self.retreat[idx] = False
+
+    def _step(self, start_seq: int, n: int) -> List[EventRecord]:
+        rng = self._rng
+        idx = rng.choice(self.matches, n, replace=False) if n < self.matches else rng.permutation(n)
+        stage = self.stage[idx]
+
+        starting = stage <= _START_B
+        ending = stage >= _END_A
+        playing = stage == _PLAYING
+        who = rng.integers(0, 2, n).astype(np.int8)
+        snap = (
+            playing & (self.turn[idx] >= 2) & (rng.random(n) < self.snap_prob)
+            & (((self.snaps[idx] >> who) & 1) == 0)
+        )
+        played = playing & ~snap
+
+        # Which side acts: the stage for start/end pairs, alternating plays
+        side = np.where(starting, stage - _START_A, np.where(ending, stage - _END_A, 0)).astype(np.int8)
+        side = np.where(snap, who, side)
+        side = np.where(played, self.plays[idx] & 1, side)
+
+        etype = np.full(n, _STARTED, np.int8)
+        etype[played] = _PLAYED
+        etype[snap] = _SNAP
+        etype[ending] = _ENDED
+        location = np.where(played, rng.integers(1, 4, n), 0)
+        card = rng.integers(0, len(CARD_NAMES), n)
+
+        # Snaps raise the stake before their own event reports it
+        snap_idx = idx[snap]
+        self.snaps[snap_idx] |= (1 << who[snap]).astype(np.int8)
+        self.stake[snap_idx] *= 2
+        self.snaps_triggered += len(snap_idx)
+
+        result = np.full(n, _PENDING, np.int8)
+        won = side == self.winner[idx]
+        result[ending] = np.where(won, _WIN, np.where(self.retreat[idx], _RETREAT, _LOSS))[ending]
+        cubes = self.stake[idx].copy()
+        player = self.player[side, idx]
+        match_no = self.match_no[idx]
+
+        self._advance(idx, stage, played)
+        self.events += n
+        return self._build(start_seq, etype, player, match_no, card, location, cubes, result)
+
+    def _advance(self, idx: np.ndarray, stage: np.ndarray, played: np.ndarray) -> None:
+        rng = self._rng
+        # match_started pair: after the second one, turn 1 begins
+        self.stage[idx[stage == _START_A]] = _START_B
+        opening = idx[stage == _START_B]
+        self.stage[opening] = _PLAYING
+        self.turn[opening] = 1
+        self.plays_left[opening] = rng.integers(1, 4, len(opening))
+
+        # card_played: count down the turn's plays; a finished turn may end the match
+        p = idx[played]
+        self.plays[p] += 1
+        self.plays_left[p] -= 1
+        done = p[self.plays_left[p] <= 0]
+        self.turn[done] += 1
+        self.plays_left[done] = rng.integers(1, 4, len(done))
+        quit_ = rng.random(len(done)) < self.retreat_prob
+        last = self.turn[done] > TURNS
+        over = done[last | quit_]
+        self.stage[over] = _END_A
+        self.winner[over] = rng.integers(0, 2, len(over))
+        self.stake[done[last & ~quit_]] *= 2  # played to the end: the final-turn doubling
+        self.retreat[done[quit_]] = True      # the loser retreats, keeping the stake as is
+        self.retreats += int(quit_.sum())
+
+        # match_ended pair: after the second one the slot hosts a new match
+        self.stage[idx[stage == _END_A]] = _END_B
+        finished = idx[stage == _END_B]
+        if len(finished):
+            self.matches_completed += len(finished)
+            self._new_matches(finished)
+
+    def _build(self, start_seq, etype, player, match_no, card, location, cubes, result) -> List[EventRecord]:
+        n = len(etype)
+        ts = now_us()
+        ids = _uuid4_batch(n)
+        run = self._run
+        events = []
+        for i, (t, p, m, c, loc, cube, res) in enumerate(zip(
+            etype.tolist(), player.tolist(), match_no.tolist(), card.tolist(),
+            location.tolist(), cubes.tolist(), result.tolist(),
+        )):
+            seq = start_seq + i
+            et, card_name, r = EVENT_TYPES[t], CARD_NAMES[c], RESULTS[res]
+            player_id, match_id = f"player_{run}_{p:06d}", f"match_{run}_{m:07d}"
+            payload = GameEventProto(
+                event_id=ids[i], event_type=et, player_id=player_id, match_id=match_id,
+                card_name=card_name, location=loc, snap_cubes=cube, result=r,
+                produced_at=ts, ingested_at=ts, host=_HOSTNAME, sequence_num=seq,
+            ).SerializeToString()
+            events.append(EventRecord(
+                ids[i], et, player_id, match_id, card_name, loc, cube, r, ts, ts, _HOSTNAME, seq, payload,
+            ))
+        return events
@@ -0,0 +1,162 @@
+"""
+Fixed-memory latency histograms and rolling throughput series.
+
+LogHistogram buckets values on a log2 scale (8 buckets per doubling, ~9%
+relative error) between `lo` and `hi`, so recording is O(1) and memory is a
+few hundred ints regardless of how many events flow through.  Acks arrive on
+the Rust SDK thread, so recording takes a lock.
+
+The prometheus_* helpers render the Prometheus text exposition format
+(version 0.0.4) for the /metrics route.
+"""
+
+import math
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Prometheus `le` bounds in seconds for exported histograms
+PROM_BUCKETS_S = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class LogHistogram:
+    def __init__(self, lo: float = 0.01, hi: float = 600_000.0, per_octave: int = 8) -> None:
+        self.lo = lo
+        self.per_octave = per_octave
+        self._n = int(math.ceil(math.log2(hi / lo) * per_octave)) + 2
+        self._counts = [0] * self._n
+        self._lock = threading.Lock()
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def _index(self, value: float) -> int:
+        if value <= self.lo:
+            return 0
+        i = int(math.log2(value / self.lo) * self.per_octave) + 1
+        return i if i < self._n else self._n - 1
+
+    def upper_bound(self, i: int) -> float:
+        return self.lo * 2 ** (i / self.per_octave)
+
+    def record(self, value: float) -> None:
+        i = self._index(value)
+        with self._lock:
+            self._counts[i] += 1
+            self.count += 1
+            self.sum += value
+            if value > self.max:
+                self.max = value
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts = [0] * self._n
+            self.count = 0
+            self.sum = 0.0
+            self.max = 0.0
+
+    def percentile(self, q: float) -> float:
+        with self._lock:
+            counts, total, vmax = list(self._counts), self.count, self.max
+        return self._percentile(counts, total, vmax, q)
+
+    def _percentile(self, counts: List[int], total: int, vmax: float, q: float) -> float:
+        if not total:
+            return 0.0
+        rank = q * total
+        seen = 0
+        for i, c in enumerate(counts):
+            seen += c
+            if seen >= rank:
+                return min(self.upper_bound(i), vmax)
+        return vmax
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts, total, vsum, vmax = list(self._counts), self.count, self.sum, self.max
+        return {
+            "count": total,
+            "mean": round(vsum / total, 2) if total else 0.0,
+            "p50": round(self._percentile(counts, total, vmax, 0.50), 2),
+            "p95": round(self._percentile(counts, total, vmax, 0.95), 2),
+            "p99": round(self._percentile(counts, total, vmax, 0.99), 2),
+            "max": round(vmax, 2),
+        }
+
+    def cumulative(self, bounds: Iterable[float]) -> Tuple[List[Tuple[float, int]], int, float]:
+        """
+        Cumulative counts at each bound (same unit as recorded values), plus the
+        total count and sum.  A log bucket is counted under a bound once its
+        upper edge is within it, so counts are accurate to bucket resolution.
+        """
+        with self._lock:
+            counts, total, vsum = list(self._counts), self.count, self.sum
+        out = []
+        i, seen = 0, 0
+        for bound in bounds:
+            while i < self._n and self.upper_bound(i) <= bound:
+                seen += counts[i]
+                i += 1
+            out.append((bound, seen))
+        return out, total, vsum
+
+
+class RollingSeries:
+    """Per-second counts over the last `window` seconds, in a ring buffer."""
+
+    def __init__(self, window: int = 60) -> None:
+        self.window = window
+        self._stamps = [0] * window
+        self._counts = [0] * window
+        self._lock = threading.Lock()
+
+    def add(self, n: int = 1, now: Optional[float] = None) -> None:
+        sec = int(now if now is not None else time.time())
+        idx = sec % self.window
+        with self._lock:
+            if self._stamps[idx] != sec:
+                self._stamps[idx] = sec
+                self._counts[idx] = 0
+            self._counts[idx] += n
+
+    def series(self, now: Optional[float] = None) -> List[int]:
+        """Completed seconds, oldest first (the current partial second is excluded)."""
+        sec = int(now if now is not None else time.time())
+        out = []
+        with self._lock:
+            for s in range(sec - self.window + 1, sec):
+                idx = s % self.window
+                out.append(self._counts[idx] if self._stamps[idx] == s else 0)
+        return out
+
+
+# ── Prometheus text format ─────────────────────────────────────────────────────
+
+def _labels(labels: Optional[Dict[str, str]]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}"
+
+
+def prometheus_metric(
+    name: str,
+    kind: str,
+    help_text: str,
+    samples: Iterable[Tuple[Optional[Dict[str, str]], float]],
+) -> str:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        lines.append(f"{name}{_labels(labels)} {value}")
+    return "\n".join(lines)
+
+
+def prometheus_histogram(name: str, help_text: str, hist: LogHistogram, scale: float = 1e-3) -> str:
+    """Render a histogram; `scale` converts recorded units to exported ones (ms → s)."""
+    bounds, total, vsum = hist.cumulative(b / scale for b in PROM_BUCKETS_S)
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for bound, seen in bounds:
+        lines.append(f'{name}_bucket{{le="{bound * scale:g}"}} {seen}')
+    lines.append(f'{name}_bucket{{le="+Inf"}} {total}')
+    lines.append(f"{name}_sum {vsum * scale:.6f}")
+    lines.append(f"{name}_count {total}")
+    return "\n".join(lines)
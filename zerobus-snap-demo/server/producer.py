@@ -21,16 +21,16 @@ SDK API (v1.0.0):
 
 import asyncio
 import json
-import socket
-import uuid
+import os
 import time
 import random
+import zlib
 import urllib.request
 import urllib.parse
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Optional, List, Dict, Any
-from datetime import datetime, timezone
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 # Real SDK (optional — falls back to demo mode if unavailable or Unimplemented)
 ZEROBUS_SDK_AVAILABLE = False
@@ -47,70 +47,38 @@ try:
 except Exception as _e:
     ZEROBUS_IMPORT_ERROR = str(_e)
 
-# ── Protobuf schema for game_events ───────────────────────────────────────────
-# Self-contained descriptor (no external dependencies — Zerobus requirement).
-# Timestamps are INT64 unix microseconds (Delta table uses BIGINT columns).
-from google.protobuf import descriptor_pool as _dp, message_factory as _mf
-from google.protobuf.descriptor_pb2 import FileDescriptorProto as _FDP, FieldDescriptorProto as _FldDP
-
-_file_proto = _FDP()
-_file_proto.name = "game_events.proto"
-_file_proto.syntax = "proto3"
-_msg = _file_proto.message_type.add()
-_msg.name = "GameEvent"
-for _name, _num, _type in [
-    ("event_id",     1,  _FldDP.TYPE_STRING),
-    ("event_type",   2,  _FldDP.TYPE_STRING),
-    ("player_id",    3,  _FldDP.TYPE_STRING),
-    ("match_id",     4,  _FldDP.TYPE_STRING),
-    ("card_name",    5,  _FldDP.TYPE_STRING),
-    ("location",     6,  _FldDP.TYPE_INT32),
-    ("snap_cubes",   7,  _FldDP.TYPE_INT32),
-    ("result",       8,  _FldDP.TYPE_STRING),
-    ("produced_at",  9,  _FldDP.TYPE_INT64),   # unix microseconds
-    ("ingested_at",  10, _FldDP.TYPE_INT64),   # unix microseconds
-    ("host",         11, _FldDP.TYPE_STRING),
-    ("sequence_num", 12, _FldDP.TYPE_INT64),
-]:
-    _f = _msg.field.add()
-    _f.name, _f.number, _f.type = _name, _num, _type
-    _f.label = _FldDP.LABEL_OPTIONAL
-_dp.Default().Add(_file_proto)
-GameEventProto = _mf.GetMessageClass(_dp.Default().FindMessageTypeByName("GameEvent"))
-GAME_EVENT_DESCRIPTOR_BYTES = _file_proto.SerializeToString()
-
-
-def _make_proto_payload(event: dict) -> bytes:
-    """Serialize a game event dict as a protobuf GameEvent."""
-    from datetime import datetime, timezone
-
-    def _to_us(iso_str: str) -> int:
-        try:
-            dt = datetime.fromisoformat(iso_str.replace("Z", "+00:00"))
-            return int(dt.timestamp() * 1_000_000)
-        except Exception:
-            return int(datetime.now(timezone.utc).timestamp() * 1_000_000)
-
-    return GameEventProto(
-        event_id=event.get("event_id", ""),
-        event_type=event.get("event_type", ""),
-        player_id=event.get("player_id", ""),
-        match_id=event.get("match_id", ""),
-        card_name=event.get("card_name", ""),
-        location=int(event.get("location", 0)),
-        snap_cubes=int(event.get("snap_cubes", 0)),
-        result=event.get("result", ""),
-        produced_at=_to_us(event.get("produced_at", "")),
-        ingested_at=_to_us(event.get("ingested_at", "")),
-        host=event.get("host", ""),
-        sequence_num=int(event.get("sequence_num", 0)),
-    ).SerializeToString()
-
-import os
-from .config import get_zerobus_config, get_workspace_client
+# Local stand-in: same real-mode code path, no Zerobus endpoint needed
+ZEROBUS_FAKE = bool(os.environ.get("ZEROBUS_FAKE"))
+if ZEROBUS_FAKE:
+    from .fake_zerobus import (  # type: ignore[assignment]
+        ZerobusSdk, ZerobusStream,
+        HeadersProvider,
+        TableProperties, StreamConfigurationOptions, RecordType,
+        AckCallback,
+    )
 
-# Hostname of this producer instance — included in every event
-_HOSTNAME = socket.gethostname()
+    ZEROBUS_SDK_AVAILABLE = True
+    ZEROBUS_IMPORT_ERROR = ""
+
+from .config import get_cluster_dir, get_zerobus_config, get_workspace_client
+from .events import (
+    GAME_EVENT_SCHEMA, EVENT_COLORS, _HOSTNAME,
+    EventRecord, event_from_payload, make_events, now_us, _make_proto_payload, us_to_iso,
+)
+from .ack_scheduler import AckScheduler
+from .audit import DeliveryAudit
+from .compact import COMPACT_SCHEMA, DIMS_SCHEMA, DimensionWriter, compact_dictionary
+from .inflight import InFlightBuffer
+from .load_profile import PROFILE_TICK, Constant, LoadProfile
+from .match_sim import MatchSimulator
+from .metrics import LogHistogram, RollingSeries
+from .pacer import TokenBucketPacer
+from .rate_control import AimdThrottle
+from .recorded_source import RecordedEventSource
+from .schemas import TableSchema, schema_registry
+from .token_cache import TokenCache
+from .wal import WriteAheadLog
+from .workers import EventWorkerPool
 
 
 # ── Constants ──────────────────────────────────────────────────────────────────
@@ -122,34 +90,20 @@ class ProducerState(str, Enum):
     RECONNECTING = "RECONNECTING"
 
 
-CARD_NAMES = [
-    "Iron Man", "Wolverine", "Spider-Man", "Thor", "Hulk",
-    "Doctor Doom", "Galactus", "Silver Surfer", "Magneto", "Black Panther",
-    "Deadpool", "Thanos", "Captain America", "Venom", "Ghost Rider",
-    "Storm", "Electro", "Onslaught", "Hela", "Knull",
-    "Wong", "Spectrum", "Mystique", "Loki", "Moon Knight",
-]
-
-EVENT_TYPES = ["match_started", "card_played", "snap_triggered", "match_ended"]
-
-EVENT_COLORS: Dict[str, str] = {
-    "match_started": "cyan",
-    "card_played": "gold",
-    "snap_triggered": "purple",
-    "match_ended": "green",
-}
-
-PLAYERS = [f"player_{i:04d}" for i in range(1, 51)]
-MATCHES = [f"match_{i:06d}" for i in range(1, 201)]
+# ── HeadersProvider (uses Databricks SDK token — works in App + local) ─────────
 
+# Tokens without an expires_in (env / SDK-managed) are re-read this often
+_DEFAULT_TOKEN_TTL = 300.0
 
-# ── HeadersProvider (uses Databricks SDK token — works in App + local) ─────────
 
-def _fetch_zerobus_token(client_id: str, client_secret: str, workspace_host: str, table_name: str) -> str:
+def _fetch_zerobus_token(
+    client_id: str, client_secret: str, workspace_host: str, table_name: str
+) -> tuple[str, float]:
     """
     Get an OAuth token scoped to the Zerobus DirectWrite API.
     Uses resource=api://databricks/workspaces/{id}/zerobusDirectWriteApi and
     authorization_details with UC catalog/schema/table privileges.
+    Returns (access_token, expires_in_seconds).
     """
     host = workspace_host.rstrip("/")
     if not host.startswith("http"):
@@ -184,39 +138,51 @@ def _fetch_zerobus_token(client_id: str, client_secret: str, workspace_host: str
     }).encode()
     req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/x-www-form-urlencoded"})
     with urllib.request.urlopen(req, timeout=10) as resp:
-        return json.loads(resp.read())["access_token"]
+        body = json.loads(resp.read())
+        return body["access_token"], float(body.get("expires_in", 3600))
+
+
+def _fetch_headers_token() -> tuple[str, float]:
+    """
+    Resolve the bearer token for the HeadersProvider.
+
+    Priority:
+    1. ZEROBUS_CLIENT_ID/SECRET env vars — fetch M2M token for Zerobus SP
+    2. DATABRICKS_TOKEN env var — injected by Databricks Apps runtime
+    3. Workspace client token — local dev fallback
+    """
+    zb_client_id = os.environ.get("ZEROBUS_CLIENT_ID", "")
+    zb_client_secret = os.environ.get("ZEROBUS_CLIENT_SECRET", "")
+    db_host = os.environ.get("DATABRICKS_HOST", "")
+    table_name = os.environ.get("ZEROBUS_TABLE_NAME", "")
+    if zb_client_id and zb_client_secret and db_host and table_name:
+        try:
+            return _fetch_zerobus_token(zb_client_id, zb_client_secret, db_host, table_name)
+        except Exception as e:
+            print(f"HeadersProvider Zerobus token error: {e}")
+
+    token = os.environ.get("DATABRICKS_TOKEN", "")
+    if not token:
+        client = get_workspace_client()
+        token = client.config.authenticate().get("Authorization", "").replace("Bearer ", "")
+    return token, _DEFAULT_TOKEN_TTL
+
+
+# Process-wide: every stream's HeadersProvider shares one cached token
+zerobus_token_cache = TokenCache("zerobus", _fetch_headers_token)
 
 
 if ZEROBUS_SDK_AVAILABLE:
     class _DatabricksHeadersProvider(HeadersProvider):  # type: ignore
         """
-        Provides fresh Bearer token for each gRPC request.
+        Provides the cached Bearer token for each gRPC request.
 
-        Priority:
-        1. ZEROBUS_CLIENT_ID/SECRET env vars — fetch M2M token for Zerobus SP
-        2. DATABRICKS_TOKEN env var — injected by Databricks Apps runtime
-        3. Workspace client token — local dev fallback
+        Runs on the Rust SDK thread, so it only reads zerobus_token_cache;
+        refreshes happen ahead of expiry on the cache's background thread.
         """
 
         def get_headers(self):
-            zb_client_id = os.environ.get("ZEROBUS_CLIENT_ID", "")
-            zb_client_secret = os.environ.get("ZEROBUS_CLIENT_SECRET", "")
-            db_host = os.environ.get("DATABRICKS_HOST", "")
-            table_name = os.environ.get("ZEROBUS_TABLE_NAME", "")
-            if zb_client_id and zb_client_secret and db_host and table_name:
-                try:
-                    token = _fetch_zerobus_token(zb_client_id, zb_client_secret, db_host, table_name)
-                    return [("authorization", f"Bearer {token}")]
-                except Exception as e:
-                    print(f"HeadersProvider Zerobus token error: {e}")
-
-            token = os.environ.get("DATABRICKS_TOKEN", "")
-            if not token:
-                try:
-                    client = get_workspace_client()
-                    token = client.config.authenticate().get("Authorization", "").replace("Bearer ", "")
-                except Exception as e:
-                    print(f"HeadersProvider error: {e}")
+            token = zerobus_token_cache.get()
             return [("authorization", f"Bearer {token}")] if token else []
 
 
@@ -230,175 +196,525 @@ class ProducerStats:
     events_in_flight: int = 0
     events_failed: int = 0
     events_per_sec: float = 0.0
+    rate_error_pct: float = 0.0  # achieved events_per_sec vs target rate
     acked_at_kill: int = 0
     unacked_at_kill: int = 0
     events_resent: int = 0
     rejection_count: int = 0
     demo_mode: bool = True
-    event_log: List[Dict[str, Any]] = field(default_factory=list)
+    event_log: List[Tuple[EventRecord, str]] = field(default_factory=list)  # (event, status)
+    log_total: int = 0  # entries ever logged; lets WS clients receive only new ones
     sequence_num: int = 0
     rate: int = 5
     delta_count: int = 0
     delta_by_type: Dict[str, int] = field(default_factory=dict)
     last_error: str = ""
-
-    def add_event_log(self, event: dict, status: str = "sent") -> None:
-        entry = {
-            "event_id": event["event_id"][:8],
-            "event_type": event["event_type"],
-            "player_id": event["player_id"],
-            "card_name": event["card_name"],
-            "sequence_num": event["sequence_num"],
-            "status": status,
-            "timestamp": event.get("produced_at", ""),
-            "color": EVENT_COLORS.get(event["event_type"], "white"),
-        }
-        self.event_log.append(entry)
-        if len(self.event_log) > 50:
-            self.event_log = self.event_log[-50:]
-
-    def to_dict(self) -> dict:
-        return {
+    replay_count: int = 0   # events re-sent by the most recent replay
+    replay_ms: float = 0.0  # how long that replay took
+    replaying: bool = False
+    replay_remaining: int = 0
+    replay_rate: float = 0.0  # events/sec over the current (or last) replay
+    wire_bytes: int = 0        # payload bytes handed to ingest, in the table's schema
+    game_event_bytes: int = 0  # the same events' GameEvent payload bytes
+
+    def add_event_log(self, event: EventRecord, status: str = "sent") -> None:
+        # Keep a reference to the record; entries are only rendered when read.
+        # Trimmed in chunks so appends stay O(1) amortized.
+        self.event_log.append((event, status))
+        self.log_total += 1
+        if len(self.event_log) > 100:
+            del self.event_log[:-50]
+
+    def recent_log(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Newest-first log entries with timestamps rendered as ISO-8601."""
+        out = []
+        for event, status in reversed(self.event_log[-limit:]):
+            out.append({
+                "event_id": event.event_id[:8],
+                "event_type": event.event_type,
+                "player_id": event.player_id,
+                "card_name": event.card_name,
+                "sequence_num": event.sequence_num,
+                "status": status,
+                "timestamp": us_to_iso(event.produced_at),
+                "color": EVENT_COLORS.get(event.event_type, "white"),
+            })
+        return out
+
+    def to_dict(self, include_log: bool = True) -> dict:
+        d = {
             "state": self.state.value,
             "events_sent": self.events_sent,
             "events_acked": self.events_acked,
             "events_in_flight": self.events_in_flight,
             "events_failed": self.events_failed,
             "events_per_sec": round(self.events_per_sec, 1),
+            "rate_error_pct": round(self.rate_error_pct, 2),
             "acked_at_kill": self.acked_at_kill,
             "unacked_at_kill": self.unacked_at_kill,
             "events_resent": self.events_resent,
             "rejection_count": self.rejection_count,
             "demo_mode": self.demo_mode,
-            "event_log": list(reversed(self.event_log[-50:])),
+            "log_total": self.log_total,
             "sequence_num": self.sequence_num,
             "rate": self.rate,
             "delta_count": self.delta_count,
             "delta_by_type": dict(self.delta_by_type),
             "last_error": self.last_error,
+            "replay_count": self.replay_count,
+            "replay_ms": round(self.replay_ms, 1),
+            "replaying": self.replaying,
+            "replay_remaining": self.replay_remaining,
+            "replay_rate": round(self.replay_rate, 1),
+            "wire": {
+                "bytes_sent": self.wire_bytes,
+                "game_event_bytes": self.game_event_bytes,
+                "bytes_per_event": round(self.wire_bytes / self.events_sent, 1) if self.events_sent else 0,
+                "saved_pct": round((1 - self.wire_bytes / self.game_event_bytes) * 100, 1)
+                if self.game_event_bytes else 0.0,
+            },
         }
+        if include_log:
+            d["event_log"] = self.recent_log(50)
+        return d
 
 
-# ── Event factory ──────────────────────────────────────────────────────────────
-
-def _make_event(seq: int, event_type: str | None = None, extra_fields: dict | None = None) -> dict:
-    now = datetime.now(timezone.utc).isoformat()
-    ev = {
-        "event_id": str(uuid.uuid4()),
-        "event_type": event_type or random.choice(EVENT_TYPES),
-        "player_id": random.choice(PLAYERS),
-        "match_id": random.choice(MATCHES),
-        "card_name": random.choice(CARD_NAMES),
-        "location": random.randint(1, 3),
-        "snap_cubes": random.choice([1, 2, 4, 8]),
-        "result": random.choice(["win", "loss", "retreat", "pending"]),
-        "produced_at": now,
-        "ingested_at": now,
-        "host": _HOSTNAME,
-        "sequence_num": seq,
-    }
-    if extra_fields:
-        ev.update(extra_fields)
-    return ev
+@dataclass
+class ShardStats:
+    """Per-stream counters; ProducerStats holds the rolled-up totals."""
+    shard: int
+    events_sent: int = 0
+    events_acked: int = 0
+    events_in_flight: int = 0
+    events_failed: int = 0
+    events_resent: int = 0
+    unacked_at_kill: int = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "shard": self.shard,
+            "events_sent": self.events_sent,
+            "events_acked": self.events_acked,
+            "events_in_flight": self.events_in_flight,
+            "events_failed": self.events_failed,
+            "events_resent": self.events_resent,
+            "unacked_at_kill": self.unacked_at_kill,
+        }
 
 
 # ── Producer Manager ───────────────────────────────────────────────────────────
 
+MAX_SHARDS = 16
+MAX_INFLIGHT_RECORDS = 10000  # SDK in-flight window per stream
+REPLAY_BATCH = 1000
+RECONNECT_DELAY = 1.2  # simulated TCP reconnect before a resume replays
+MAX_WORKERS = 8
+
+
+@dataclass
+class _Shard:
+    """One Zerobus stream with its own ack callback, in-flight buffer and stats."""
+    index: int
+    stats: ShardStats
+    unacked: InFlightBuffer = field(default_factory=InFlightBuffer)
+    stream: Optional[Any] = None  # ZerobusStream when live
+    ack_cb: Optional["_ZerobusAckCallback"] = None
+
+
 class ProducerManager:
     def __init__(self) -> None:
         self.stats = ProducerStats()
         self._task: Optional[asyncio.Task] = None
-        self._spike_task: Optional[asyncio.Task] = None
-        self._unacked_events: List[dict] = []
+        self._profile_task: Optional[asyncio.Task] = None
+        self._profile: Optional[LoadProfile] = None
+        self._shards: List[_Shard] = [_Shard(0, ShardStats(0))]
         self._last_window_start: float = time.time()
         self._window_count: int = 0
-        self._stream: Optional[Any] = None  # ZerobusStream when live
+        self._pacer = TokenBucketPacer()
+        self._throttle = AimdThrottle()  # real mode: back off before the SDK window fills
+        self._acks = AckScheduler()  # demo-mode acks/rejections, one timer wheel
+        self._workers = 0
+        self._pool: Optional[EventWorkerPool] = None
+        self._source: Optional[RecordedEventSource] = None  # replaying a recording instead
+        self._sim: Optional[MatchSimulator] = None  # coherent matches instead of random events
+        # Target table schema; events carry GameEvent payloads, others are re-encoded at send
+        self._schema: TableSchema = GAME_EVENT_SCHEMA
+        self._encode: Optional[Callable[[EventRecord], bytes]] = None
+        self._table = ""  # resolved UC table of the open streams
+        # Compact schema: dictionary entries go to game_event_dims on a stream of their own
+        self._dims = DimensionWriter(compact_dictionary)
+        self._dims_cb: Optional["_DimsAckCallback"] = None
+        # Sent/acked sequence numbers, reconciled against the table for duplicates and gaps
+        self.audit = DeliveryAudit.from_env()
+        self._audit_task: Optional[asyncio.Task] = None
+        self._wal: Optional[WriteAheadLog] = None
+        self._seq_reserve: Optional[Callable[[int], int]] = None  # shared allocator (cluster.py)
+        self._seq_limit = 0  # highest sequence number reserved from it
+        # Latencies in ms: event produced_at → ack, and ingest call → ack
+        self.produce_to_ack = LogHistogram()
+        self.ingest_to_ack = LogHistogram()
+        self.sent_series = RollingSeries()
+        self.acked_series = RollingSeries()
 
         config = get_zerobus_config()
         # We'll probe Zerobus on first start(); default to demo for now
         self.stats.demo_mode = not ZEROBUS_SDK_AVAILABLE
+        # With several workers only the elected leader opens the WAL (cluster.py)
+        if not get_cluster_dir():
+            self.open_wal()
+
+    def open_wal(self) -> None:
+        """Open PRODUCER_WAL_DIR, if set, and reload what a previous process left unacked."""
+        self._wal = WriteAheadLog.from_env()
+        if self._wal:
+            self._recover_from_wal()
+            self._wal.set_tag(self._schema.key)
+
+    def use_sequence_allocator(self, reserve: Callable[[int], int]) -> None:
+        """
+        Draw sequence numbers from a shared allocator: reserve(upto) raises a
+        cross-process high-water mark to at least `upto` and returns it.
+        Numbering continues above anything a previous producer reserved.
+        """
+        self._seq_reserve = reserve
+        self._seq_limit = reserve(0)
+        self.stats.sequence_num = max(self.stats.sequence_num, self._seq_limit)
+
+    def stats_dict(self, include_log: bool = True) -> dict:
+        """Stats snapshot plus live gauges owned by the manager."""
+        d = self.stats.to_dict(include_log)
+        shards = []
+        total = {"count": 0, "bytes": 0}
+        for sh in self._shards:
+            fp = sh.unacked.footprint()
+            total["count"] += fp["count"]
+            total["bytes"] += fp["bytes"]
+            shards.append({**sh.stats.to_dict(), "inflight_buffer": fp})
+        total["bytes_per_event"] = round(total["bytes"] / total["count"]) if total["count"] else 0
+        d["inflight_buffer"] = total
+        d["shard_count"] = len(self._shards)
+        d["shards"] = shards
+        d["token_cache"] = zerobus_token_cache.metrics()
+        d["event_workers"] = self._pool.stats() if self._pool else {"workers": 0}
+        d["source"] = self._source.stats() if self._source else None
+        d["simulator"] = self._sim.stats() if self._sim else None
+        d["schema"] = {"name": self._schema.name, "version": self._schema.version, "table": self._table or None}
+        d["dictionary"] = self._dims.stats() if self._schema is COMPACT_SCHEMA else None
+        d["ack_scheduler"] = self._acks.stats()
+        d["throttle"] = self._throttle.stats()
+        d["throttle_factor"] = round(self._throttle.factor, 3)
+        d["profile"] = self.profile_dict()
+        d["wal"] = self._wal.stats() if self._wal else {"enabled": False}
+        d["audit"] = self.audit.stats()
+        d["latency_ms"] = {
+            "produce_to_ack": self.produce_to_ack.snapshot(),
+            "ingest_to_ack": self.ingest_to_ack.snapshot(),
+        }
+        d["throughput_series"] = {
+            "sent": self.sent_series.series(),
+            "acked": self.acked_series.series(),
+        }
+        return d
 
     # ── Lifecycle ──────────────────────────────────────────────────────────────
 
-    async def start(self, rate: int = 5) -> None:
-        if self.stats.state == ProducerState.RUNNING:
-            return
+    async def start(
+        self,
+        rate: int = 5,
+        shards: int = 1,
+        workers: int = 0,
+        source: Optional[RecordedEventSource] = None,
+        matches: int = 0,
+        schema: Optional[TableSchema] = None,
+    ) -> List[str]:
+        """
+        Start producing at `rate` ev/s — or, given a source, at the recording's
+        own pace.  matches > 0 simulates that many concurrent matches; schema
+        picks the registered table to write to (default: game_events).
+        Ignored while running or replaying a resume: new production waits
+        for the backlog, and the loop already running will produce it.
+        Returns a note for each requested setting that was not applied.
+        """
+        if self._busy():
+            if source:
+                source.close()
+            return [f"already {self.stats.state.value.lower()}: settings unchanged"]
+        notes = [self._configure_shards(shards), self._use_schema(schema or GAME_EVENT_SCHEMA)]
+        self._set_source(source)
+        if not matches:
+            self._sim = None
+        elif not self._sim or self._sim.matches != matches:
+            self._sim = MatchSimulator(matches)  # else carry on with the live matches
+        # Recorded and simulated events need no worker processes
+        generated = not (source or self._sim)
+        self._workers = max(0, min(MAX_WORKERS, int(workers or 0))) if generated else 0
+        self._ensure_pool()
+        self.produce_to_ack.reset()
+        self.ingest_to_ack.reset()
+        self._throttle.reset()
         self.stats.state = ProducerState.RUNNING
         self.stats.rate = rate
         self._reset_rate_window()
-        self._task = asyncio.create_task(self._produce_loop())
+        # Events left unacked by a kill (or recovered from the WAL) go out first
+        backlog = any(len(sh.unacked) for sh in self._shards)
+        self._task = asyncio.create_task(self._produce_loop(replay=backlog))
+        if not self._audit_task or self._audit_task.done():
+            self._audit_task = asyncio.create_task(self.audit.run(self._audit_target))
+        return [note for note in notes if note]
 
     async def stop(self) -> None:
         self.stats.state = ProducerState.STOPPED
+        await self.stop_profile()
         await self._cancel_task()
-        await self._close_stream_gracefully()
-        self._unacked_events.clear()
+        await asyncio.gather(*(self._close_stream_gracefully(sh) for sh in self._shards))
+        await self._close_dims_stream()
+        # Demo mode's flush: the simulated acks still pending arrive now, not after
+        # the events are written off below.  Closed streams' late acks are ignored.
+        self._acks.drain()
+        for sh in self._shards:
+            self._abandon_stream(sh)
+        for sh in self._shards:
+            for event in sh.unacked.snapshot():
+                self.audit.on_failed(event.sequence_num, dropped=True)
+            sh.unacked.clear()
+        # Nothing left refers to the current codes; the next run starts a new dictionary
+        self._dims.reset()
+        if self._wal:
+            self._wal.reset()
+        self._close_pool()
+        self._set_source(None)
+        self._sim = None
+        if self._audit_task:
+            self._audit_task.cancel()
+            self._audit_task = None
 
     async def kill(self) -> None:
         """Hard kill — no flush. Simulates process crash."""
-        self.stats.acked_at_kill = self.stats.events_acked
-        self.stats.unacked_at_kill = self.stats.events_in_flight
         self.stats.state = ProducerState.KILLED
-        await self._cancel_task()
         # Deliberately do NOT close stream or flush — crash semantics.
         # WAL-committed events are safe; in-flight will replay on reconnect.
+        # A crashed process hears no further acks, so stop listening to them
+        # before snapshotting (the produce loop is parked at an await here).
+        for sh in self._shards:
+            self._abandon_stream(sh)
+        self._abandon_dims_stream()
+        self._acks.clear()  # demo mode: pending simulated acks die with it too
+        if self._source:
+            self._source.pause()  # the recording resumes where it stopped
+        self.stats.acked_at_kill = self.stats.events_acked
+        self.stats.unacked_at_kill = self.stats.events_in_flight
+        for sh in self._shards:
+            sh.stats.unacked_at_kill = len(sh.unacked)
+        await self._cancel_task()
+        await self.stop_profile()
+        # The generator processes die with the producer
+        self._close_pool()
 
     async def resume(self) -> None:
         """Reconnect after crash, re-send unacked events (at-least-once)."""
-        if self.stats.state not in (ProducerState.KILLED, ProducerState.STOPPED):
+        if self._busy() or self.stats.state not in (ProducerState.KILLED, ProducerState.STOPPED):
             return
         self.stats.state = ProducerState.RECONNECTING
-        await asyncio.sleep(1.2)  # simulate TCP reconnect delay
-
-        # At-least-once: replay unacked events first
-        unacked_copy = list(self._unacked_events)
-        for event in unacked_copy:
-            self.stats.events_resent += 1
-            self.stats.events_sent += 1
-            self.stats.events_in_flight += 1
-            self.stats.add_event_log(event, "resent")
-            if self.stats.demo_mode:
-                asyncio.create_task(self._simulate_ack(event, resend=True))
-            elif self._stream:
-                try:
-                    self._stream.ingest_record_nowait(_make_proto_payload(event))
-                except Exception:
-                    pass
+        # The reconnect delay runs in the task too, so stop() and kill() cancel it
+        self._task = asyncio.create_task(self._reconnect())
 
-        self.stats.state = ProducerState.RUNNING
+    async def _reconnect(self) -> None:
+        await asyncio.sleep(RECONNECT_DELAY)  # simulate TCP reconnect delay
+        # Fresh streams are opened per shard; each replays its own backlog on them
+        self._ensure_pool()
         self._reset_rate_window()
-        self._task = asyncio.create_task(self._produce_loop())
+        self._throttle.reset()  # new streams: relearn the latency baseline
+        await self._produce_loop(replay=True)
 
     async def spike(self) -> None:
         """Crank to 500 events/sec for 5s then restore."""
-        if self._spike_task and not self._spike_task.done():
-            self._spike_task.cancel()
-        self._spike_task = asyncio.create_task(self._do_spike())
+        await self.start_profile(LoadProfile([Constant(500, 5.0)], name="spike"), restore_rate=True)
+
+    async def start_profile(self, profile: LoadProfile, restore_rate: bool = False) -> None:
+        """Drive the target rate from a load profile (replacing any running one)."""
+        await self.stop_profile()
+        self._profile = profile
+        profile.active = True
+        self._profile_task = asyncio.create_task(self._run_profile(profile, restore_rate))
+
+    def profile_dict(self) -> Optional[dict]:
+        """Current (or last) load profile with its per-segment report."""
+        return self._profile.to_dict() if self._profile else None
+
+    async def stop_profile(self) -> None:
+        if self._profile_task and not self._profile_task.done():
+            self._profile_task.cancel()
+            try:
+                await self._profile_task
+            except asyncio.CancelledError:
+                pass
+        self._profile_task = None
 
     async def send_schema_violation(self) -> None:
         """Send event with unknown_field → triggers schema rejection in Zerobus."""
-        self.stats.sequence_num += 1
-        event = _make_event(
-            self.stats.sequence_num,
-            extra_fields={"unknown_field": "INVALID_SCHEMA", "extra_junk": 99999},
-        )
+        self.stats.sequence_num = self._claim_seqs(1)
+        event = make_events(self.stats.sequence_num, 1)[0]
+        shard = self._shard_for(event)
         self.stats.events_sent += 1
         self.stats.events_in_flight += 1
+        shard.stats.events_sent += 1
+        shard.stats.events_in_flight += 1
         self.stats.add_event_log(event, "rejected")
 
-        if not self.stats.demo_mode and self._stream:
+        if not self.stats.demo_mode and shard.stream and shard.ack_cb:
+            shard.ack_cb.track(event.sequence_num)
             try:
-                self._stream.ingest_record_nowait(_make_proto_payload(event))
+                shard.stream.ingest_record_nowait(_make_proto_payload(
+                    {**event.to_dict(), "unknown_field": "INVALID_SCHEMA", "extra_junk": 99999}
+                ))
             except Exception:
-                pass
+                shard.ack_cb.untrack()
 
-        asyncio.create_task(self._register_rejection())
+        self._acks.schedule(0.15, self._register_rejection, shard)
 
     # ── Internals ──────────────────────────────────────────────────────────────
 
+    def _busy(self) -> bool:
+        """Running, or reconnecting to replay a backlog: a produce loop owns the streams."""
+        if self.stats.state in (ProducerState.RUNNING, ProducerState.RECONNECTING):
+            return True
+        return self._task is not None and not self._task.done()
+
+    def _configure_shards(self, count: int) -> str:
+        """Switch to `count` shards; returns why not, if the current ones stay."""
+        count = max(1, min(MAX_SHARDS, int(count or 1)))
+        if count == len(self._shards):
+            return ""
+        if any(len(sh.unacked) for sh in self._shards):
+            # Pending replay is partitioned by the current layout — keep it
+            note = f"kept {len(self._shards)} shards: unacked events pending replay"
+            print(note)
+            return note
+        self._shards = [_Shard(i, ShardStats(i)) for i in range(count)]
+        return ""
+
+    def _use_schema(self, schema: TableSchema) -> str:
+        """Write to `schema`'s table from now on; returns why not, if the current one stays."""
+        if schema is self._schema:
+            return ""
+        if any(len(sh.unacked) for sh in self._shards):
+            # The backlog belongs to the current table — replay it there first
+            note = f"kept schema {self._schema.key}: unacked events pending replay"
+            print(note)
+            return note
+        self._schema = schema
+        self._encode = None if schema is GAME_EVENT_SCHEMA else schema.record_encoder()
+        if self._wal:
+            self._wal.set_tag(schema.key)
+        return ""
+
+    def _wire(self, event: EventRecord) -> bytes:
+        """The event's payload in the table's schema, counted into the wire stats."""
+        payload = self._encode(event) if self._encode else event.payload
+        self.stats.wire_bytes += len(payload)
+        self.stats.game_event_bytes += len(event.payload)
+        return payload
+
+    def _shard_for(self, event: EventRecord) -> _Shard:
+        """Partition by match_id so every match's events stay on one ordered stream."""
+        if len(self._shards) == 1:
+            return self._shards[0]
+        key = zlib.crc32(event.match_id.encode())
+        return self._shards[key % len(self._shards)]
+
+    def _recover_from_wal(self) -> None:
+        """Load events a previous process left unacked, as if it had been killed."""
+        records = self._wal.recover()
+        if not records:
+            return
+        schema = self._schema_for_tags(self._wal.recovered_tags)
+        if schema is None:
+            # Replaying into a guessed table would land the events in the wrong one
+            tags = ", ".join(sorted(tag or "untagged" for tag in self._wal.recovered_tags))
+            aside = self._wal.set_aside()
+            self.stats.last_error = (
+                f"WAL: not recovering {len(records)} unacked events of unknown schema ({tags}); "
+                f"set aside as {', '.join(aside)}"
+            )[:500]
+            print(f"Warning: {self.stats.last_error}")
+            return
+        self._use_schema(schema)
+        for seq, payload in records:
+            event = event_from_payload(payload)
+            shard = self._shard_for(event)
+            shard.unacked.add(event)
+            shard.stats.events_in_flight += 1
+            self.stats.events_in_flight += 1
+            self.stats.sequence_num = max(self.stats.sequence_num, seq)
+            self.audit.on_sent(seq, event.event_id, event.produced_at)
+        self.stats.unacked_at_kill = len(records)
+        self.stats.state = ProducerState.KILLED
+        print(f"WAL: recovered {len(records)} unacked events in {self._wal.recover_ms:.1f} ms")
+
+    @staticmethod
+    def _schema_for_tags(tags) -> Optional[TableSchema]:
+        """The schema every recovered record was written for, if there is one and it is registered."""
+        if len(tags) != 1:
+            return None
+        name, _, version = next(iter(tags)).rpartition("@v")
+        try:
+            schema = schema_registry.get(name, int(version)) if name else None
+        except ValueError:
+            return None
+        return schema if schema is not DIMS_SCHEMA else None
+
+    def _ensure_pool(self) -> None:
+        # Spawn early so worker start-up overlaps the stream connect
+        if self._workers and self._pool is None:
+            self._pool = EventWorkerPool(self._workers)
+            self._pool.warm()
+
+    def _close_pool(self) -> None:
+        if self._pool:
+            self._pool.close()
+            self._pool = None
+
+    def _set_source(self, source: Optional[RecordedEventSource]) -> None:
+        if self._source and self._source is not source:
+            self._source.close()
+        self._source = source
+
+    async def _next_batch(self, factor: float = 1.0) -> int:
+        """How many events to send now: paced at the target rate, or as recorded."""
+        if self._source:
+            return await self._source.next_batch(factor)
+        rate = self.stats.rate * factor
+        # A profile may plan an idle segment; otherwise keep a trickle going
+        return await self._pacer.next_batch(rate if self._profiling() else max(1, rate))
+
+    def _profiling(self) -> bool:
+        return self._profile_task is not None and not self._profile_task.done()
+
+    async def _next_events(self, n: int) -> List[EventRecord]:
+        """Next n events in sequence — recorded, simulated, from the worker pool, or made here."""
+        start = self._claim_seqs(n)
+        if self._source:
+            events = self._source.take(start, n)
+        elif self._sim:
+            events = self._sim.take(start, n)
+        elif self._pool:
+            events = await self._pool.take(start, n)
+        else:
+            events = make_events(start, n)
+        self.stats.sequence_num += len(events)
+        return events
+
+    def _claim_seqs(self, n: int) -> int:
+        """First of the next n sequence numbers, reserved from the shared allocator if any."""
+        start = self.stats.sequence_num + 1
+        if self._seq_reserve and start + n - 1 > self._seq_limit:
+            self._seq_limit = self._seq_reserve(start + n - 1)
+        return start
+
     def _reset_rate_window(self) -> None:
         self._last_window_start = time.time()
         self._window_count = 0
+        self._pacer.reset()
 
     async def _cancel_task(self) -> None:
         if self._task and not self._task.done():
@@ -409,42 +725,154 @@ class ProducerManager:
                 pass
         self._task = None
 
-    async def _close_stream_gracefully(self) -> None:
-        if self._stream:
+    async def _close_stream_gracefully(self, shard: _Shard) -> None:
+        if shard.stream:
             try:
-                await asyncio.wait_for(self._stream.flush(), timeout=3.0)
-                await asyncio.wait_for(self._stream.close(), timeout=3.0)
+                await asyncio.wait_for(shard.stream.flush(), timeout=3.0)
+                await asyncio.wait_for(shard.stream.close(), timeout=3.0)
             except Exception:
                 pass
-            self._stream = None
+            shard.stream = None
+
+    def _abandon_stream(self, shard: _Shard) -> None:
+        if shard.ack_cb:
+            shard.ack_cb.detach()
+        shard.ack_cb = None
+        shard.stream = None
 
-    async def _do_spike(self) -> None:
-        original = self.stats.rate
-        self.stats.rate = 500
+    async def _close_dims_stream(self) -> None:
+        stream = self._dims.stream
+        if stream:
+            try:
+                await asyncio.wait_for(stream.flush(), timeout=3.0)
+                await asyncio.wait_for(stream.close(), timeout=3.0)
+            except Exception:
+                pass
+        self._abandon_dims_stream()
+
+    def _abandon_dims_stream(self) -> None:
+        """Stop listening to the dims stream; unacked entries are re-sent on the next one."""
+        if self._dims_cb:
+            self._dims_cb.detach()
+        self._dims_cb = None
+        self._dims.detach()
+
+    async def _run_profile(self, profile: LoadProfile, restore_rate: bool) -> None:
+        """
+        Re-evaluate the profile every PROFILE_TICK seconds and feed the pacer's
+        target rate, tracking planned vs achieved (first sends only) per segment.
+        """
+        s = self.stats
+        original = s.rate
         try:
-            await asyncio.sleep(5.0)
+            while profile.segments:
+                for index, seg in enumerate(profile.segments):
+                    seg.reset()
+                    entry = profile.begin_segment(index)
+                    sent0 = s.events_sent - s.events_resent
+                    planned = 0.0
+                    t0 = last = time.monotonic()
+                    while last - t0 < seg.duration:
+                        rate = seg.rate_at(last - t0, PROFILE_TICK)
+                        s.rate = max(0, round(rate))
+                        await asyncio.sleep(min(PROFILE_TICK, seg.duration - (last - t0)))
+                        now = time.monotonic()
+                        planned += rate * (now - last)
+                        last = now
+                        profile.update_entry(entry, now - t0, planned, s.events_sent - s.events_resent - sent0)
+                    entry["status"] = "done"
+                profile.iteration += 1
+                if not profile.loop:
+                    break
         finally:
-            self.stats.rate = original
+            profile.active = False
+            profile.current = None
+            if restore_rate:
+                s.rate = original
 
-    async def _register_rejection(self) -> None:
-        await asyncio.sleep(0.15)
+    def _register_rejection(self, shard: _Shard) -> None:
         self.stats.events_in_flight = max(0, self.stats.events_in_flight - 1)
         self.stats.events_failed += 1
         self.stats.rejection_count += 1
+        shard.stats.events_in_flight = max(0, shard.stats.events_in_flight - 1)
+        shard.stats.events_failed += 1
+
+    def _audit_target(self) -> Tuple[Optional[Callable], str, str]:
+        """What the audit reconciles against: (query, table, host filter), or no query."""
+        fields = self._schema.field_names
+        if self.stats.demo_mode or ZEROBUS_FAKE or not self._table or "sequence_num" not in fields:
+            return None, "", ""
+        from .delta_reader import delta_reader
+        return partial(delta_reader._execute_sql, strict=True), self._table, _HOSTNAME if "host" in fields else ""
+
+    # ── Bookkeeping (global counters roll up the per-shard ones) ──────────────
+
+    def _record_sent(self, shard: _Shard, event: EventRecord, resend: bool = False, log: bool = True) -> None:
+        s, ss = self.stats, shard.stats
+        event.sent_ns = time.perf_counter_ns()  # ingest → ack starts here
+        s.events_sent += 1
+        ss.events_sent += 1
+        if resend:
+            # Still counted in-flight from its first send; it never got its ack
+            s.events_resent += 1
+            ss.events_resent += 1
+            if log:
+                s.add_event_log(event, "resent")
+        else:
+            s.events_in_flight += 1
+            ss.events_in_flight += 1
+            shard.unacked.add(event)
+            if self._wal:
+                self._wal.append(event.sequence_num, event.payload)
+            self.audit.on_sent(event.sequence_num, event.event_id, event.produced_at)
+            s.add_event_log(event, "sent")
+
+    def _record_ack(self, shard: _Shard, event: Optional[EventRecord]) -> None:
+        s, ss = self.stats, shard.stats
+        s.events_acked += 1
+        s.events_in_flight = max(0, s.events_in_flight - 1)
+        s.delta_count += 1
+        ss.events_acked += 1
+        ss.events_in_flight = max(0, ss.events_in_flight - 1)
+        self.acked_series.add()
+        if event:
+            self.produce_to_ack.record((now_us() - event.produced_at) / 1000)
+            sent_ns = event.sent_ns
+            if sent_ns:
+                ms = (time.perf_counter_ns() - sent_ns) / 1e6
+                self.ingest_to_ack.record(ms)
+                self._throttle.observe_latency(ms)
+            et = event.event_type
+            s.delta_by_type[et] = s.delta_by_type.get(et, 0) + 1
+            if self._wal:
+                self._wal.ack(event.sequence_num)
+            self.audit.on_ack(event.sequence_num)
+
+    def _record_error(self, shard: _Shard, event: Optional[EventRecord] = None) -> None:
+        s, ss = self.stats, shard.stats
+        if event:
+            if self._wal:
+                # Terminal failure — it will never be replayed, so drop it from the log
+                self._wal.ack(event.sequence_num)
+            self.audit.on_failed(event.sequence_num)
+        s.events_failed += 1
+        s.events_in_flight = max(0, s.events_in_flight - 1)
+        ss.events_failed += 1
+        ss.events_in_flight = max(0, ss.events_in_flight - 1)
 
     # ── Main produce loop ──────────────────────────────────────────────────────
 
-    async def _produce_loop(self) -> None:
+    async def _produce_loop(self, replay: bool = False) -> None:
         try:
             if ZEROBUS_SDK_AVAILABLE:
-                success = await self._produce_real()
+                success = await self._produce_real(replay)
                 if not success:
                     # Zerobus unavailable / auth failed — fall back to in-memory demo
                     self.stats.demo_mode = True
-                    await self._produce_demo()
+                    await self._produce_demo(replay)
             else:
                 self.stats.demo_mode = True
-                await self._produce_demo()
+                await self._produce_demo(replay)
         except asyncio.CancelledError:
             pass
         except Exception as e:
@@ -452,126 +880,241 @@ class ProducerManager:
             self.stats.last_error = str(e)
             self.stats.state = ProducerState.STOPPED
 
+    async def _replay_all(self) -> None:
+        """
+        At-least-once: re-send every shard's unacked events before producing
+        anything new.  Shards replay concurrently, each on its own stream.
+        """
+        s = self.stats
+        backlog = [(sh, sh.unacked.snapshot()) for sh in self._shards]
+        total = sum(len(events) for _, events in backlog)
+        s.replaying, s.replay_remaining, s.replay_count, s.replay_rate = True, total, 0, 0.0
+        t0 = time.perf_counter()
+        try:
+            await asyncio.gather(*(self._replay_shard(sh, events, t0) for sh, events in backlog))
+        finally:
+            s.replaying = False
+            s.replay_ms = (time.perf_counter() - t0) * 1000
+        if total:
+            print(f"Replayed {s.replay_count} events in {s.replay_ms:.0f} ms")
+
+    async def _replay_shard(self, shard: _Shard, events: List[EventRecord], t0: float) -> None:
+        """
+        Push one shard's backlog in REPLAY_BATCH chunks, staying inside the
+        stream's in-flight window and flushing at each batch boundary.
+        """
+        s = self.stats
+        for start in range(0, len(events), REPLAY_BATCH):
+            batch = events[start:start + REPLAY_BATCH]
+            # One log line per batch rather than one per re-sent event
+            s.add_event_log(batch[0], "resent")
+            if self.stats.demo_mode:
+                for event in batch:
+                    self._record_sent(shard, event, resend=True, log=False)
+                    self._wire(event)
+                    self._acks.schedule(random.uniform(0.05, 0.15), self._simulate_ack, shard, event)
+                self._dims.flush_pending()
+                await asyncio.sleep(0)
+            else:
+                await self._wait_for_window(shard, len(batch))
+                for event in batch:
+                    self._record_sent(shard, event, resend=True, log=False)
+                    shard.ack_cb.track(event.sequence_num)
+                    try:
+                        shard.stream.ingest_record_nowait(self._wire(event))
+                    except Exception as e:
+                        shard.ack_cb.untrack()
+                        # Leave it (and the rest) buffered for the next resume
+                        s.last_error = f"replay ingest error: {e}"[:500]
+                        raise
+                self._dims.flush_pending()
+                await shard.stream.flush()
+            s.replay_count += len(batch)
+            s.replay_remaining -= len(batch)
+            s.replay_rate = s.replay_count / max(1e-6, time.perf_counter() - t0)
+            self.sent_series.add(len(batch))
+
+    def _update_throttle(self) -> None:
+        """Feed the fullest stream's window use and oldest unacked age to the throttle."""
+        fullest, oldest_ns = 0, 0
+        for sh in self._shards:
+            fullest = max(fullest, sh.ack_cb.outstanding())
+            sent_ns = sh.unacked.oldest_sent_ns()
+            if sent_ns and (not oldest_ns or sent_ns < oldest_ns):
+                oldest_ns = sent_ns
+        oldest_ms = (time.perf_counter_ns() - oldest_ns) / 1e6 if oldest_ns else 0.0
+        self._throttle.update(fullest / MAX_INFLIGHT_RECORDS, oldest_ms)
+
+    async def _wait_for_window(self, shard: _Shard, need: int) -> None:
+        """Wait until `need` more records fit in the stream's in-flight window."""
+        while shard.ack_cb.outstanding() + need > MAX_INFLIGHT_RECORDS:
+            await asyncio.sleep(0.005)
+
     # ── Demo mode ──────────────────────────────────────────────────────────────
 
-    async def _produce_demo(self) -> None:
+    async def _produce_demo(self, replay: bool = False) -> None:
+        if replay:
+            await self._replay_all()
+        self.stats.state = ProducerState.RUNNING
         while True:
-            rate = max(1, self.stats.rate)
-            self.stats.sequence_num += 1
-            event = _make_event(self.stats.sequence_num)
-            self.stats.events_sent += 1
-            self.stats.events_in_flight += 1
-            self._unacked_events.append(event)
-            self.stats.add_event_log(event, "sent")
-            asyncio.create_task(self._simulate_ack(event))
-            self._tick_rate()
-            await asyncio.sleep(1.0 / rate)
-
-    async def _simulate_ack(self, event: dict, resend: bool = False) -> None:
-        """Simulate WAL ack with 50–150 ms latency."""
-        await asyncio.sleep(random.uniform(0.05, 0.15))
+            n = await self._next_batch()
+            events = await self._next_events(n)
+            for event in events:
+                shard = self._shard_for(event)
+                self._record_sent(shard, event)
+                self._wire(event)  # nothing is sent, but bytes/event still show
+                self._acks.schedule(random.uniform(0.05, 0.15), self._simulate_ack, shard, event)
+            self._dims.flush_pending()
+            self._tick_rate(len(events))
+
+    def _simulate_ack(self, shard: _Shard, event: EventRecord) -> None:
+        """Simulated WAL ack, scheduled 50–150 ms after the send."""
         if self.stats.state in (
             ProducerState.RUNNING,
             ProducerState.RECONNECTING,
             ProducerState.STOPPED,
         ):
-            self.stats.events_acked += 1
-            self.stats.events_in_flight = max(0, self.stats.events_in_flight - 1)
-            self.stats.delta_count += 1
-            et = event.get("event_type", "unknown")
-            self.stats.delta_by_type[et] = self.stats.delta_by_type.get(et, 0) + 1
-            self._unacked_events = [
-                e for e in self._unacked_events if e["event_id"] != event["event_id"]
-            ]
+            shard.unacked.ack(event.sequence_num)
+            self._record_ack(shard, event)
 
     # ── Real Zerobus mode ──────────────────────────────────────────────────────
 
-    async def _produce_real(self) -> bool:
+    async def _open_stream(self, sdk: Any, props: Any, shard: _Shard) -> None:
+        """Open one shard's stream.  Raises on connect failure."""
+        ack_cb = _ZerobusAckCallback(self, shard)
+        shard.stream = await self._create_stream(sdk, props, ack_cb)
+        shard.ack_cb = ack_cb
+
+    async def _open_dims_stream(self, sdk: Any, config: Dict[str, str]) -> None:
+        """Open the game_event_dims stream and hand it to the dimension writer."""
+        table = schema_registry.table_for(DIMS_SCHEMA, config["table_name"])
+        props = TableProperties(table, descriptor_proto=DIMS_SCHEMA.descriptor_bytes)  # type: ignore[name-defined]
+        ack_cb = _DimsAckCallback(self._dims)
+        stream = await self._create_stream(sdk, props, ack_cb)
+        self._dims_cb = ack_cb
+        self._dims.attach(stream)
+
+    async def _create_stream(self, sdk: Any, props: Any, ack_cb: Any) -> Any:
         """
-        Open a Zerobus stream and produce events into otto_demo.sd.zerobus_ingest.
-        Returns False if connection fails (triggers demo mode fallback).
+        Create a stream acking into ack_cb.  Raises on connect failure.
 
         Auth priority:
-        1. DATABRICKS_CLIENT_ID + DATABRICKS_CLIENT_SECRET (injected by Databricks Apps)
-           → proper OAuth2 M2M, gets correctly-scoped Zerobus token
+        1. ZEROBUS_CLIENT_ID + ZEROBUS_CLIENT_SECRET → SDK-managed OAuth2 M2M,
+           gets correctly-scoped Zerobus token
         2. HeadersProvider with DATABRICKS_TOKEN (app SP runtime token, fallback)
         3. HeadersProvider with workspace client token (local dev, likely fails Zerobus auth)
         """
-        config = get_zerobus_config()
-        sdk = ZerobusSdk(  # type: ignore[name-defined]
-            host=config["host"],
-            unity_catalog_url=config["unity_catalog_url"],
-        )
-        props = TableProperties(config["table_name"], descriptor_proto=GAME_EVENT_DESCRIPTOR_BYTES)  # type: ignore[name-defined]
-        ack_cb = _ZerobusAckCallback(self)
         opts = StreamConfigurationOptions(  # type: ignore[name-defined]
             record_type=RecordType.PROTO,  # type: ignore[name-defined]
             ack_callback=ack_cb,
             recovery=True,
             recovery_retries=5,
-            max_inflight_records=10000,
+            max_inflight_records=MAX_INFLIGHT_RECORDS,
         )
 
         zb_client_id = os.environ.get("ZEROBUS_CLIENT_ID", "")
         zb_client_secret = os.environ.get("ZEROBUS_CLIENT_SECRET", "")
-
         if zb_client_id and zb_client_secret:
             # Let the SDK handle Zerobus-specific OAuth internally
-            print(f"Connecting to Zerobus at {config['host']} (SDK M2M: {zb_client_id[:8]}...)...")
-            try:
-                self._stream = await asyncio.wait_for(
-                    sdk.create_stream(zb_client_id, zb_client_secret, props, opts),
-                    timeout=15.0,
-                )
-            except Exception as e:
-                err = str(e)
-                print(f"Zerobus connect error (SDK M2M): {err}")
-                self.stats.last_error = err[:500]
-                return False
+            coro = sdk.create_stream(zb_client_id, zb_client_secret, props, opts)
         else:
             # Fallback: HeadersProvider with DATABRICKS_TOKEN or workspace client token
-            print(f"Connecting to Zerobus at {config['host']} (HeadersProvider fallback)...")
-            try:
-                hp = _DatabricksHeadersProvider()  # type: ignore[name-defined]
-                self._stream = await asyncio.wait_for(
-                    sdk.create_stream("", "", props, opts, headers_provider=hp),
-                    timeout=15.0,
-                )
-            except Exception as e:
-                err = str(e)
-                print(f"Zerobus connect error (HeadersProvider): {err}")
-                self.stats.last_error = err[:500]
-                return False
+            hp = _DatabricksHeadersProvider()  # type: ignore[name-defined]
+            coro = sdk.create_stream("", "", props, opts, headers_provider=hp)
+        return await asyncio.wait_for(coro, timeout=15.0)
+
+    async def _produce_real(self, replay: bool = False) -> bool:
+        """
+        Open one Zerobus stream per shard and produce events into the ingest table.
+        Returns False if connection fails (triggers demo mode fallback).
+        """
+        config = get_zerobus_config()
+        sdk = ZerobusSdk(  # type: ignore[name-defined]
+            host=config["host"],
+            unity_catalog_url=config["unity_catalog_url"],
+        )
+        schema = self._schema
+        self._table = schema_registry.table_for(schema, config["table_name"])
+        props = TableProperties(self._table, descriptor_proto=schema.descriptor_bytes)  # type: ignore[name-defined]
+
+        zb_client_id = os.environ.get("ZEROBUS_CLIENT_ID", "")
+        if ZEROBUS_FAKE:
+            mode = "local fake SDK"
+        else:
+            mode = f"SDK M2M: {zb_client_id[:8]}..." if zb_client_id else "HeadersProvider fallback"
+        print(f"Connecting to Zerobus at {config['host']} ({mode}, {len(self._shards)} streams, "
+              f"{self._table} as {schema.key})...")
+        try:
+            if not zb_client_id and not ZEROBUS_FAKE:
+                # Warm off the event loop so get_headers never fetches inline
+                await asyncio.to_thread(zerobus_token_cache.warm)
+            opening = [self._open_stream(sdk, props, sh) for sh in self._shards]
+            if schema is COMPACT_SCHEMA:
+                opening.append(self._open_dims_stream(sdk, config))
+            await asyncio.gather(*opening)
+        except Exception as e:
+            err = str(e)
+            print(f"Zerobus connect error ({mode}): {err}")
+            self.stats.last_error = err[:500]
+            for sh in self._shards:
+                self._abandon_stream(sh)
+            self._abandon_dims_stream()
+            return False
 
         self.stats.demo_mode = False
         self.stats.last_error = ""
-        print("Zerobus stream opened — producing live events")
+        print("Zerobus streams opened — producing live events")
 
-        while True:
-            rate = max(1, self.stats.rate)
-            self.stats.sequence_num += 1
-            event = _make_event(self.stats.sequence_num)
-            payload = json.dumps(event).encode()
+        if replay:
+            await self._replay_all()
+        self.stats.state = ProducerState.RUNNING
 
-            try:
-                self._stream.ingest_record_nowait(_make_proto_payload(event))
-                self.stats.events_sent += 1
-                self.stats.events_in_flight += 1
-                self._unacked_events.append(event)
-                self.stats.add_event_log(event, "sent")
-            except Exception as e:
-                print(f"ingest error: {e}")
-                self.stats.events_failed += 1
-
-            self._tick_rate()
-            await asyncio.sleep(1.0 / rate)
-
-    def _tick_rate(self) -> None:
-        self._window_count += 1
+        while True:
+            # AIMD: scale the target rate (or replay speed) by the throttle factor so
+            # production eases off while the fullest stream's window fills or acks slow down
+            if self._throttle.due():
+                self._update_throttle()
+            n = await self._next_batch(self._throttle.factor)
+            events = await self._next_events(n)
+            for event in events:
+                shard = self._shard_for(event)
+                if shard.ack_cb.outstanding() >= MAX_INFLIGHT_RECORDS:
+                    # Throttling lags a sudden stall; never block inside the SDK
+                    await self._wait_for_window(shard, 1)
+                # Book-keep before ingesting: the ack can race back on the SDK thread
+                self._record_sent(shard, event)
+                shard.ack_cb.track(event.sequence_num)
+                try:
+                    shard.stream.ingest_record_nowait(self._wire(event))
+                except Exception as e:
+                    print(f"ingest error: {e}")
+                    shard.ack_cb.untrack()
+                    shard.unacked.ack(event.sequence_num)
+                    self._record_error(shard, event)
+            # New dictionary entries the batch's events refer to
+            self._dims.flush_pending()
+
+            self._tick_rate(len(events))
+
+    def _tick_rate(self, n: int = 1) -> None:
+        self._window_count += n
+        self.sent_series.add(n)
         now = time.time()
         elapsed = now - self._last_window_start
         if elapsed >= 1.0:
             self.stats.events_per_sec = self._window_count / elapsed
+            self.audit.flush_ids()
+            if self._source:
+                # The recording sets the pace; falling behind shows as source lag_ms
+                self.stats.rate_error_pct = 0.0
+            else:
+                # Pacing accuracy against what we aimed for, i.e. after any throttling
+                target = self.stats.rate * self._throttle.factor
+                if not self._profiling():
+                    target = max(1, target)
+                self.stats.rate_error_pct = (
+                    (self.stats.events_per_sec - target) / target * 100 if target > 0 else 0.0
+                )
             self._window_count = 0
             self._last_window_start = now
 
@@ -585,32 +1128,80 @@ class _ZerobusAckCallback(_AckCallbackBase):  # type: ignore
     Called by the Rust WAL thread when each record offset is durably committed.
     on_ack(offset)  → safe to remove from in-flight buffer
     on_error(offset, msg) → record rejected (schema violation etc.)
+
+    One callback per shard stream.  The SDK assigns offsets 0, 1, 2, … in
+    submission order, so track() mirrors that numbering and maps each offset
+    back to the event's sequence_num for an O(1) removal from the shard's
+    in-flight buffer.  detach() silences a stream abandoned by a crash.
     """
 
-    def __init__(self, manager: ProducerManager) -> None:
+    def __init__(self, manager: ProducerManager, shard: _Shard) -> None:
         if ZEROBUS_SDK_AVAILABLE:
             super().__init__()
         self._mgr = manager
+        self._shard = shard
+        self._active = True
+        self._next_offset = 0
+        self._offset_to_seq: Dict[int, int] = {}
+
+    def track(self, seq: int) -> None:
+        """Record that the next submission on this stream carries `seq`."""
+        self._offset_to_seq[self._next_offset] = seq
+        self._next_offset += 1
+
+    def outstanding(self) -> int:
+        """Submissions on this stream still awaiting an ack."""
+        return len(self._offset_to_seq)
+
+    def untrack(self) -> None:
+        """Undo the last track() when the submission itself raised."""
+        self._next_offset -= 1
+        self._offset_to_seq.pop(self._next_offset, None)
+
+    def detach(self) -> None:
+        self._active = False
+
+    def _release(self, offset: int) -> Optional[EventRecord]:
+        seq = self._offset_to_seq.pop(offset, None)
+        if seq is not None:
+            return self._shard.unacked.ack(seq)
+        # Offset we never tracked — fall back to FIFO
+        return self._shard.unacked.pop_oldest()
 
     def on_ack(self, offset: int) -> None:
-        s = self._mgr.stats
-        s.events_acked += 1
-        s.events_in_flight = max(0, s.events_in_flight - 1)
-        s.delta_count += 1
-        # Pop oldest unacked event (FIFO)
-        if self._mgr._unacked_events:
-            ev = self._mgr._unacked_events.pop(0)
-            et = ev.get("event_type", "unknown")
-            s.delta_by_type[et] = s.delta_by_type.get(et, 0) + 1
+        if not self._active:
+            return
+        self._mgr._record_ack(self._shard, self._release(offset))
 
     def on_error(self, offset: int, error_message: str) -> None:
-        s = self._mgr.stats
-        s.events_failed += 1
-        s.events_in_flight = max(0, s.events_in_flight - 1)
+        if not self._active:
+            return
+        self._mgr._record_error(self._shard, self._release(offset))
         if "schema" in error_message.lower() or "rejected" in error_message.lower():
-            s.rejection_count += 1
+            self._mgr.stats.rejection_count += 1
         print(f"Zerobus error at offset {offset}: {error_message}")
 
 
+class _DimsAckCallback(_AckCallbackBase):  # type: ignore
+    """Acks for the game_event_dims stream, forwarded to the DimensionWriter until detached."""
+
+    def __init__(self, writer: DimensionWriter) -> None:
+        if ZEROBUS_SDK_AVAILABLE:
+            super().__init__()
+        self._writer = writer
+        self._active = True
+
+    def detach(self) -> None:
+        self._active = False
+
+    def on_ack(self, offset: int) -> None:
+        if self._active:
+            self._writer.on_ack(offset)
+
+    def on_error(self, offset: int, error_message: str) -> None:
+        if self._active:
+            self._writer.on_error(offset, error_message)
+
+
 # Singleton
 producer_manager = ProducerManager()
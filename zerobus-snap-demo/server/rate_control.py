@@ -0,0 +1,121 @@
+"""
+AIMD throttle for real Zerobus streams.
+
+The SDK only pushes back once a stream's max_inflight_records window is full,
+and from then on ingest calls stall or fail.  AimdThrottle watches two earlier
+signals and scales the target rate by a throttle factor in [min_factor, 1]:
+
+  - in-flight pressure: the fullest stream's unacked count / window
+  - ack latency: an EWMA of ingest→ack, or the age of the oldest unacked
+    record if that is larger (it climbs the moment acks stall, long before
+    the slow acks themselves arrive), compared against latency_factor × a
+    baseline that tracks the lowest latency seen
+
+On each update() (the producer calls one every `interval` seconds) the
+factor is multiplied by `decrease` when either signal is over its threshold,
+at most once per cooldown so one slow spell isn't punished repeatedly, or
+grows by `increase` when both are comfortably below, so production recovers
+to the target rate once acks speed up.
+
+The baseline drifts up towards the current latency over `baseline_window`
+seconds: a service that is simply slower now (but keeping up) stops counting
+as congested, and the in-flight window alone bounds the rate.
+"""
+
+import time
+
+
+class AimdThrottle:
+    def __init__(
+        self,
+        high_water: float = 0.7,
+        low_water: float = 0.5,
+        latency_factor: float = 3.0,
+        latency_floor_ms: float = 50.0,
+        increase: float = 0.05,
+        decrease: float = 0.7,
+        min_factor: float = 0.02,
+        interval: float = 0.1,
+        cooldown: float = 0.25,
+        ewma_alpha: float = 0.05,
+        baseline_window: float = 10.0,
+    ) -> None:
+        self.high_water = high_water
+        self.low_water = low_water
+        self.latency_factor = latency_factor
+        self.latency_floor_ms = latency_floor_ms
+        self.increase = increase
+        self.decrease = decrease
+        self.min_factor = min_factor
+        self.interval = interval
+        self.cooldown = cooldown
+        self.ewma_alpha = ewma_alpha
+        self.baseline_window = baseline_window
+        self.reset()
+
+    def reset(self) -> None:
+        self.factor = 1.0
+        self.inflight_ratio = 0.0
+        self.latency_ms = 0.0       # EWMA of ingest→ack
+        self.oldest_ms = 0.0        # age of the oldest unacked record
+        self.base_latency_ms = 0.0  # 0 = no samples yet
+        self.decreases = 0
+        self.reason = ""
+        self._last_update = 0.0
+        self._last_decrease = 0.0
+
+    @property
+    def latency_target_ms(self) -> float:
+        if not self.base_latency_ms:
+            return 0.0
+        return max(self.latency_floor_ms, self.base_latency_ms * self.latency_factor)
+
+    def observe_latency(self, ms: float) -> None:
+        """Feed one ingest→ack sample (called from the SDK's ack thread)."""
+        ewma = self.latency_ms
+        ewma = ms if not ewma else ewma + self.ewma_alpha * (ms - ewma)
+        self.latency_ms = ewma
+        if not self.base_latency_ms or ewma < self.base_latency_ms:
+            self.base_latency_ms = ewma
+
+    def due(self) -> bool:
+        """True once `interval` has passed since the last update()."""
+        return time.monotonic() - self._last_update >= self.interval
+
+    def update(self, inflight_ratio: float, oldest_ms: float = 0.0) -> float:
+        """Re-evaluate the factor from fresh readings and return it."""
+        now = time.monotonic()
+        elapsed = min(now - self._last_update, self.baseline_window)
+        self._last_update = now
+        self.inflight_ratio = inflight_ratio
+        self.oldest_ms = oldest_ms
+
+        latency = max(self.latency_ms, oldest_ms)
+        if self.base_latency_ms and self.latency_ms > self.base_latency_ms:
+            drift = min(1.0, elapsed / self.baseline_window)
+            self.base_latency_ms += (self.latency_ms - self.base_latency_ms) * drift
+
+        target = self.latency_target_ms
+        slow = bool(target) and latency > target
+        if inflight_ratio > self.high_water or slow:
+            if now - self._last_decrease >= self.cooldown:
+                self.factor = max(self.min_factor, self.factor * self.decrease)
+                self._last_decrease = now
+                self.decreases += 1
+                self.reason = "in-flight window" if inflight_ratio > self.high_water else "ack latency"
+        elif inflight_ratio < self.low_water and (not target or latency < target * 0.8):
+            self.factor = min(1.0, self.factor + self.increase)
+            if self.factor >= 1.0:
+                self.reason = ""
+        return self.factor
+
+    def stats(self) -> dict:
+        return {
+            "factor": round(self.factor, 3),
+            "inflight_ratio": round(self.inflight_ratio, 3),
+            "ack_latency_ms": round(self.latency_ms, 1),
+            "oldest_unacked_ms": round(self.oldest_ms, 1),
+            "latency_target_ms": round(self.latency_target_ms, 1),
+            "decreases": self.decreases,
+            "reason": self.reason,
+        }
@@ -0,0 +1,338 @@
+"""
+Replay of recorded game events as the producer's event source.
+
+make_events() draws uniformly random events; benchmarking ingest against
+production-shaped data needs the real mix and the real arrival pattern.
+RecordedEventSource streams a recorded event file and re-emits its events
+with their original inter-arrival times divided by a speed multiplier
+(MIN_SPEED–MAX_SPEED ×):
+
+  .jsonl / .ndjson / .json   one GameEvent object per line
+  .parquet                   columns named after the GameEvent fields
+                             (needs pyarrow)
+
+The file is read lazily, chunk_rows rows at a time on a worker thread, with
+the next chunk prefetched while the current one drains — at most two chunks
+are held whatever the file size.  Each row is encoded once, without
+produced_at / ingested_at / sequence_num; take() stamps those at send time
+(as the worker pool does), so numbering continues the producer's own
+sequence and timestamps reflect the replay, not the recording.  All other
+fields are kept as recorded.
+
+Timing comes from each row's produced_at (INT64 unix µs, ISO-8601 string or
+Parquet timestamp), falling back to ingested_at; rows with neither follow
+the previous row immediately.  Out-of-order rows are sent in file order, and
+gaps longer than max_gap recorded seconds are shortened to max_gap so idle
+stretches in a recording don't stall a benchmark.
+
+The producer treats next_batch() like TokenBucketPacer.next_batch(): it
+waits until at least one recorded event is due and returns how many are.
+The replay clock only runs while the producer asks for events, so a kill
+and resume picks up where the recording left off.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from .config import get_recordings_dir
+from .events import _HOSTNAME, EventRecord, GameEventProto, _uuid4_batch, stamp_payload
+
+# Parquet support is optional — JSONL recordings need nothing extra
+PARQUET_AVAILABLE = False
+try:
+    import pyarrow.parquet as _pq  # type: ignore
+
+    PARQUET_AVAILABLE = True
+except Exception:
+    pass
+
+MIN_SPEED = 1.0
+MAX_SPEED = 100.0
+DEFAULT_CHUNK_ROWS = 2000
+DEFAULT_MAX_GAP = 5.0  # recorded seconds
+
+_JSONL_EXTS = (".jsonl", ".ndjson", ".json")
+_PARQUET_EXTS = (".parquet", ".pq")
+_STRING_FIELDS = ("event_type", "player_id", "match_id", "card_name", "result", "host")
+_COLUMNS = ["event_id", *_STRING_FIELDS, "location", "snap_cubes", "produced_at", "ingested_at"]
+
+# (replay time µs, event_id, event_type, player, match, card, location, snap_cubes, result, host, body)
+_Row = Tuple[float, str, str, str, str, str, int, int, str, str, bytes]
+
+
+def resolve_recording(name: str) -> str:
+    """
+    Path of a recording under PRODUCER_RECORDINGS_DIR.  Raises ValueError if
+    it is missing, has an unknown extension or lies outside that directory.
+    """
+    root = os.path.realpath(get_recordings_dir())
+    path = os.path.realpath(os.path.join(root, name))
+    if os.path.commonpath([root, path]) != root:
+        raise ValueError(f"recording must be inside {root}")
+    if not os.path.isfile(path):
+        raise ValueError(f"recording not found: {name}")
+    _format_of(path)
+    return path
+
+
+def _format_of(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    if ext in _JSONL_EXTS:
+        return "jsonl"
+    if ext in _PARQUET_EXTS:
+        if not PARQUET_AVAILABLE:
+            raise ValueError("Parquet recordings need pyarrow installed")
+        return "parquet"
+    raise ValueError(f"unsupported recording type {ext!r} (use .jsonl or .parquet)")
+
+
+def _to_us(value: Any) -> Optional[int]:
+    """Recorded timestamp → unix µs; None when absent or unparseable."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        dt = value
+    elif isinstance(value, (int, float)):
+        return int(value)
+    else:
+        try:
+            dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp() * 1_000_000)
+
+
+class _ChunkReader:
+    """
+    Sequential chunked reader turning raw rows into encoded _Rows.  Only ever
+    called from one thread at a time (the source awaits each read).
+    """
+
+    def __init__(self, path: str, fmt: str, chunk_rows: int, max_gap: float) -> None:
+        self.path = path
+        self.format = fmt
+        self.chunk_rows = chunk_rows
+        self.max_gap_us = max_gap * 1_000_000
+        self.rows_read = 0
+        self.bad_rows = 0
+        self.chunks_read = 0
+        self._file: Optional[Any] = None  # JSONL file object
+        self._batches: Optional[Any] = None  # Parquet batch iterator
+        self._prev_ts: Optional[int] = None
+        self._t = 0.0  # replay time of the last row, µs from the start
+
+    def rewind(self) -> None:
+        """Start a new pass; its first row follows the previous pass's last."""
+        self.close()
+        self._prev_ts = None
+        if self.format == "jsonl":
+            self._file = open(self.path, "r", encoding="utf-8")
+        else:
+            pf = _pq.ParquetFile(self.path)
+            columns = [c for c in _COLUMNS if c in pf.schema_arrow.names]
+            self._batches = pf.iter_batches(batch_size=self.chunk_rows, columns=columns)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._batches = None
+
+    def read(self) -> List[_Row]:
+        """Next chunk of encoded rows; empty at the end of the pass."""
+        while True:
+            raw = self._read_raw()
+            if not raw:
+                return []
+            self.chunks_read += 1
+            rows = self._encode(raw)
+            if rows:  # a chunk of nothing but bad rows isn't the end
+                return rows
+
+    def _read_raw(self) -> List[Any]:
+        if self.format == "parquet":
+            batch = next(self._batches, None)
+            return batch.to_pylist() if batch is not None else []
+        raw: List[Any] = []
+        for line in self._file:
+            if not line.strip():
+                continue
+            try:
+                raw.append(json.loads(line))
+            except ValueError:
+                self.bad_rows += 1
+            if len(raw) >= self.chunk_rows:
+                break
+        return raw
+
+    def _encode(self, raw: List[Any]) -> List[_Row]:
+        intern = sys.intern
+        ids = iter(_uuid4_batch(len(raw)))  # for rows recorded without one
+        out: List[_Row] = []
+        for r in raw:
+            try:
+                event_id = str(r.get("event_id") or next(ids))
+                s = [intern(str(r.get(f) or "")) for f in _STRING_FIELDS]
+                host = s[5] or _HOSTNAME
+                location, cubes = int(r.get("location") or 0), int(r.get("snap_cubes") or 0)
+                body = GameEventProto(
+                    event_id=event_id, event_type=s[0], player_id=s[1], match_id=s[2],
+                    card_name=s[3], location=location, snap_cubes=cubes, result=s[4], host=host,
+                ).SerializeToString()
+            except (AttributeError, TypeError, ValueError):
+                self.bad_rows += 1
+                continue
+            ts = _to_us(r.get("produced_at"))
+            if ts is None:
+                ts = _to_us(r.get("ingested_at"))
+            if ts is not None:
+                if self._prev_ts is not None:
+                    self._t += min(max(0, ts - self._prev_ts), self.max_gap_us)
+                self._prev_ts = ts
+            out.append((self._t, event_id, s[0], s[1], s[2], s[3], location, cubes, s[4], host, body))
+        self.rows_read += len(out)
+        return out
+
+
+class RecordedEventSource:
+    def __init__(
+        self,
+        path: str,
+        speed: float = 1.0,
+        loop: bool = False,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+        max_gap: float = DEFAULT_MAX_GAP,
+        max_batch: int = 2000,
+        max_sleep: float = 0.25,
+    ) -> None:
+        speed = float(speed)
+        if not MIN_SPEED <= speed <= MAX_SPEED:
+            raise ValueError(f"speed must be between {MIN_SPEED:g}x and {MAX_SPEED:g}x")
+        self.path = path
+        self.speed = speed
+        self.loop = loop
+        self.max_batch = max_batch  # cap per batch, as in TokenBucketPacer
+        self.max_sleep = max_sleep  # re-read the throttle factor at least this often
+        self._reader = _ChunkReader(path, _format_of(path), max(1, chunk_rows), max_gap)
+        self._reader.rewind()
+        self._rows: Deque[_Row] = deque()
+        self._prefetch: Optional[asyncio.Task] = None
+        self._eof = False
+        self._clock = 0.0  # replay time reached, µs
+        self._last: Optional[float] = None
+        self.passes = 1
+        self.rows_emitted = 0
+        self.lag_ms = 0.0
+
+    @property
+    def exhausted(self) -> bool:
+        return self._eof and not self._rows
+
+    def pause(self) -> None:
+        """Stop the replay clock until the next next_batch() (kill, reconnect)."""
+        self._last = None
+
+    async def next_batch(self, factor: float = 1.0) -> int:
+        """
+        Wait until at least one recorded event is due and return how many are
+        (≤ max_batch).  `factor` scales the replay speed (AIMD throttle).
+        Returns 0 after a short sleep once a non-looping recording is done.
+        """
+        speed = self.speed * max(factor, 1e-3)
+        while True:
+            if len(self._rows) < self._reader.chunk_rows // 2:
+                self._start_prefetch()
+            if not self._rows and self._prefetch:
+                await asyncio.shield(self._prefetch)
+                continue
+            if not self._rows:
+                self.lag_ms = 0.0
+                await asyncio.sleep(self.max_sleep)
+                return 0
+
+            now = time.monotonic()
+            if self._last is not None:
+                self._clock += (now - self._last) * 1_000_000 * speed
+            self._last = now
+            head = self._rows[0][0]
+            if head > self._clock:
+                self.lag_ms = 0.0
+                await asyncio.sleep(min(self.max_sleep, (head - self._clock) / 1000 / speed / 1000))
+                continue
+
+            n = 0
+            for row in self._rows:
+                if row[0] > self._clock or n >= self.max_batch:
+                    break
+                n += 1
+            if n < len(self._rows) and self._rows[n][0] <= self._clock:
+                self.lag_ms = (self._clock - self._rows[n][0]) / 1000 / speed
+            else:
+                self.lag_ms = 0.0
+            await asyncio.sleep(0)
+            return n
+
+    def take(self, start_seq: int, n: int) -> List[EventRecord]:
+        """The next n recorded events, numbered from start_seq and stamped now."""
+        ts = time.time_ns() // 1000
+        events = []
+        popleft = self._rows.popleft
+        for seq in range(start_seq, start_seq + min(n, len(self._rows))):
+            _, event_id, et, player, match, card, loc, cubes, result, host, body = popleft()
+            events.append(EventRecord(
+                event_id, et, player, match, card, loc, cubes, result, ts, ts, host, seq,
+                stamp_payload(body, ts, seq),
+            ))
+        self.rows_emitted += len(events)
+        return events
+
+    def close(self) -> None:
+        if self._prefetch and not self._prefetch.done():
+            # The reader thread is mid-chunk; release the file once it returns
+            self._prefetch.add_done_callback(lambda _: self._reader.close())
+        else:
+            self._reader.close()
+        self._rows.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        r = self._reader
+        return {
+            "file": os.path.basename(self.path),
+            "format": r.format,
+            "speed": self.speed,
+            "loop": self.loop,
+            "passes": self.passes,
+            "rows_read": r.rows_read,
+            "rows_emitted": self.rows_emitted,
+            "bad_rows": r.bad_rows,
+            "chunks_read": r.chunks_read,
+            "buffered": len(self._rows),
+            "replayed_s": round(self._clock / 1_000_000, 1),
+            "lag_ms": round(self.lag_ms, 1),
+            "exhausted": self.exhausted,
+        }
+
+    def _start_prefetch(self) -> None:
+        if self._eof or (self._prefetch and not self._prefetch.done()):
+            return
+        self._prefetch = asyncio.create_task(self._fetch())
+
+    async def _fetch(self) -> None:
+        rows = await asyncio.to_thread(self._reader.read)
+        if not rows and self.loop and self._reader.rows_read:
+            await asyncio.to_thread(self._reader.rewind)
+            self.passes += 1
+            rows = await asyncio.to_thread(self._reader.read)
+        if rows:
+            self._rows.extend(rows)
+        else:
+            self._eof = True
+        self._prefetch = None
@@ -1,7 +1,9 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, WebSocket
 from ..delta_reader import delta_reader
+from ..delta_tail import delta_tailer
 
 router = APIRouter()
+ws_router = APIRouter()
 
 
 @router.get("/count")
@@ -32,3 +34,21 @@ async def get_rejections():
 async def get_hosts():
     rows = await delta_reader.get_host_breakdown()
     return {"hosts": rows}
+
+
+@router.get("/summary")
+async def get_summary(limit: int = 10):
+    """Everything above in one response, shared by all viewers for DELTA_SUMMARY_TTL."""
+    return await delta_reader.get_summary(limit=max(1, min(limit, 100)))
+
+
+@router.get("/stats")
+async def get_stats():
+    """This worker's SQL/REST poll latency, session, token cache and tailer."""
+    return {**delta_reader.stats(), "tail": delta_tailer.stats()}
+
+
+@ws_router.websocket("/ws/delta")
+async def websocket_delta(websocket: WebSocket):
+    await websocket.accept()
+    await delta_tailer.serve(websocket)  # recent rows, then rows as they land
@@ -0,0 +1,71 @@
+from typing import Any, Dict
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from ..cluster import ClusterError, coordinator
+from ..metrics import prometheus_histogram, prometheus_metric
+from ..producer import ProducerManager
+
+router = APIRouter()
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Producer counters, gauges and ack-latency histograms in Prometheus text format."""
+    try:
+        # Histograms live with the producer, so followers fetch the text from the leader
+        result = await coordinator.call("metrics")
+    except ClusterError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    return result["text"]
+
+
+@coordinator.command("metrics")
+async def _metrics(m: ProducerManager) -> Dict[str, Any]:
+    s = m.stats
+    shards = [({"shard": str(sh.index)}, sh.stats) for sh in m._shards]
+
+    def per_shard(name: str, kind: str, help_text: str, attr: str) -> str:
+        # Labelled by shard only — sum() across shards gives the producer total
+        samples = [(labels, getattr(ss, attr)) for labels, ss in shards]
+        return prometheus_metric(name, kind, help_text, samples)
+
+    parts = [
+        per_shard("zerobus_producer_events_sent_total", "counter",
+                  "Records submitted, including resends.", "events_sent"),
+        per_shard("zerobus_producer_events_acked_total", "counter",
+                  "Records acknowledged as durable.", "events_acked"),
+        per_shard("zerobus_producer_events_failed_total", "counter",
+                  "Records that failed or were rejected.", "events_failed"),
+        per_shard("zerobus_producer_events_resent_total", "counter",
+                  "Records re-sent by replay.", "events_resent"),
+        per_shard("zerobus_producer_events_in_flight", "gauge",
+                  "Records sent but not yet acknowledged.", "events_in_flight"),
+        prometheus_metric("zerobus_producer_rejections_total", "counter",
+                          "Schema rejections.", [(None, s.rejection_count)]),
+        prometheus_metric("zerobus_producer_events_per_second", "gauge",
+                          "Achieved send rate over the last window.", [(None, round(s.events_per_sec, 1))]),
+        prometheus_metric("zerobus_producer_target_rate", "gauge",
+                          "Configured send rate (events/sec).", [(None, s.rate)]),
+        prometheus_metric("zerobus_producer_throttle_factor", "gauge",
+                          "Fraction of the target rate the AIMD throttle allows.",
+                          [(None, round(m._throttle.factor, 3))]),
+        prometheus_metric("zerobus_producer_up", "gauge",
+                          "1 while the produce loop is running.",
+                          [(None, 1 if s.state.value == "RUNNING" else 0)]),
+        prometheus_metric("zerobus_producer_audit_duplicate_rows_total", "counter",
+                          "Extra table rows per sequence number found by reconciliation.",
+                          [(None, m.audit.duplicate_rows)]),
+        prometheus_metric("zerobus_producer_audit_missing_total", "counter",
+                          "Acked sequence numbers reconciliation found missing from the table.",
+                          [(None, m.audit.missing)]),
+        prometheus_metric("zerobus_producer_audit_watermark", "gauge",
+                          "Sequence number the delivery audit has reconciled up to.",
+                          [(None, m.audit.watermark)]),
+        prometheus_histogram("zerobus_producer_produce_to_ack_seconds",
+                             "Time from event creation to acknowledgement.", m.produce_to_ack),
+        prometheus_histogram("zerobus_producer_ingest_to_ack_seconds",
+                             "Time from ingest_record_nowait to acknowledgement.", m.ingest_to_ack),
+    ]
+    return {"text": "\n".join(parts) + "\n"}
@@ -1,9 +1,14 @@
-import asyncio
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from pydantic import BaseModel
-from typing import Optional
-
-from ..producer import producer_manager
+from fastapi import APIRouter, HTTPException, WebSocket
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+
+from ..broadcast import stats_broadcaster
+from ..cluster import ClusterError, coordinator
+from ..compact import DIMS_SCHEMA
+from ..load_profile import LoadProfile, parse_segments
+from ..producer import ProducerManager, ProducerState
+from ..recorded_source import RecordedEventSource, resolve_recording
+from ..schemas import schema_registry
 
 router = APIRouter()
 ws_router = APIRouter()
@@ -11,11 +16,39 @@ ws_router = APIRouter()
 
 class StartRequest(BaseModel):
     rate: Optional[int] = 5
+    shards: Optional[int] = 1  # parallel Zerobus streams, partitioned by match_id
+    workers: Optional[int] = 0  # event-generation processes (0 = generate in-loop)
+    # Replay a recording (relative to PRODUCER_RECORDINGS_DIR) instead of random events
+    source: Optional[str] = None
+    speed: float = 1.0  # 1–100× the recorded inter-arrival timing
+    loop: bool = False
+    matches: Optional[int] = 0  # simulate this many concurrent matches (0 = independent random events)
+    # Registered table schema (GET /schemas); default game_events.  game_events_compact
+    # sends dictionary codes and writes the dictionary to game_event_dims
+    table_schema: Optional[str] = Field(None, alias="schema")  # "schema" shadows BaseModel
+    schema_version: Optional[int] = None  # default: the latest
+
+
+class ProfileRequest(BaseModel):
+    segments: List[Dict[str, Any]]  # see server/load_profile.py for segment types
+    loop: bool = False
+    name: Optional[str] = "custom"
+    restore_rate: bool = False  # put the previous rate back when the profile ends
+    shards: Optional[int] = 1   # used only if the producer isn't running yet
+    workers: Optional[int] = 0
+
+
+async def _call(command: str, **kwargs: Any) -> Dict[str, Any]:
+    """Run a control command on the producer (forwarded to the leader worker if needed)."""
+    try:
+        return await coordinator.call(command, **kwargs)
+    except ClusterError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
 
 
 @router.get("/stats")
 async def get_stats():
-    return producer_manager.stats.to_dict()
+    return coordinator.stats_dict()
 
 
 @router.get("/debug")
@@ -36,61 +69,165 @@ async def get_debug():
         "databricks_host": os.environ.get("DATABRICKS_HOST", "NOT SET"),
         "platform": platform.platform(),
         "python_version": platform.python_version(),
-        "last_error_full": producer_manager.stats.last_error,
+        "last_error_full": coordinator.last_error(),
         "table_name": os.environ.get("ZEROBUS_TABLE_NAME", "NOT SET"),
+        "ws_broadcast": stats_broadcaster.stats(),
+        "cluster": coordinator.info(),
     }
 
 
 @router.post("/start")
 async def start_producer(req: StartRequest = StartRequest()):
-    await producer_manager.start(rate=req.rate or 5)
-    return {"status": "ok", "state": producer_manager.stats.state}
+    return await _call(
+        "start", rate=req.rate or 5, shards=req.shards or 1, workers=req.workers or 0,
+        source=req.source or "", speed=req.speed, loop=req.loop, matches=req.matches or 0,
+        schema=req.table_schema or "", schema_version=req.schema_version,
+    )
 
 
 @router.post("/stop")
 async def stop_producer():
-    await producer_manager.stop()
-    return {"status": "ok", "state": producer_manager.stats.state}
+    return await _call("stop")
 
 
 @router.post("/kill")
 async def kill_producer():
-    await producer_manager.kill()
-    return {
-        "status": "ok",
-        "state": producer_manager.stats.state,
-        "acked_at_kill": producer_manager.stats.acked_at_kill,
-        "unacked_at_kill": producer_manager.stats.unacked_at_kill,
-    }
+    return await _call("kill")
 
 
 @router.post("/resume")
 async def resume_producer():
-    await producer_manager.resume()
-    return {"status": "ok", "state": producer_manager.stats.state}
+    return await _call("resume")
 
 
 @router.post("/spike")
 async def throughput_spike():
-    await producer_manager.spike()
-    return {"status": "ok", "message": "Spiking to 500 events/sec for 5s"}
+    return await _call("spike")
+
+
+@router.post("/profile")
+async def start_profile(req: ProfileRequest):
+    try:
+        parse_segments(req.segments)  # reject bad specs here, before forwarding
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return await _call(
+        "start_profile",
+        segments=req.segments, loop=req.loop, name=req.name or "custom",
+        restore_rate=req.restore_rate, shards=req.shards or 1, workers=req.workers or 0,
+    )
+
+
+@router.get("/schemas")
+async def list_schemas():
+    return {"schemas": schema_registry.describe()}
+
+
+@router.get("/profile")
+async def get_profile():
+    return {"profile": coordinator.profile_dict()}
+
+
+@router.post("/profile/stop")
+async def stop_profile():
+    return await _call("stop_profile")
 
 
 @router.post("/schema-violation")
 async def send_schema_violation():
-    await producer_manager.send_schema_violation()
+    return await _call("schema_violation")
+
+
+# ── Commands (run on the leader worker) ────────────────────────────────────────
+
+@coordinator.command("start")
+async def _start(
+    m: ProducerManager,
+    rate: int,
+    shards: int,
+    workers: int,
+    source: str = "",
+    speed: float = 1.0,
+    loop: bool = False,
+    matches: int = 0,
+    schema: str = "",
+    schema_version: Optional[int] = None,
+) -> Dict[str, Any]:
+    table_schema = schema_registry.get(schema, schema_version)
+    if table_schema is DIMS_SCHEMA:
+        raise ValueError(f"{DIMS_SCHEMA.name} is written alongside game_events_compact, not produced to")
+    recording = RecordedEventSource(resolve_recording(source), speed, loop) if source else None
+    notes = await m.start(
+        rate=rate, shards=shards, workers=workers, source=recording, matches=matches, schema=table_schema,
+    )
+    result: Dict[str, Any] = {"status": "ok", "state": m.stats.state}
+    if notes:
+        result["not_applied"] = notes  # e.g. the schema, while a backlog waits for replay
+    return result
+
+
+@coordinator.command("stop")
+async def _stop(m: ProducerManager) -> Dict[str, Any]:
+    await m.stop()
+    return {"status": "ok", "state": m.stats.state}
+
+
+@coordinator.command("kill")
+async def _kill(m: ProducerManager) -> Dict[str, Any]:
+    await m.kill()
+    return {
+        "status": "ok",
+        "state": m.stats.state,
+        "acked_at_kill": m.stats.acked_at_kill,
+        "unacked_at_kill": m.stats.unacked_at_kill,
+    }
+
+
+@coordinator.command("resume")
+async def _resume(m: ProducerManager) -> Dict[str, Any]:
+    await m.resume()
+    return {"status": "ok", "state": m.stats.state}
+
+
+@coordinator.command("spike")
+async def _spike(m: ProducerManager) -> Dict[str, Any]:
+    await m.spike()
+    return {"status": "ok", "message": "Spiking to 500 events/sec for 5s"}
+
+
+@coordinator.command("start_profile")
+async def _start_profile(
+    m: ProducerManager,
+    segments: List[Dict[str, Any]],
+    loop: bool,
+    name: str,
+    restore_rate: bool,
+    shards: int,
+    workers: int,
+) -> Dict[str, Any]:
+    parsed = parse_segments(segments)
+    profile = LoadProfile(parsed, loop=loop, name=name)
+    if m.stats.state not in (ProducerState.RUNNING, ProducerState.RECONNECTING):
+        # While a resume replays, the profile takes over once the backlog is out
+        first_rate = max(1, round(parsed[0].rate_at(0.0, 1.0)))
+        await m.start(rate=first_rate, shards=shards, workers=workers)
+    await m.start_profile(profile, restore_rate=restore_rate)
+    return {"status": "ok", "profile": profile.to_dict()}
+
+
+@coordinator.command("stop_profile")
+async def _stop_profile(m: ProducerManager) -> Dict[str, Any]:
+    await m.stop_profile()
+    return {"status": "ok"}
+
+
+@coordinator.command("schema_violation")
+async def _schema_violation(m: ProducerManager) -> Dict[str, Any]:
+    await m.send_schema_violation()
     return {"status": "ok", "message": "Schema violation event sent"}
 
 
 @ws_router.websocket("/ws/producer")
 async def websocket_producer(websocket: WebSocket):
     await websocket.accept()
-    try:
-        while True:
-            stats = producer_manager.stats.to_dict()
-            await websocket.send_json(stats)
-            await asyncio.sleep(0.25)  # 4 fps
-    except WebSocketDisconnect:
-        pass
-    except Exception:
-        pass
+    await stats_broadcaster.serve(websocket)  # full frame, then deltas at 4 fps
@@ -0,0 +1,133 @@
+"""
+Expiry-aware bearer token cache with proactive background refresh.
+
+get() is called from hot paths — HeadersProvider.get_headers runs on the Rust
+SDK thread for every gRPC request — so once warm it only reads memory.  A
+daemon thread refreshes the token ahead of expiry (and retries with backoff on
+failure), keeping the previous token in service until a new one arrives.
+Only the very first get() on a cold cache fetches inline; callers on the
+asyncio side should warm() the cache from a worker thread first.
+"""
+
+import threading
+import time
+from typing import Callable, Tuple
+
+# fetch() → (access_token, expires_in_seconds)
+TokenFetcher = Callable[[], Tuple[str, float]]
+
+
+class TokenCache:
+    def __init__(
+        self,
+        name: str,
+        fetch: TokenFetcher,
+        min_margin: float = 60.0,
+        retry_min: float = 2.0,
+        retry_max: float = 60.0,
+    ) -> None:
+        self.name = name
+        self._fetch = fetch
+        self._min_margin = min_margin
+        self._retry_min = retry_min
+        self._retry_max = retry_max
+
+        self._token = ""
+        self._expires_at = 0.0   # monotonic
+        self._refresh_at = 0.0   # monotonic
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+        self.refresh_count = 0
+        self.refresh_errors = 0
+        self.last_refresh_ms = 0.0
+        self.max_refresh_ms = 0.0
+        self._total_refresh_ms = 0.0
+        self.last_error = ""
+
+    # ── Public API ─────────────────────────────────────────────────────────────
+
+    def get(self) -> str:
+        """Current token; never blocks once the cache has been warmed."""
+        token = self._token
+        if token:
+            return token
+        return self.warm()
+
+    def cached(self) -> str:
+        """Current token, or "" while the cache is cold — never fetches."""
+        return self._token
+
+    def warm(self) -> str:
+        """Fetch a token now if none is cached (blocking).  Returns "" on failure."""
+        with self._lock:
+            if not self._token:
+                self._refresh_locked()
+            return self._token
+
+    def metrics(self) -> dict:
+        now = time.monotonic()
+        return {
+            "name": self.name,
+            "cached": bool(self._token),
+            "expires_in_s": round(max(0.0, self._expires_at - now), 1) if self._token else 0,
+            "refresh_count": self.refresh_count,
+            "refresh_errors": self.refresh_errors,
+            "last_refresh_ms": round(self.last_refresh_ms, 1),
+            "avg_refresh_ms": round(self._total_refresh_ms / self.refresh_count, 1)
+            if self.refresh_count else 0.0,
+            "max_refresh_ms": round(self.max_refresh_ms, 1),
+            "last_error": self.last_error,
+        }
+
+    # ── Internals ──────────────────────────────────────────────────────────────
+
+    def _refresh_locked(self) -> bool:
+        t0 = time.perf_counter()
+        try:
+            token, expires_in = self._fetch()
+        except Exception as e:
+            self.refresh_errors += 1
+            self.last_error = str(e)[:200]
+            print(f"TokenCache[{self.name}] refresh error: {e}")
+            return False
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+        if not token:
+            self.refresh_errors += 1
+            self.last_error = "empty token"
+            return False
+
+        ttl = max(1.0, float(expires_in))
+        margin = min(max(self._min_margin, ttl * 0.1), ttl / 2)
+        now = time.monotonic()
+        self._token = token
+        self._expires_at = now + ttl
+        self._refresh_at = now + ttl - margin
+        self.refresh_count += 1
+        self.last_refresh_ms = elapsed_ms
+        self.max_refresh_ms = max(self.max_refresh_ms, elapsed_ms)
+        self._total_refresh_ms += elapsed_ms
+        self.last_error = ""
+
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._refresh_loop, name=f"token-refresh-{self.name}", daemon=True
+            )
+            self._thread.start()
+        return True
+
+    def _refresh_loop(self) -> None:
+        backoff = self._retry_min
+        while True:
+            delay = self._refresh_at - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+                continue
+            with self._lock:
+                ok = self._refresh_locked()
+            if ok:
+                backoff = self._retry_min
+            else:
+                # Keep serving the previous token while retrying
+                time.sleep(backoff)
+                backoff = min(backoff * 2, self._retry_max)
@@ -0,0 +1,338 @@
+"""
+Durable write-ahead log for events sent to Zerobus but not yet acked.
+
+The in-flight buffers only live in memory, so a real container restart loses
+everything in flight.  With PRODUCER_WAL_DIR set, every first send is also
+appended to a segmented, memory-mapped log of serialized payloads and every
+ack (or terminal error) appends a small tombstone.  Segment files are deleted
+oldest-first once all of their records have been acked, so the log only ever
+holds roughly the in-flight window.
+
+A tombstone lands in the active segment, which may be newer than the one
+holding its data record.  Deleting a segment while an older one still has
+live records would take those tombstones with it and resurrect acked records
+on recovery, so a segment only goes once every older segment has gone.
+
+Durability is group-committed: appends only copy bytes into the mapping (which
+already survives a process crash via the page cache) and a background thread
+msyncs the dirty range every PRODUCER_WAL_FLUSH_MS (default 10 ms), so fsync
+cost is paid per interval rather than per event.
+
+Records are tagged with what they are for (the producer uses the target
+schema's key, since payloads are replayed into that schema's table).  A tag
+record opens every segment and follows every change; data records carry the
+tag before them, and recover() reports the tags of what it returns.  A log
+that cannot be replayed is set aside (renamed *.log.aside) rather than left
+to pin every newer segment.
+
+Record layout (little-endian):
+    u8 type | 3 pad | u32 len | u32 crc32(payload) | i64 sequence_num | payload
+type 1 = data, type 2 = ack tombstone (len 0), type 3 = tag (UTF-8 payload,
+sequence_num 0).  A zero type byte marks the end of a segment's written
+region; a bad length or CRC marks a torn tail.
+"""
+
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional, Set, Tuple
+
+_HDR = struct.Struct("<BxxxIIq")
+_DATA = 1
+_ACK = 2
+_TAG = 3
+_PAGE = mmap.PAGESIZE
+
+DEFAULT_SEGMENT_BYTES = 16 * 1024 * 1024
+DEFAULT_FLUSH_MS = 10.0
+
+
+class _Segment:
+    def __init__(self, path: str, seg_id: int, size: int, create: bool) -> None:
+        self.path = path
+        self.id = seg_id
+        flags = os.O_RDWR | (os.O_CREAT if create else 0)
+        fd = os.open(path, flags, 0o644)
+        try:
+            if create:
+                os.ftruncate(fd, size)
+            self.size = os.fstat(fd).st_size
+            self.mm = mmap.mmap(fd, self.size)
+        finally:
+            os.close(fd)
+        self.pos = 0
+        self.flushed = 0
+        self.live = 0  # data records in this segment still awaiting an ack
+
+    def close(self) -> None:
+        try:
+            self.mm.close()
+        except Exception:
+            pass
+
+
+class WriteAheadLog:
+    def __init__(
+        self,
+        directory: str,
+        segment_bytes: int = DEFAULT_SEGMENT_BYTES,
+        flush_ms: float = DEFAULT_FLUSH_MS,
+    ) -> None:
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.flush_interval = flush_ms / 1000
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._segments: Dict[int, _Segment] = {}
+        self._seq_segment: Dict[int, int] = {}  # sequence_num → segment id
+        self._active: Optional[_Segment] = None
+        self.tag = ""  # written ahead of the records that follow
+        self.recovered_tags: Set[str] = set()  # tags of the records recover() returned ("" = untagged)
+
+        self.appended = 0
+        self.acked = 0
+        self.flushes = 0
+        self.recovered = 0
+        self.recover_ms = 0.0
+
+        self._thread = threading.Thread(target=self._flush_loop, name="wal-flush", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_env(cls) -> Optional["WriteAheadLog"]:
+        """WAL configured from PRODUCER_WAL_DIR, or None when unset."""
+        directory = os.environ.get("PRODUCER_WAL_DIR", "")
+        if not directory:
+            return None
+        flush_ms = float(os.environ.get("PRODUCER_WAL_FLUSH_MS", DEFAULT_FLUSH_MS))
+        return cls(directory, flush_ms=flush_ms)
+
+    # ── Public API ─────────────────────────────────────────────────────────────
+
+    def recover(self) -> List[Tuple[int, bytes]]:
+        """
+        Scan the existing segments and return the unacked (sequence_num, payload)
+        records in log order, with their tags in recovered_tags.  Must be
+        called before the first append.
+        """
+        t0 = time.perf_counter()
+        live: Dict[int, Tuple[int, bytes, str]] = {}
+        with self._lock:
+            tag = ""
+            for seg_id in self._existing_ids():
+                seg = _Segment(self._path(seg_id), seg_id, 0, create=False)
+                self._segments[seg_id] = seg
+                for kind, seq, payload in self._scan(seg):
+                    if kind == _DATA:
+                        live[seq] = (seg_id, payload, tag)
+                    elif kind == _TAG:
+                        tag = payload.decode("utf-8", "replace")
+                    else:
+                        live.pop(seq, None)
+            for seq, (seg_id, _, _) in live.items():
+                self._seq_segment[seq] = seg_id
+                self._segments[seg_id].live += 1
+            self._drop_settled()
+        self.recovered_tags = {tag for _, _, tag in live.values()}
+        records = sorted((seq, payload) for seq, (_, payload, _) in live.items())
+        self.recovered = len(records)
+        self.recover_ms = (time.perf_counter() - t0) * 1000
+        return records
+
+    def append(self, seq: int, payload: bytes) -> None:
+        with self._lock:
+            seg = self._writable(_HDR.size + len(payload))
+            mm, pos = seg.mm, seg.pos
+            body = pos + _HDR.size
+            mm[body:body + len(payload)] = payload
+            _HDR.pack_into(mm, pos, _DATA, len(payload), zlib.crc32(payload), seq)
+            seg.pos = body + len(payload)
+            seg.live += 1
+            self._seq_segment[seq] = seg.id
+            self.appended += 1
+
+    def set_tag(self, tag: str) -> None:
+        """Tag the records appended from now on."""
+        with self._lock:
+            if tag == self.tag:
+                return
+            self.tag = tag
+            seg = self._active
+            if seg is None:
+                return  # the next segment opens with it
+            if seg.pos + _HDR.size + len(tag.encode()) <= seg.size:
+                self._write_tag(seg)
+            else:
+                self._rotate(0)  # the new segment opens with it
+
+    def ack(self, seq: int) -> None:
+        """Tombstone a record; deletes segments whose records are all acked, oldest first."""
+        with self._lock:
+            seg_id = self._seq_segment.pop(seq, None)
+            if seg_id is None:
+                return
+            seg = self._writable(_HDR.size)
+            _HDR.pack_into(seg.mm, seg.pos, _ACK, 0, 0, seq)
+            seg.pos += _HDR.size
+            self.acked += 1
+            owner = self._segments.get(seg_id)
+            if owner is not None:
+                owner.live -= 1
+                if owner.live <= 0:
+                    self._drop_settled()
+
+    def reset(self) -> None:
+        """Discard the whole log (graceful stop — nothing left to replay)."""
+        with self._lock:
+            for seg in list(self._segments.values()):
+                self._drop(seg)
+            self._seq_segment.clear()
+            self._active = None
+
+    def set_aside(self) -> List[str]:
+        """Keep the log's segments for inspection but out of recovery; returns their new paths."""
+        with self._lock:
+            paths = []
+            for seg in sorted(self._segments.values(), key=lambda seg: seg.id):
+                seg.close()
+                try:
+                    os.replace(seg.path, seg.path + ".aside")
+                    paths.append(seg.path + ".aside")
+                except OSError:
+                    pass
+            self._segments.clear()
+            self._seq_segment.clear()
+            self._active = None
+        return paths
+
+    def stats(self) -> dict:
+        with self._lock:
+            segments = len(self._segments)
+            log_bytes = sum(seg.pos for seg in self._segments.values())
+            live = len(self._seq_segment)
+        return {
+            "enabled": True,
+            "dir": self.directory,
+            "segments": segments,
+            "log_bytes": log_bytes,
+            "live_records": live,
+            "appended": self.appended,
+            "acked": self.acked,
+            "flushes": self.flushes,
+            "recovered": self.recovered,
+            "recover_ms": round(self.recover_ms, 1),
+        }
+
+    # ── Internals ──────────────────────────────────────────────────────────────
+
+    def _path(self, seg_id: int) -> str:
+        return os.path.join(self.directory, f"wal-{seg_id:08d}.log")
+
+    def _existing_ids(self) -> List[int]:
+        ids = []
+        for name in os.listdir(self.directory):
+            if name.startswith("wal-") and name.endswith(".log"):
+                try:
+                    ids.append(int(name[4:-4]))
+                except ValueError:
+                    pass
+        return sorted(ids)
+
+    def _scan(self, seg: _Segment):
+        mm, pos, end = seg.mm, 0, seg.size
+        while pos + _HDR.size <= end:
+            kind, length, crc, seq = _HDR.unpack_from(mm, pos)
+            if kind not in (_DATA, _ACK, _TAG):
+                break
+            body = pos + _HDR.size
+            if body + length > end:
+                break
+            payload = bytes(mm[body:body + length])
+            if kind != _ACK and zlib.crc32(payload) != crc:
+                break
+            yield kind, seq, payload
+            pos = body + length
+        seg.pos = seg.flushed = pos
+
+    def _writable(self, need: int) -> _Segment:
+        """Active segment with room for `need` bytes, rotating if necessary."""
+        seg = self._active
+        if seg is not None and seg.pos + need <= seg.size:
+            return seg
+        return self._rotate(need)
+
+    def _rotate(self, need: int) -> _Segment:
+        """Close out the active segment and start a new one with room for `need` bytes."""
+        seg = self._active
+        if seg is not None:
+            self._sync(seg)
+            self._active = None
+            self._drop_settled()
+        seg_id = max(self._segments, default=-1) + 1
+        seg_id = max(seg_id, max(self._existing_ids(), default=-1) + 1)
+        tag_bytes = _HDR.size + len(self.tag.encode()) if self.tag else 0
+        seg = _Segment(self._path(seg_id), seg_id, max(self.segment_bytes, need + tag_bytes), create=True)
+        self._segments[seg_id] = seg
+        self._active = seg
+        if self.tag:
+            # Every segment opens with the tag, so recovery never depends on a dropped one
+            self._write_tag(seg)
+        return seg
+
+    def _write_tag(self, seg: _Segment) -> None:
+        tag = self.tag.encode()
+        body = seg.pos + _HDR.size
+        seg.mm[body:body + len(tag)] = tag
+        _HDR.pack_into(seg.mm, seg.pos, _TAG, len(tag), zlib.crc32(tag), 0)
+        seg.pos = body + len(tag)
+
+    def _drop_settled(self) -> None:
+        """Delete the oldest segments while they hold no unacked record (never the active one)."""
+        for seg_id in sorted(self._segments):
+            seg = self._segments[seg_id]
+            if seg.live > 0 or seg is self._active:
+                break
+            self._drop(seg)
+
+    def _drop(self, seg: _Segment) -> None:
+        self._segments.pop(seg.id, None)
+        if seg is self._active:
+            self._active = None
+        seg.close()
+        try:
+            os.remove(seg.path)
+        except OSError:
+            pass
+
+    def _sync(self, seg: _Segment) -> None:
+        if seg.pos <= seg.flushed:
+            return
+        start = seg.flushed - seg.flushed % _PAGE
+        try:
+            seg.mm.flush(start, seg.pos - start)
+        except (ValueError, OSError):
+            return  # segment closed/dropped underneath us
+        seg.flushed = seg.pos
+        self.flushes += 1
+
+    def _flush_loop(self) -> None:
+        while True:
+            time.sleep(self.flush_interval)
+            with self._lock:
+                seg = self._active
+                if seg is None or seg.pos <= seg.flushed:
+                    continue
+                mm, start, end = seg.mm, seg.flushed - seg.flushed % _PAGE, seg.pos
+            # msync outside the lock so appends keep flowing during the flush
+            try:
+                mm.flush(start, end - start)
+            except (ValueError, OSError):
+                continue
+            with self._lock:
+                if seg.flushed < end:
+                    seg.flushed = end
+                self.flushes += 1
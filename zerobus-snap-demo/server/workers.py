@@ -0,0 +1,206 @@
+"""
+Process-pool event generation feeding the asyncio produce loop.
+
+Worker processes draw random events and serialize them into pre-allocated
+shared-memory slots, so generation and protobuf encoding run outside the
+FastAPI event loop's GIL.  Bodies are encoded *without* produced_at,
+ingested_at and sequence_num: the asyncio side appends those with
+stamp_payload() when it takes events, so sequence numbers are still assigned
+in send order (no gaps when the pool is stopped with events unread) and
+timestamps reflect send time, not generation time.
+
+Slot layout:
+    u32 count
+    count × [ _REC header | GameEvent body ]
+"""
+
+import asyncio
+import multiprocessing as mp
+import random
+import struct
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Deque, Dict, List, Tuple
+
+from .events import (
+    CARD_NAMES, EVENT_TYPES, LOCATIONS, MATCHES, PLAYERS, RESULTS, SNAP_CUBES, _HOSTNAME,
+    EventRecord, GameEventProto, _uuid4_batch, now_us, stamp_payload,
+)
+
+# rec_len, event_type, player, match, card, location, snap_cubes, result, event_id
+_REC = struct.Struct("<IBHHBBBB36s")
+_COUNT = struct.Struct("<I")
+_MAX_RECORD = 512  # generous upper bound for header + body
+
+_TYPE_IDX = range(len(EVENT_TYPES))
+_PLAYER_IDX = range(len(PLAYERS))
+_MATCH_IDX = range(len(MATCHES))
+_CARD_IDX = range(len(CARD_NAMES))
+_LOC_IDX = range(len(LOCATIONS))
+_CUBE_IDX = range(len(SNAP_CUBES))
+_RESULT_IDX = range(len(RESULTS))
+
+
+# ── Worker side ────────────────────────────────────────────────────────────────
+
+_attached: Dict[str, shared_memory.SharedMemory] = {}
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    shm = _attached.get(name)
+    if shm is None:
+        # Spawned workers share the parent's resource tracker, which unlinks
+        # the segment when the parent does — nothing to unregister here.
+        shm = shared_memory.SharedMemory(name=name)
+        _attached[name] = shm
+    return shm
+
+
+def _fill_slot(slot_name: str, n: int) -> int:
+    """Generate up to n event bodies into the named slot; returns how many fit."""
+    shm = _attach(slot_name)
+    buf, size = shm.buf, shm.size
+    ids = _uuid4_batch(n)
+    cols = zip(
+        ids,
+        random.choices(_TYPE_IDX, k=n),
+        random.choices(_PLAYER_IDX, k=n),
+        random.choices(_MATCH_IDX, k=n),
+        random.choices(_CARD_IDX, k=n),
+        random.choices(_LOC_IDX, k=n),
+        random.choices(_CUBE_IDX, k=n),
+        random.choices(_RESULT_IDX, k=n),
+    )
+    pos = _COUNT.size
+    count = 0
+    for event_id, t, p, m, c, loc, cube, res in cols:
+        body = GameEventProto(
+            event_id=event_id,
+            event_type=EVENT_TYPES[t],
+            player_id=PLAYERS[p],
+            match_id=MATCHES[m],
+            card_name=CARD_NAMES[c],
+            location=LOCATIONS[loc],
+            snap_cubes=SNAP_CUBES[cube],
+            result=RESULTS[res],
+            host=_HOSTNAME,
+        ).SerializeToString()
+        rec_len = _REC.size + len(body)
+        if pos + rec_len > size:
+            break
+        _REC.pack_into(buf, pos, rec_len, t, p, m, c, loc, cube, res, event_id.encode())
+        buf[pos + _REC.size:pos + rec_len] = body
+        pos += rec_len
+        count += 1
+    _COUNT.pack_into(buf, 0, count)
+    return count
+
+
+# ── Asyncio side ───────────────────────────────────────────────────────────────
+
+# (event_type, player, match, card, location, snap_cubes, result, event_id, body)
+_Pending = Tuple[int, int, int, int, int, int, int, bytes, bytes]
+
+
+def _discard_result(fut: asyncio.Future) -> None:
+    if not fut.cancelled():
+        fut.exception()
+
+
+class EventWorkerPool:
+    def __init__(self, workers: int, max_chunk: int = 4096) -> None:
+        self.workers = workers
+        self.max_chunk = max_chunk
+        self._chunk = 64
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=mp.get_context("spawn")
+        )
+        # Two slots per worker: one being filled while the other is read
+        self._slots = [
+            shared_memory.SharedMemory(create=True, size=_COUNT.size + max_chunk * _MAX_RECORD)
+            for _ in range(workers * 2)
+        ]
+        self._free: List[shared_memory.SharedMemory] = list(self._slots)
+        self._pending: Deque[Tuple[shared_memory.SharedMemory, asyncio.Future]] = deque()
+        self._ready: Deque[_Pending] = deque()
+        self.batches_generated = 0
+        self.events_generated = 0
+
+    def warm(self) -> None:
+        """Spawn the workers and queue the first jobs without waiting on them."""
+        self._submit()
+
+    async def take(self, start_seq: int, n: int) -> List[EventRecord]:
+        """Next n events numbered from start_seq, stamped with the current time."""
+        # Size jobs to recent demand so prefetched events never sit around long
+        self._chunk = max(16, min(self.max_chunk, n))
+        self._drain_done()
+        self._submit()
+        while len(self._ready) < n and self._pending:
+            slot, fut = self._pending.popleft()
+            count = await fut
+            self._read_slot(slot, count)
+            self._submit()
+
+        ts = now_us()
+        events = []
+        for seq in range(start_seq, start_seq + min(n, len(self._ready))):
+            t, p, m, c, loc, cube, res, event_id, body = self._ready.popleft()
+            events.append(EventRecord(
+                event_id.decode(), EVENT_TYPES[t], PLAYERS[p], MATCHES[m], CARD_NAMES[c],
+                LOCATIONS[loc], SNAP_CUBES[cube], RESULTS[res], ts, ts, _HOSTNAME, seq,
+                stamp_payload(body, ts, seq),
+            ))
+        return events
+
+    def close(self) -> None:
+        for _, fut in self._pending:
+            # Jobs still running will fail once their slot is unlinked
+            fut.add_done_callback(_discard_result)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        for slot in self._slots:
+            try:
+                slot.close()
+                slot.unlink()
+            except Exception:
+                pass
+        self._slots.clear()
+        self._free.clear()
+        self._pending.clear()
+        self._ready.clear()
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "batches_generated": self.batches_generated,
+            "events_generated": self.events_generated,
+            "ready": len(self._ready),
+            "pending_batches": len(self._pending),
+        }
+
+    def _submit(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self._free and len(self._pending) < self.workers and len(self._ready) < self._chunk * self.workers:
+            slot = self._free.pop()
+            fut = loop.run_in_executor(self._executor, _fill_slot, slot.name, self._chunk)
+            self._pending.append((slot, fut))
+
+    def _drain_done(self) -> None:
+        while self._pending and self._pending[0][1].done():
+            slot, fut = self._pending.popleft()
+            self._read_slot(slot, fut.result())
+
+    def _read_slot(self, slot: shared_memory.SharedMemory, count: int) -> None:
+        buf = slot.buf
+        pos = _COUNT.size
+        unpack = _REC.unpack_from
+        hdr = _REC.size
+        append = self._ready.append
+        for _ in range(count):
+            rec_len, t, p, m, c, loc, cube, res, event_id = unpack(buf, pos)
+            append((t, p, m, c, loc, cube, res, event_id, bytes(buf[pos + hdr:pos + rec_len])))
+            pos += rec_len
+        self._free.append(slot)
+        self.batches_generated += 1
+        self.events_generated += count
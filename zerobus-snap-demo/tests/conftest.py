@@ -0,0 +1,4 @@
+import os
+
+# Importing the producer resolves the workspace config; keep it offline
+os.environ.setdefault("DATABRICKS_APP_NAME", "tests")
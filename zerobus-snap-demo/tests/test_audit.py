@@ -0,0 +1,100 @@
+import asyncio
+import random
+import re
+
+from server.audit import DeliveryAudit, SeqRanges, subtract
+
+
+def test_seq_ranges_match_a_set():
+    rng = random.Random(3)
+    ranges, ref = SeqRanges(), set()
+    for _ in range(2000):
+        seq = rng.randint(1, 300)
+        assert ranges.add(seq) == (seq not in ref)
+        ref.add(seq)
+    assert len(ranges) == len(ref)
+    assert all((seq in ranges) == (seq in ref) for seq in range(0, 302))
+    flat = {s for a, b in ranges.ranges(1, 300) for s in range(a, b + 1)}
+    assert flat == ref
+    ranges.discard_through(150)
+    assert ranges.first() == min(s for s in ref if s > 150)
+
+
+def test_subtract():
+    assert subtract([(1, 10)], [(3, 4), (8, 12)]) == [(1, 2), (5, 7)]
+    assert subtract([(1, 5), (7, 9)], []) == [(1, 5), (7, 9)]
+    assert subtract([(1, 5)], [(0, 9)]) == []
+
+
+class _Table:
+    """Rows of (sequence_num, host, produced_at), queried like the islands SQL."""
+
+    def __init__(self):
+        self.rows = []
+
+    async def query(self, sql):
+        since = int(re.search(r"produced_at >= (\d+)", sql).group(1))
+        lo = int(re.search(r"sequence_num > (\d+)", sql).group(1))
+        hi = int(re.search(r"sequence_num <= (\d+)", sql).group(1))
+        host = re.search(r"host = '([^']*)'", sql)
+        counts = {}
+        for seq, h, produced in self.rows:
+            if produced >= since and lo < seq <= hi and (host is None or h == host.group(1)):
+                counts[seq] = counts.get(seq, 0) + 1
+        islands = []
+        for seq in sorted(counts):
+            if islands and islands[-1]["hi"] == seq - 1:
+                islands[-1]["hi"] = seq
+                islands[-1]["rows"] += counts[seq]
+            else:
+                islands.append({"lo": seq, "hi": seq, "rows": counts[seq]})
+        return [{k: str(v) for k, v in i.items()} for i in islands]
+
+
+def _reconcile(audit, table):
+    asyncio.run(audit.reconcile(table.query, "t", "h"))
+
+
+def test_reconcile_counts_duplicates_gaps_and_unexpected_rows():
+    audit, table = DeliveryAudit(settle=0), _Table()
+    for seq in range(1, 101):
+        audit.on_sent(seq, f"e{seq}", 1_000 + seq)
+        if seq == 50:
+            audit.on_failed(seq, dropped=True)
+        else:
+            audit.on_ack(seq)
+        if seq not in (20, 21):                  # acked but lost
+            table.rows.append((seq, "h", 1_000 + seq))
+    table.rows += [(7, "h", 1_007), (8, "h", 1_008)]  # resent after a kill
+    _reconcile(audit, table)
+    s = audit.stats()
+    assert s["mode"] == "table" and s["watermark"] == 100
+    assert s["duplicate_rows"] == 2
+    assert s["gap_count"] == 2 and s["oldest_missing_seq"] == 20
+    assert s["unexpected_rows"] == 1             # the dropped seq 50 landed anyway
+
+
+def test_rows_from_an_earlier_run_are_not_counted():
+    audit, table = DeliveryAudit(settle=0), _Table()
+    # A previous process on the same host wrote seqs 1–200 before this run began
+    table.rows += [(seq, "h", seq) for seq in range(1, 201)]
+    for seq in range(1, 51):
+        audit.on_sent(seq, f"new{seq}", 10_000 + seq)
+        audit.on_ack(seq)
+        table.rows.append((seq, "h", 10_000 + seq))
+    _reconcile(audit, table)
+    s = audit.stats()
+    assert (s["duplicate_rows"], s["gap_count"], s["unexpected_rows"]) == (0, 0, 0)
+    assert s["rows_scanned"] == 50
+
+
+def test_scan_starts_at_the_first_tracked_sequence():
+    audit, table = DeliveryAudit(settle=0), _Table()
+    # Resumed from a WAL: this run's sequence numbers start at 1001
+    table.rows += [(seq, "h", 5_000) for seq in range(990, 1001)]
+    for seq in range(1001, 1011):
+        audit.on_sent(seq, f"e{seq}", 5_000)
+        audit.on_ack(seq)
+        table.rows.append((seq, "h", 5_000))
+    _reconcile(audit, table)
+    assert audit.stats()["unexpected_rows"] == 0 and audit.rows_scanned == 10
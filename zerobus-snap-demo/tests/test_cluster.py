@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from server.cluster import ClusterCoordinator, ClusterError
+from server.producer import ProducerManager
+
+
+def _pair(directory):
+    # flock is per open file, so two coordinators in one process contend like workers
+    leader = ClusterCoordinator(ProducerManager(), str(directory))
+    follower = ClusterCoordinator(ProducerManager(), str(directory))
+    for c in (leader, follower):
+        @c.command("echo")
+        async def echo(manager, blob):
+            return {"n": len(blob)}
+    return leader, follower
+
+
+def test_follower_forwards_commands_to_leader(tmp_path):
+    async def run():
+        leader, follower = _pair(tmp_path)
+        await leader.start()
+        await follower.start()
+        try:
+            assert (leader.role, follower.role) == ("leader", "follower")
+            return await follower.call("echo", blob="x" * 1000)
+        finally:
+            await follower.close()
+            await leader.close()
+
+    assert asyncio.run(run())["n"] == 1000
+
+
+def test_oversized_command_is_refused_before_writing(tmp_path):
+    async def run():
+        leader, follower = _pair(tmp_path)
+        await leader.start()
+        await follower.start()
+        try:
+            with pytest.raises(ClusterError) as err:
+                await follower.call("echo", blob="x" * 200_000)
+            assert err.value.status_code == 413
+            # The mailbox is untouched and still works
+            return await follower.call("echo", blob="ok")
+        finally:
+            await follower.close()
+            await leader.close()
+
+    assert asyncio.run(run())["n"] == 2
+
+
+def test_demo_mode_is_read_without_building_stats(tmp_path, monkeypatch):
+    async def run():
+        leader, follower = _pair(tmp_path)
+        await leader.start()
+        await follower.start()
+        try:
+            leader.manager.stats.demo_mode = False
+            leader._publish()
+            for c in (leader, follower):
+                monkeypatch.setattr(c.manager, "stats_dict", None)  # must not be called
+            return leader.demo_mode(), follower.demo_mode()
+        finally:
+            await follower.close()
+            await leader.close()
+
+    assert asyncio.run(run()) == (False, False)
+
+
+def test_demo_summary_builds_stats_once(monkeypatch):
+    from server import delta_reader as module
+
+    calls = []
+    stats = {
+        "demo_mode": True, "delta_count": 3, "delta_by_type": {"a": 1, "b": 2},
+        "rejection_count": 0, "event_log": [{"n": i} for i in range(20)],
+    }
+    monkeypatch.setattr(module.coordinator, "demo_mode", lambda: True)
+    monkeypatch.setattr(module.coordinator, "stats_dict", lambda include_log=True: calls.append(1) or stats)
+    summary = asyncio.run(module.DeltaReader()._read_summary(5))
+    assert len(calls) == 1
+    assert summary["count"] == 3 and len(summary["events"]) == 5
+    assert [b["event_type"] for b in summary["breakdown"]] == ["b", "a"]
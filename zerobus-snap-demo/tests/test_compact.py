@@ -0,0 +1,93 @@
+from server.compact import COMPACT_SCHEMA, DIMS_SCHEMA, MAX_DIM_RETRIES, CompactDictionary, DimensionWriter
+from server.events import make_events
+from server.schemas import TableSchema
+
+
+class _Stream:
+    def __init__(self):
+        self.records = []
+
+    def ingest_record_nowait(self, payload):
+        self.records.append(payload)
+
+
+def _encoder(dictionary):
+    schema = TableSchema(
+        "compact_test", 1, COMPACT_SCHEMA.fields,
+        sources=COMPACT_SCHEMA.sources, env={"_d": dictionary},
+    )
+    return schema, schema.record_encoder()
+
+
+def test_codes_are_assigned_once_and_queued():
+    d = CompactDictionary()
+    assert [d.card[c] for c in ("a", "b", "a")] == [0, 1, 0]
+    assert d.pending == [(d.dict_id, "card", 0, "a"), (d.dict_id, "card", 1, "b")]
+
+
+def test_full_dictionary_rotates_between_batches_and_loses_no_rows():
+    d = CompactDictionary(max_entries=50)
+    writer = DimensionWriter(d)
+    stream = _Stream()
+    writer.attach(stream)
+    schema, encode = _encoder(d)
+    sent = []
+    for start in range(1, 2001, 100):
+        for event in make_events(start, 100):
+            sent.append((event, schema.message.FromString(encode(event))))
+        writer.flush_pending()
+        # Bounded by the cap plus what one batch can add
+        assert d.entries <= 50 + 6 * 100
+    assert d.rotations >= 1
+    assert len({msg.dict_id for _, msg in sent}) > 1
+
+    # Every event's codes resolve through the rows written under its own dict_id
+    rows = {}
+    for payload in stream.records:
+        r = DIMS_SCHEMA.message.FromString(payload)
+        rows[(r.dict_id, r.dimension, r.code)] = r.value
+    for event, msg in sent:
+        assert rows[(msg.dict_id, "card", msg.card_code)] == event.card_name
+        assert rows[(msg.dict_id, "player", msg.player_code)] == event.player_id
+        assert rows[(msg.dict_id, "match", msg.match_code)] == event.match_id
+
+
+def test_reset_is_not_counted_as_rotation():
+    d = CompactDictionary()
+    d.card["x"]
+    d.reset()
+    assert d.pending == [] and d.rotations == 0 and d.entries == 0
+
+
+def test_rejected_dims_row_is_sent_again():
+    d = CompactDictionary()
+    writer = DimensionWriter(d)
+    stream = _Stream()
+    writer.attach(stream)
+    d.card["x"]
+    d.card["y"]
+    writer.flush_pending()
+    writer.on_ack(0)
+    writer.on_error(1, "rejected")
+    assert writer.flush_pending() == 1
+    row = DIMS_SCHEMA.message.FromString(stream.records[-1])
+    assert (row.dimension, row.code, row.value) == ("card", 1, "y")
+    writer.on_ack(2)
+    assert writer.stats()["in_flight"] == 0 and writer.retried == 1 and d.rotations == 0
+
+
+def test_a_row_rejected_past_the_retries_rotates_the_dictionary():
+    d = CompactDictionary()
+    writer = DimensionWriter(d)
+    writer.attach(_Stream())
+    d.card["x"]
+    dict_id = d.dict_id
+    offset = 0
+    for _ in range(MAX_DIM_RETRIES + 1):
+        writer.flush_pending()
+        writer.on_error(offset, "rejected")
+        offset += 1
+    writer.flush_pending()
+    assert writer.abandoned == 1 and d.rotations == 1 and d.dict_id != dict_id
+    # The value is coded (and written) again under the new dict_id
+    assert d.card["x"] == 0 and d.pending == [(d.dict_id, "card", 0, "x")]
@@ -0,0 +1,115 @@
+import asyncio
+import sqlite3
+import time
+
+from server.delta_counts import IncrementalCounts
+from server.events import now_us
+
+_MINUTE = 60_000_000
+
+
+class _Table:
+    """An in-memory ingest table the counters' SQL runs against (sqlite)."""
+
+    def __init__(self):
+        self.db = sqlite3.connect(":memory:")
+        self.db.execute("CREATE TABLE t (event_type, host, produced_at)")
+        self.queries = []
+        self.fail = False
+
+    def land(self, event_type, host, produced, n=1):
+        self.db.executemany("INSERT INTO t VALUES (?, ?, ?)", [(event_type, host, produced)] * n)
+
+    async def query(self, sql):
+        self.queries.append(sql)
+        await asyncio.sleep(0)
+        if self.fail:
+            raise RuntimeError("warehouse unavailable")
+        cur = self.db.execute(sql)
+        names = [d[0] for d in cur.description]
+        # The Statement API returns every value as a string
+        return [{k: None if v is None else str(v) for k, v in zip(names, row)} for row in cur]
+
+
+def _counts(table, name=lambda: "t", **kwargs):
+    kwargs = {"lag": 30, "recount": 0, "max_age": 0, **kwargs}
+    return IncrementalCounts(table.query, name, **kwargs)
+
+
+def test_refresh_scans_only_past_the_watermark():
+    table = _Table()
+    counts = _counts(table)
+    now = now_us()
+    table.land("card_played", "h1", now - 2 * _MINUTE, n=5)  # settled
+    table.land("match_ended", "h2", now, n=3)                 # tail
+    assert asyncio.run(counts.total()) == 8
+    assert "WHERE" not in table.queries[-1]
+    assert counts.stats()["settled"] == 5 and counts.stats()["tail"] == 3
+
+    watermark = counts.watermark
+    table.land("card_played", "h2", now_us(), n=4)
+    assert asyncio.run(counts.total()) == 12
+    assert f"WHERE produced_at > {watermark} " in table.queries[-1]
+    assert counts.recounts == 1 and counts.refreshes == 2
+    assert asyncio.run(counts.by_type()) == [
+        {"event_type": "card_played", "count": 9},
+        {"event_type": "match_ended", "count": 3},
+    ]
+    assert asyncio.run(counts.by_host(limit=1)) == [{"host": "h2", "count": 7}]
+
+
+def test_a_row_landing_below_the_watermark_waits_for_the_recount():
+    table = _Table()
+    counts = _counts(table)
+    table.land("card_played", "h1", now_us(), n=2)
+    assert asyncio.run(counts.total()) == 2
+    table.land("card_played", "h1", now_us() - 10 * _MINUTE)  # a late replay
+    assert asyncio.run(counts.total()) == 2
+    counts.recount = 0.001
+    time.sleep(0.01)
+    assert asyncio.run(counts.total()) == 3
+    assert counts.recounts == 2 and counts.last_recount_drift == 1
+
+
+def test_a_new_table_is_counted_from_scratch():
+    table = _Table()
+    name = ["t"]
+    counts = _counts(table, name=lambda: name[0])
+    table.land("card_played", "h1", now_us(), n=2)
+    assert asyncio.run(counts.total()) == 2
+    table.db.execute("CREATE TABLE u (event_type, host, produced_at)")
+    name[0] = "u"
+    assert asyncio.run(counts.total()) == 0
+    assert "WHERE" not in table.queries[-1]
+    assert counts.recounts == 2 and counts.last_recount_drift == 0
+
+
+def test_a_failed_refresh_keeps_the_last_totals():
+    table = _Table()
+    counts = _counts(table)
+    table.land("card_played", "h1", now_us() - 2 * _MINUTE, n=4)
+    assert asyncio.run(counts.total()) == 4
+    watermark = counts.watermark
+    table.fail = True
+    table.land("card_played", "h1", now_us())
+    assert asyncio.run(counts.total()) == 4
+    assert counts.stats()["last_error"] == "warehouse unavailable"
+    assert counts.watermark == watermark
+    table.fail = False
+    assert asyncio.run(counts.total()) == 5
+    assert counts.stats()["last_error"] == ""
+
+
+def test_concurrent_callers_share_one_refresh():
+    table = _Table()
+    counts = _counts(table, max_age=60)
+    table.land("card_played", "h1", now_us(), n=3)
+
+    async def many():
+        return await asyncio.gather(*(counts.total() for _ in range(10)))
+
+    assert asyncio.run(many()) == [3] * 10
+    assert len(table.queries) == 1
+    table.land("card_played", "h1", now_us())
+    assert asyncio.run(counts.total()) == 3  # within max_age
+    assert len(table.queries) == 1
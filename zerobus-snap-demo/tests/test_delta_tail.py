@@ -0,0 +1,143 @@
+import asyncio
+import random
+import sqlite3
+
+from server.delta_tail import _LANDED, DeltaTailer
+
+_COLS = ("event_id", "event_type", "player_id", "card_name", "host", "sequence_num", "produced_at", "landed_us")
+
+
+class _Table:
+    """An in-memory ingest table the tailer's SQL runs against (sqlite)."""
+
+    def __init__(self):
+        self.db = sqlite3.connect(":memory:")
+        self.db.execute(f"CREATE TABLE t ({', '.join(_COLS)})")
+        self.queries = 0
+
+    def land(self, host, seq, produced):
+        self.db.execute(
+            "INSERT INTO t VALUES (?, 'card_played', 'p', 'c', ?, ?, ?, ?)",
+            (f"{host}-{seq}-{produced}", host, seq, produced, produced + 250_000),
+        )
+
+    async def query(self, sql):
+        self.queries += 1
+        cur = self.db.execute(sql.replace(_LANDED, "landed_us"))
+        names = [d[0] for d in cur.description]
+        # The Statement API returns every value as a string
+        return [{k: None if v is None else str(v) for k, v in zip(names, row)} for row in cur]
+
+
+def _tailer(table, **kwargs):
+    tailer = DeltaTailer(table.query, lambda: "t", lambda: True, **kwargs)
+    tailer._floor_table = "t"
+    tailer._floor = 1
+    return tailer
+
+
+def _poll(tailer):
+    return [(r["host"], r["sequence_num"]) for r in asyncio.run(tailer.poll())]
+
+
+def test_rows_landing_out_of_sequence_order_are_not_skipped():
+    table = _Table()
+    tailer = _tailer(table)
+    for seq in (1, 2, 4, 5):   # shard B's seq 3 commits later
+        table.land("h", seq, 1_000 + seq)
+    assert _poll(tailer) == [("h", 1), ("h", 2), ("h", 4), ("h", 5)]
+    table.land("h", 6, 1_006)
+    assert _poll(tailer) == [("h", 6)]
+    table.land("h", 3, 1_003)
+    assert _poll(tailer) == [("h", 3)]
+    assert _poll(tailer) == []
+
+
+def test_a_new_hosts_earlier_rows_still_show_until_the_hole_wait():
+    table = _Table()
+    tailer = _tailer(table, hole_wait=3600)
+    table.land("h", 2, 1_002)   # seq 1's shard commits later
+    assert _poll(tailer) == [("h", 2)]
+    assert tailer.stats()["hosts"]["h"] == {"low": None, "holes": 1}
+    table.land("h", 1, 1_001)
+    assert _poll(tailer) == [("h", 1)]
+    tailer.hole_wait = 0
+    assert _poll(tailer) == []
+    assert tailer.stats()["hosts"]["h"] == {"low": 2, "holes": 0}
+    assert tailer.skipped == 0
+
+
+def test_interleaved_shards_show_every_row_exactly_once():
+    rng = random.Random(11)
+    table = _Table()
+    tailer = _tailer(table, hole_wait=0)
+    for host in ("a", "b"):
+        table.land(host, 1, 10_001)
+    shown = _poll(tailer)
+    tailer.hole_wait = 3600
+    # Three shards per host, each committing its own sequence numbers in order
+    shards = [
+        [(host, seq, 10_000 + seq) for seq in range(first, 601, 3)]
+        for host in ("a", "b") for first in (4, 2, 3)
+    ]
+    while any(shards):
+        shard = rng.choice([s for s in shards if s])
+        for _ in range(rng.randint(1, 30)):
+            if shard:
+                table.land(*shard.pop(0))
+        shown += _poll(tailer)
+    assert len(shown) == len(set(shown)) == 1200
+    assert shown != sorted(shown)  # rows really did land out of order
+    assert tailer.skipped == 0
+    assert tailer.stats()["hosts"]["a"] == {"low": 600, "holes": 0}
+
+
+def test_a_hole_that_never_fills_is_given_up():
+    table = _Table()
+    tailer = _tailer(table, hole_wait=0)
+    for seq in (1, 2):
+        table.land("h", seq, 1_000 + seq)
+    _poll(tailer)
+    tailer.hole_wait = 3600
+    table.land("h", 4, 1_004)  # 3 was rejected and never lands
+    assert _poll(tailer) == [("h", 4)]
+    assert tailer.stats()["hosts"]["h"] == {"low": 2, "holes": 1}
+    tailer.hole_wait = 0
+    assert _poll(tailer) == []
+    assert tailer.stats()["hosts"]["h"] == {"low": 4, "holes": 0}
+    assert tailer.skipped == 1
+
+
+def test_restarted_producer_is_followed():
+    table = _Table()
+    tailer = _tailer(table)
+    for seq in range(1, 51):
+        table.land("h", seq, 1_000 + seq)
+    assert len(_poll(tailer)) == 50
+    for seq in (1, 2, 3):      # new process, same host, sequence from 1
+        table.land("h", seq, 90_000 + seq)
+    assert _poll(tailer) == [("h", 1), ("h", 2), ("h", 3)]
+    assert _poll(tailer) == []
+    table.land("h", 4, 90_004)
+    assert _poll(tailer) == [("h", 4)]
+
+
+def test_full_batch_catches_up_to_the_newest_rows():
+    table = _Table()
+    tailer = _tailer(table, batch=10)
+    for seq in range(1, 101):
+        table.land("h", seq, 1_000 + seq)
+    assert len(_poll(tailer)) == 10
+    assert tailer.catchups == 1
+    assert _poll(tailer) == []
+    table.land("h", 101, 1_101)
+    assert _poll(tailer) == [("h", 101)]
+
+
+def test_landed_latency_comes_from_the_file_commit():
+    table = _Table()
+    tailer = _tailer(table)
+    table.land("h", 1, 1_000_000)
+    row = asyncio.run(tailer.poll())[0]
+    assert row["landed_ms"] == 250.0
+    assert tailer.landed_latency.snapshot()["count"] == 1
@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from server.load_profile import Constant, LoadProfile, Ramp, Trace, parse_segments
+from server.pacer import TokenBucketPacer
+
+
+def test_step_expands_into_one_constant_per_rate():
+    segs = parse_segments([{"type": "step", "rates": [100, 0, 500], "step_seconds": 2}])
+    assert [(type(s), s.rate, s.duration) for s in segs] == [
+        (Constant, 100, 2.0), (Constant, 0, 2.0), (Constant, 500, 2.0),
+    ]
+
+
+@pytest.mark.parametrize("specs, message", [
+    ([], "at least one segment"),
+    ([{"type": "step", "rates": [], "step_seconds": 1}], "rates must not be empty"),
+    ([{"type": "trace", "rates": []}], "rates must not be empty"),
+    ([{"type": "constant", "rate": 10}], "missing field 'duration'"),
+    ([{"type": "constant", "rate": -1, "duration": 1}], "segment 0"),
+    ([{"type": "ramp", "from": 1, "to": 2, "duration": 0}], "duration must be > 0"),
+    ([{"type": "warp", "duration": 1}], "unknown segment type"),
+    ([{"type": "sine", "base": 10, "amplitude": 1e12, "period": 10, "duration": 5}], "amplitude must be between"),
+    ([{"type": "sine", "base": 10, "amplitude": float("inf"), "period": 10, "duration": 5}], "amplitude"),
+    ([{"type": "sine", "base": 10, "amplitude": float("nan"), "period": 10, "duration": 5}], "amplitude"),
+    ([{"type": "sine", "base": 10, "amplitude": -5, "period": 10, "duration": 5}], "amplitude"),
+    ([{"type": "sine", "base": 600_000, "amplitude": 500_000, "period": 10, "duration": 5}], "base \\+ amplitude"),
+])
+def test_bad_specs_raise_value_error(specs, message):
+    with pytest.raises(ValueError, match=message):
+        parse_segments(specs)
+
+
+def test_ramp_and_trace_rates():
+    ramp = Ramp(100, 300, 10)
+    assert ramp.rate_at(0, 0.1) == 100
+    assert ramp.rate_at(5, 0.1) == 200
+    assert ramp.rate_at(20, 0.1) == 300
+    trace = Trace([10, 20, 40], interval=2.0, interpolate=True)
+    assert trace.duration == 6.0
+    assert trace.rate_at(1.0, 0.1) == 15
+    assert trace.rate_at(5.0, 0.1) == 40
+
+
+def test_run_profile_without_segments_returns():
+    from server.producer import ProducerManager
+
+    async def run():
+        profile = LoadProfile([], loop=True)
+        await asyncio.wait_for(ProducerManager()._run_profile(profile, restore_rate=False), 1.0)
+        assert profile.current is None
+
+    asyncio.run(run())
+
+
+def test_pacer_sends_nothing_at_zero_rate():
+    async def run():
+        pacer = TokenBucketPacer(max_sleep=0.01)
+        return [await pacer.next_batch(0) for _ in range(5)]
+
+    assert asyncio.run(run()) == [0] * 5
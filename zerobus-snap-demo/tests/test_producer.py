@@ -0,0 +1,110 @@
+import asyncio
+import os
+
+import pytest
+
+from server import producer
+from server.events import GAME_EVENT_SCHEMA, make_events
+from server.producer import ProducerManager, ProducerState
+from server.schemas import schema_registry
+from server.wal import WriteAheadLog
+
+PLAYER_ACTIONS_SCHEMA = schema_registry.get("player_actions")
+
+
+@pytest.fixture(autouse=True)
+def demo_mode(monkeypatch):
+    monkeypatch.setattr(producer, "ZEROBUS_SDK_AVAILABLE", False)
+    monkeypatch.setattr(producer, "RECONNECT_DELAY", 0.2)
+
+
+async def _killed_with_backlog():
+    m = ProducerManager()
+    await m.start(rate=200)
+    await asyncio.sleep(0.3)
+    await m.kill()
+    assert m.stats.events_in_flight > 0
+    return m
+
+
+def test_start_during_a_resume_waits_for_the_replay():
+    async def run():
+        m = await _killed_with_backlog()
+        await m.resume()
+        replay = m._task
+        await m.start(rate=200)
+        assert m._task is replay and m.stats.state == ProducerState.RECONNECTING
+        await asyncio.sleep(0.4)
+        assert m.stats.state == ProducerState.RUNNING and m._task is replay
+        assert m.stats.replay_count == m.stats.unacked_at_kill
+        await m.stop()
+        assert replay.done()
+        sent = m.stats.events_sent
+        await asyncio.sleep(0.2)
+        return sent, m.stats.events_sent
+
+    sent, later = asyncio.run(run())
+    assert later == sent
+
+
+def test_stop_cancels_a_resume_still_reconnecting():
+    async def run():
+        m = await _killed_with_backlog()
+        await m.resume()
+        replay = m._task
+        await m.stop()
+        assert replay.done()
+        sent = m.stats.events_sent
+        await asyncio.sleep(0.4)
+        return m.stats.state, sent, m.stats.events_sent
+
+    state, sent, later = asyncio.run(run())
+    assert state == ProducerState.STOPPED and later == sent
+
+
+def _wal_with_backlog(directory, tag):
+    wal = WriteAheadLog(str(directory))
+    if tag:
+        wal.set_tag(tag)
+    for event in make_events(1, 3):
+        wal.append(event.sequence_num, event.payload)
+    return wal
+
+
+def test_recovery_restores_the_backlogs_schema(tmp_path, monkeypatch):
+    monkeypatch.setenv("PRODUCER_WAL_DIR", str(tmp_path))
+    _wal_with_backlog(tmp_path, PLAYER_ACTIONS_SCHEMA.key)
+    m = ProducerManager()
+    assert m.stats.state == ProducerState.KILLED and m.stats.events_in_flight == 3
+    assert m._schema is PLAYER_ACTIONS_SCHEMA
+
+    async def run():
+        notes = await m.start(schema=GAME_EVENT_SCHEMA)
+        await m.kill()
+        return notes
+
+    assert asyncio.run(run()) == [f"kept schema {PLAYER_ACTIONS_SCHEMA.key}: unacked events pending replay"]
+
+
+def test_a_backlog_of_unknown_schema_is_set_aside(tmp_path, monkeypatch):
+    monkeypatch.setenv("PRODUCER_WAL_DIR", str(tmp_path))
+    _wal_with_backlog(tmp_path, "")
+    m = ProducerManager()
+    assert m.stats.state == ProducerState.STOPPED and m.stats.events_in_flight == 0
+    assert "not recovering 3 unacked events" in m.stats.last_error
+    assert sorted(os.listdir(tmp_path)) == ["wal-00000000.log.aside"]
+
+
+def test_stop_in_demo_mode_settles_every_event_once():
+    async def run():
+        m = ProducerManager()
+        await m.start(rate=500)
+        await asyncio.sleep(0.3)
+        await m.stop()
+        settled = (m.stats.events_acked, m.audit.stats())
+        await asyncio.sleep(0.3)  # no simulated ack left to arrive
+        return m, settled
+
+    m, (acked, audit) = asyncio.run(run())
+    assert m.stats.events_acked == acked == m.stats.events_sent
+    assert audit["dropped"] == 0 and m.audit.stats() == audit